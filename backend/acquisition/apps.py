@@ -39,6 +39,7 @@ class AcquisitionConfig(AppConfig):
         """
         try:
             # Import here to avoid AppRegistryNotReady errors
+            from django.utils import timezone
             from acquisition.models import AcquisitionSession
             from acquisition import tasks
 
@@ -66,13 +67,19 @@ class AcquisitionConfig(AppConfig):
                         except Exception as e:
                             logger.warning(f"Failed to revoke old task {session.celery_task_id}: {e}")
 
-                    # Delete the old session and start a fresh task
-                    # (start_acquisition_task will create a new session)
+                    # Retire the old session and start a fresh task
+                    # (start_acquisition_task will create a new session).
+                    # Its data points are purged in batches in the background
+                    # instead of one large cascading delete here.
                     task_id = session.task.id
                     task_code = session.task.code
 
                     with transaction.atomic():
-                        session.delete()
+                        session.status = AcquisitionSession.STATUS_STOPPED
+                        session.stopped_at = timezone.now()
+                        session.error_message = "Replaced by recovered session after restart"
+                        session.save(update_fields=['status', 'stopped_at', 'error_message', 'updated_at'])
+                    tasks.purge_session_data.delay(session.id)
 
                     # Start a new Celery task with task_id (not session_id)
                     celery_task = tasks.start_acquisition_task.delay(task_id)
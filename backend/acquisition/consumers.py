@@ -1,18 +1,186 @@
 """WebSocket consumers for real-time acquisition updates."""
+import asyncio
+import fnmatch
 import json
 import logging
+import re
+import struct
+import time
+from datetime import datetime
+from urllib.parse import parse_qs
+
+import msgpack
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.conf import settings
+
+from acquisition.services.live_broadcast import merge_frames
 
 logger = logging.getLogger(__name__)
 
 
+class PointSubscription:
+    """
+    Point codes and glob patterns (``TEMP_*``) a WebSocket client wants.
+
+    An empty subscription matches every point, so clients that never
+    subscribe keep receiving the whole session. Match results are cached
+    per point code until the subscription changes.
+    """
+
+    def __init__(self, max_entries: int = 1000) -> None:
+        self.codes = set()
+        self.patterns = set()
+        self.max_entries = max_entries
+        self._regex = None
+        self._cache = {}
+
+    @property
+    def active(self) -> bool:
+        return bool(self.codes or self.patterns)
+
+    def subscribe(self, codes=(), patterns=()) -> None:
+        new_codes = self.codes | {str(code) for code in codes}
+        new_patterns = self.patterns | {str(pattern) for pattern in patterns}
+        if len(new_codes) + len(new_patterns) > self.max_entries:
+            raise ValueError(f"订阅数量超过上限 {self.max_entries}")
+        self.codes, self.patterns = new_codes, new_patterns
+        self._changed()
+
+    def unsubscribe(self, codes=(), patterns=()) -> None:
+        self.codes.difference_update(str(code) for code in codes)
+        self.patterns.difference_update(str(pattern) for pattern in patterns)
+        self._changed()
+
+    def clear(self) -> None:
+        self.codes.clear()
+        self.patterns.clear()
+        self._changed()
+
+    def matches(self, point_code: str) -> bool:
+        if not self.active:
+            return True
+        result = self._cache.get(point_code)
+        if result is None:
+            result = point_code in self.codes or bool(self._regex and self._regex.match(point_code))
+            self._cache[point_code] = result
+        return result
+
+    def filter_points(self, points):
+        """Return the entries of ``points`` (dicts with ``point_code``) this client wants."""
+        if not self.active:
+            return points
+        return [point for point in points if self.matches(point['point_code'])]
+
+    def to_dict(self):
+        return {'points': sorted(self.codes), 'patterns': sorted(self.patterns)}
+
+    def _changed(self) -> None:
+        self._cache = {}
+        self._regex = (
+            re.compile('|'.join(fnmatch.translate(pattern) for pattern in self.patterns))
+            if self.patterns else None
+        )
+
+
+class BinaryFrameEncoder:
+    """
+    MessagePack encoding of data messages for one WebSocket connection.
+
+    Point codes are replaced by indexes. The code-to-index dictionary is
+    sent incrementally as ``{"type": "dict", "points": {code: index}}``
+    frames, each code only once per connection, before the first data
+    frame that uses it. Data frames are columnar; numeric columns are
+    little-endian packed arrays (``bin``) that map directly onto typed
+    arrays in the browser::
+
+        {"type": "live", "session_id": 1, "seq": 7,
+         "i": uint32[], "t": float64[] (epoch ms), "q": uint8[] (index into "quality"),
+         "v": float64[] or list (non-numeric values), "min"/"max": float64[] (NaN = none),
+         "n": uint32[] (samples over the interval)}
+    """
+
+    QUALITY = ('good', 'bad', 'uncertain')
+
+    def __init__(self) -> None:
+        self.index = {}
+        self._quality = {name: position for position, name in enumerate(self.QUALITY)}
+
+    def hello(self) -> bytes:
+        """First frame of the connection: the quality table."""
+        return msgpack.packb({'type': 'dict', 'points': {}, 'quality': list(self.QUALITY)})
+
+    def encode(self, message_type, points, **extra):
+        """
+        Encode points (dicts with ``point_code``, ``value``, ``timestamp``, ``quality``
+        and optionally ``min``/``max``/``count``) as binary frames.
+
+        Returns:
+            List of frames: a dictionary update when new codes appear, then the data frame
+        """
+        frames = []
+        new_codes = {}
+        for point in points:
+            code = point['point_code']
+            if code not in self.index:
+                self.index[code] = new_codes[code] = len(self.index)
+        if new_codes:
+            frames.append(msgpack.packb({'type': 'dict', 'points': new_codes}))
+
+        count = len(points)
+        values = [point.get('value') for point in points]
+        numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values)
+        frame = {
+            'type': message_type,
+            **extra,
+            'i': struct.pack(f'<{count}I', *(self.index[point['point_code']] for point in points)),
+            't': struct.pack(f'<{count}d', *(_epoch_ms(point.get('timestamp')) for point in points)),
+            'q': bytes(self._quality.get(point.get('quality'), 255) for point in points),
+            'v': struct.pack(f'<{count}d', *values) if numeric else values,
+        }
+        if any('count' in point for point in points):
+            nan = float('nan')
+            frame['min'] = struct.pack(f'<{count}d', *(_as_float(point.get('min'), nan) for point in points))
+            frame['max'] = struct.pack(f'<{count}d', *(_as_float(point.get('max'), nan) for point in points))
+            frame['n'] = struct.pack(f'<{count}I', *(int(point.get('count', 1)) for point in points))
+        frames.append(msgpack.packb(frame))
+        return frames
+
+
+def _epoch_ms(timestamp) -> float:
+    if not timestamp:
+        return float('nan')
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp() * 1000
+
+
+def _as_float(value, default: float) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return default
+
+
 class AcquisitionConsumer(AsyncWebsocketConsumer):
     """
     WebSocket consumer for real-time acquisition session updates.
 
     Usage:
-        ws://localhost:8000/ws/acquisition/sessions/{session_id}/
+        ws://localhost:8000/ws/acquisition/sessions/{session_id}/?max_fps=2
+
+    ``max_fps`` lowers the live frame rate of this client (capped by
+    ``ACQUISITION_LIVE_CLIENT_MAX_FPS``); frames arriving faster are merged.
+
+    Clients narrow data messages to some points by sending::
+
+        {"action": "subscribe", "points": ["TEMP_01"], "patterns": ["PRESS_*"]}
+        {"action": "unsubscribe", "points": ["TEMP_01"]}
+        {"action": "unsubscribe_all"}
+
+    Filtering happens here, per connection; until the first subscribe
+    every point of the session is sent.
+
+    ``?encoding=msgpack`` (or the ``msgpack`` subprotocol) switches data
+    messages to binary frames, see ``BinaryFrameEncoder``; control
+    messages stay JSON text.
     """
 
     async def connect(self):
@@ -20,13 +188,36 @@ class AcquisitionConsumer(AsyncWebsocketConsumer):
         self.session_id = self.scope['url_route']['kwargs']['session_id']
         self.session_group_name = f'acquisition_session_{self.session_id}'
 
+        # Per-client live frame rate cap
+        max_fps = float(getattr(settings, 'ACQUISITION_LIVE_CLIENT_MAX_FPS', 5.0))
+        query = parse_qs(self.scope.get('query_string', b'').decode())
+        try:
+            requested = float(query.get('max_fps', [max_fps])[0])
+            max_fps = min(max_fps, requested) if requested > 0 else max_fps
+        except ValueError:
+            pass
+        self.live_min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self._live_pending = None
+        self._live_last_sent = 0.0
+        self._live_flush_task = None
+        self.subscription = PointSubscription(
+            max_entries=getattr(settings, 'ACQUISITION_WS_MAX_SUBSCRIPTIONS', 1000)
+        )
+
+        # Encoding negotiated at connect time
+        subprotocol = 'msgpack' if 'msgpack' in self.scope.get('subprotocols', []) else None
+        binary = subprotocol or query.get('encoding', ['json'])[0] == 'msgpack'
+        self.encoder = BinaryFrameEncoder() if binary else None
+
         # Join session group
         await self.channel_layer.group_add(
             self.session_group_name,
             self.channel_name
         )
 
-        await self.accept()
+        await self.accept(subprotocol=subprotocol)
+        if self.encoder:
+            await self.send(bytes_data=self.encoder.hello())
 
         logger.info(f"WebSocket connected for session {self.session_id}")
 
@@ -42,6 +233,9 @@ class AcquisitionConsumer(AsyncWebsocketConsumer):
 
     async def disconnect(self, close_code):
         """Handle WebSocket disconnection."""
+        if self._live_flush_task:
+            self._live_flush_task.cancel()
+
         # Leave session group
         await self.channel_layer.group_discard(
             self.session_group_name,
@@ -51,8 +245,34 @@ class AcquisitionConsumer(AsyncWebsocketConsumer):
         logger.info(f"WebSocket disconnected for session {self.session_id}, code={close_code}")
 
     async def receive(self, text_data):
-        """Handle messages from WebSocket (not used in this implementation)."""
-        pass
+        """Handle subscribe/unsubscribe messages from the client."""
+        try:
+            message = json.loads(text_data or '{}')
+            action = message.get('action')
+            points = message.get('points') or []
+            patterns = message.get('patterns') or []
+            if not isinstance(points, list) or not isinstance(patterns, list):
+                raise ValueError("points 和 patterns 必须是列表")
+
+            if action == 'subscribe':
+                self.subscription.subscribe(points, patterns)
+            elif action == 'unsubscribe':
+                self.subscription.unsubscribe(points, patterns)
+            elif action == 'unsubscribe_all':
+                self.subscription.clear()
+            else:
+                raise ValueError(f"未知的操作: {action}")
+        except (ValueError, AttributeError) as e:
+            await self.send(text_data=json.dumps({
+                'type': 'error',
+                'data': {'detail': str(e)}
+            }))
+            return
+
+        await self.send(text_data=json.dumps({
+            'type': 'subscriptions',
+            'data': self.subscription.to_dict()
+        }))
 
     async def session_status_update(self, event):
         """
@@ -75,11 +295,81 @@ class AcquisitionConsumer(AsyncWebsocketConsumer):
 
         Called when a new data point is acquired.
         """
+        if not self.subscription.matches(event['data']['point_code']):
+            return
+        if self.encoder:
+            await self._send_binary('data_point', [event['data']], session_id=event['data'].get('session_id'))
+            return
         await self.send(text_data=json.dumps({
             'type': 'data_point',
             'data': event['data']
         }))
 
+    async def data_points_batch(self, event):
+        """
+        Handle a batch of data points from channel layer.
+
+        Sent once per bulk insert by ``DataPointWriter`` with the newest
+        value of each point in the batch.
+        """
+        data = event['data']
+        if self.subscription.active:
+            points = self.subscription.filter_points(data['points'])
+            if not points:
+                return
+            data = {**data, 'points': points}
+        if self.encoder:
+            await self._send_binary('data_points', data['points'], session_id=data.get('session_id'))
+            return
+        await self.send(text_data=json.dumps({
+            'type': 'data_points',
+            'data': data
+        }))
+
+    async def live_frame(self, event):
+        """
+        Handle a coalesced live frame from ``LiveBroadcaster``.
+
+        Frames arriving within ``live_min_interval`` of the last one sent
+        to this client are merged and sent once the interval has passed.
+        """
+        frame = event['data']
+        if self.subscription.active:
+            points = self.subscription.filter_points(frame['points'])
+            if not points:
+                return
+            frame = {**frame, 'points': points}
+        self._live_pending = merge_frames(self._live_pending, frame)
+        if self._live_flush_task:
+            return
+        delay = self._live_last_sent + self.live_min_interval - time.monotonic()
+        if delay > 0:
+            self._live_flush_task = asyncio.ensure_future(self._send_live_later(delay))
+        else:
+            await self._send_live()
+
+    async def _send_live_later(self, delay):
+        await asyncio.sleep(delay)
+        self._live_flush_task = None
+        await self._send_live()
+
+    async def _send_live(self):
+        frame, self._live_pending = self._live_pending, None
+        if not frame:
+            return
+        self._live_last_sent = time.monotonic()
+        if self.encoder:
+            await self._send_binary('live', frame['points'], session_id=frame.get('session_id'), seq=frame.get('seq'))
+            return
+        await self.send(text_data=json.dumps({
+            'type': 'live',
+            'data': frame
+        }))
+
+    async def _send_binary(self, message_type, points, **extra):
+        for payload in self.encoder.encode(message_type, points, **extra):
+            await self.send(bytes_data=payload)
+
     async def session_error(self, event):
         """Handle session error notification."""
         await self.send(text_data=json.dumps({
@@ -91,6 +381,7 @@ class AcquisitionConsumer(AsyncWebsocketConsumer):
     def get_session_status(self):
         """Fetch current session status from database."""
         from acquisition import models as acq_models
+        from acquisition.services.session_stats import session_counters
         from django.core.exceptions import ObjectDoesNotExist
 
         try:
@@ -98,19 +389,8 @@ class AcquisitionConsumer(AsyncWebsocketConsumer):
                 pk=self.session_id
             )
 
-            # Count data points
-            data_points_count = acq_models.DataPoint.objects.filter(
-                session=session
-            ).count()
-
-            error_count = acq_models.DataPoint.objects.filter(
-                session=session,
-                quality__in=['bad', 'uncertain']
-            ).count()
-
-            last_data_point = acq_models.DataPoint.objects.filter(
-                session=session
-            ).order_by('-timestamp').first()
+            # Counters materialized by the acquisition pipeline
+            counters = session_counters(session)
 
             duration_seconds = None
             if session.started_at:
@@ -126,9 +406,10 @@ class AcquisitionConsumer(AsyncWebsocketConsumer):
                 'started_at': session.started_at.isoformat() if session.started_at else None,
                 'stopped_at': session.stopped_at.isoformat() if session.stopped_at else None,
                 'duration_seconds': duration_seconds,
-                'points_read': data_points_count,
-                'last_read_time': last_data_point.timestamp.isoformat() if last_data_point else None,
-                'error_count': error_count,
+                'points_read': counters['points_read'],
+                'last_read_time': counters['last_read_time'].isoformat() if counters['last_read_time'] else None,
+                'error_count': counters['error_count'],
+                'points_per_second': counters['points_per_second'],
                 'error_message': session.error_message,
             }
 
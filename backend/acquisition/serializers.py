@@ -60,6 +60,7 @@ class SessionStatusSerializer(serializers.Serializer):
     points_read = serializers.IntegerField()
     last_read_time = serializers.DateTimeField(allow_null=True)
     error_count = serializers.IntegerField()
+    points_per_second = serializers.FloatField()
     error_message = serializers.CharField(allow_blank=True)
     metadata = serializers.JSONField()
 
@@ -89,6 +90,32 @@ class StopSessionSerializer(serializers.Serializer):
     reason = serializers.CharField(required=False, allow_blank=True, max_length=500)
 
 
+class CurrentValuesRequestSerializer(serializers.Serializer):
+    """批量查询当前值请求序列化器"""
+
+    point_codes = serializers.ListField(child=serializers.CharField(max_length=128), required=False, default=list)
+    task_id = serializers.IntegerField(required=False, allow_null=True)
+
+    def validate(self, attrs):
+        if not attrs.get('point_codes') and not attrs.get('task_id'):
+            raise serializers.ValidationError("需要提供 point_codes 或 task_id")
+        return attrs
+
+
+class BatchHistoryRequestSerializer(serializers.Serializer):
+    """批量历史数据查询请求序列化器"""
+
+    point_codes = serializers.ListField(child=serializers.CharField(max_length=128), allow_empty=False)
+    start_time = serializers.CharField(required=False, default='-1h')
+    end_time = serializers.CharField(required=False, default='now()')
+    fields = serializers.ListField(child=serializers.CharField(max_length=128), required=False, default=list)
+    limit = serializers.IntegerField(required=False, min_value=1, default=1000)
+    max_points = serializers.IntegerField(required=False, min_value=2, allow_null=True)
+    downsample = serializers.CharField(required=False, allow_blank=True)
+    tier = serializers.CharField(required=False, allow_blank=True)
+    bucket = serializers.CharField(required=False, allow_blank=True)
+
+
 class DataPointSerializer(serializers.ModelSerializer):
     """数据点序列化器"""
 
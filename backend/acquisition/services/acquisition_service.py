@@ -10,11 +10,77 @@ from django.conf import settings
 
 from acquisition import models as acq_models
 from acquisition.protocols import ProtocolRegistry
+from acquisition.services.data_point_writer import DataPointWriter
+from acquisition.services.latest_values import build_latest_records, get_latest_value_store
+from acquisition.services.live_broadcast import LiveBroadcaster
+from acquisition.services.pipeline_tap import build_taps
+from acquisition.services.session_stats import COUNTERS_KEY, SessionCounters
 from configuration import models as config_models
 from storage import StorageRegistry
+from storage.fanout import FanoutWriter
 
 logger = logging.getLogger(__name__)
 
+# Per-sink worker options accepted in sink specs
+SINK_WORKER_OPTIONS = ("queue_size", "max_retries", "retry_backoff", "max_backoff", "max_batch_points")
+
+
+def build_storage_config(storage_type: str) -> Dict[str, Any]:
+    """
+    Build the default configuration of a storage type from Django settings.
+
+    Args:
+        storage_type: Registered storage name (e.g., 'influxdb', 'kafka')
+
+    Returns:
+        Config dict (empty for types without settings-based defaults)
+    """
+    if storage_type == "influxdb":
+        # InfluxDB storage - using HTTP API mode for remote server
+        return {
+            "url": getattr(settings, "INFLUXDB_URL", None),  # Full URL if provided
+            "host": getattr(settings, "INFLUXDB_HOST", "localhost"),
+            "port": getattr(settings, "INFLUXDB_PORT", 8086),
+            "token": getattr(settings, "INFLUXDB_TOKEN", ""),
+            "org": getattr(settings, "INFLUXDB_ORG", "default"),
+            "bucket": getattr(settings, "INFLUXDB_BUCKET", "default"),
+            "docker_mode": False,  # Use HTTP API for remote InfluxDB
+            "write_mode": getattr(settings, "INFLUXDB_WRITE_MODE", "sync"),
+            "enable_gzip": getattr(settings, "INFLUXDB_ENABLE_GZIP", True),
+            "batch_size": getattr(settings, "INFLUXDB_BATCH_SIZE", 5000),
+            "flush_interval": getattr(settings, "INFLUXDB_FLUSH_INTERVAL_MS", 1000),
+            "jitter_interval": getattr(settings, "INFLUXDB_JITTER_INTERVAL_MS", 0),
+            "retry_interval": getattr(settings, "INFLUXDB_RETRY_INTERVAL_MS", 5000),
+            "max_retries": getattr(settings, "INFLUXDB_MAX_RETRIES", 5),
+            "max_retry_delay": getattr(settings, "INFLUXDB_MAX_RETRY_DELAY_MS", 125000),
+            "max_retry_time": getattr(settings, "INFLUXDB_MAX_RETRY_TIME_MS", 180000),
+        }
+    if storage_type == "kafka":
+        # Kafka storage - optional stream for downstream analytics
+        return {
+            "bootstrap_servers": getattr(settings, "KAFKA_BOOTSTRAP_SERVERS", "localhost:9092"),
+            "topic": getattr(settings, "KAFKA_TOPIC", "acquisition_data"),
+            "compression_type": getattr(settings, "KAFKA_COMPRESSION_TYPE", "gzip"),
+            "linger_ms": getattr(settings, "KAFKA_LINGER_MS", 20),
+            "batch_size": getattr(settings, "KAFKA_BATCH_SIZE", 262144),
+            "acks": getattr(settings, "KAFKA_ACKS", "1"),
+        }
+    if storage_type == "local":
+        # Embedded store on the edge node - buffering and offline history
+        return {
+            "path": getattr(settings, "ACQUISITION_LOCAL_STORE_PATH", "edge_tsdb.sqlite3"),
+            "max_bytes": getattr(settings, "ACQUISITION_LOCAL_STORE_MAX_BYTES", 512 * 1024 * 1024),
+            "max_age_seconds": getattr(settings, "ACQUISITION_LOCAL_STORE_MAX_AGE", None),
+        }
+    if storage_type == "archive":
+        return {
+            "root": getattr(settings, "ACQUISITION_ARCHIVE_ROOT", "archive"),
+            "compression": getattr(settings, "ACQUISITION_ARCHIVE_COMPRESSION", "zstd"),
+            "flush_rows": getattr(settings, "ACQUISITION_ARCHIVE_FLUSH_ROWS", 100000),
+            "flush_interval": getattr(settings, "ACQUISITION_ARCHIVE_FLUSH_INTERVAL", 300.0),
+        }
+    return {}
+
 
 class AcquisitionService:
     """
@@ -39,36 +105,114 @@ class AcquisitionService:
         self.session = session
         self.logger = logging.getLogger(f"{__name__}.{task.code}")
 
+        # Group points by device for efficient reading
+        self.point_meta: Dict[str, Dict[str, Any]] = {}
+        self.device_groups = self._group_points_by_device()
+
         # Initialize storage backends
+        self.sink_options: Dict[str, Dict[str, Any]] = {}
         self.storages = self._init_storages()
 
-        # Group points by device for efficient reading
-        self.device_groups = self._group_points_by_device()
+        # Current value per point for HMI/current-values API
+        self.latest_values = get_latest_value_store()
+
+        # Running totals for the status APIs, resumed from the last flush
+        metadata = session.metadata if isinstance(session.metadata, dict) else {}
+        self.counters = SessionCounters(metadata.get(COUNTERS_KEY))
+        self._last_health_flush = 0.0
+
+        # Live taps fed straight from the pipeline (channel-layer frames, Redis stream), no database round trip
+        self.live_taps = (
+            build_taps(session.id) if getattr(settings, "ACQUISITION_LIVE_BROADCAST_ENABLED", True) else []
+        )
+
+        # Optional sampled mirror of readings into the DataPoint table
+        self.data_point_writer = DataPointWriter(
+            session,
+            sample_ratio=getattr(settings, "ACQUISITION_SQL_SAMPLE_RATIO", 0.0),
+            notify=not any(isinstance(tap, LiveBroadcaster) for tap in self.live_taps),
+        )
+
+    def _resolve_sink_specs(self) -> List[Dict[str, Any]]:
+        """
+        Resolve the storage sinks this task writes to.
+
+        Precedence: ``AcqTask.storage_sinks`` > ``ACQUISITION_SITE_STORAGE_SINKS[site_code]``
+        > ``ACQUISITION_STORAGE_SINKS``. Each entry is either a storage type name
+        (``"influxdb"``) or a dict::
+
+            {"name": "kafka-analytics", "type": "kafka",
+             "config": {"topic": "analytics"}, "queue_size": 2000, "max_retries": 10}
+
+        ``config`` is merged over the settings-derived defaults of that type.
+        """
+        specs = self.task.storage_sinks or None
+
+        if not specs:
+            site_sinks = getattr(settings, "ACQUISITION_SITE_STORAGE_SINKS", None)
+            site_code = self._task_site_code()
+            if isinstance(site_sinks, dict) and site_code in site_sinks:
+                specs = site_sinks[site_code]
+
+        if not specs:
+            specs = getattr(settings, "ACQUISITION_STORAGE_SINKS", None)
+            if not isinstance(specs, (list, tuple)) or not specs:
+                specs = ["influxdb"]
+                if getattr(settings, "KAFKA_ENABLED", False):
+                    specs.append("kafka")
+
+        resolved = []
+        for spec in specs:
+            if isinstance(spec, str):
+                spec = {"name": spec, "type": spec}
+            storage_type = spec.get("type") or spec.get("name")
+            resolved.append({
+                **spec,
+                "name": spec.get("name") or storage_type,
+                "type": storage_type,
+                "config": {**build_storage_config(storage_type), **(spec.get("config") or {})},
+            })
+        return resolved
+
+    def _task_site_code(self):
+        """Return the site code of the task's devices (first device wins)."""
+        for group in self.device_groups.values():
+            return group["device"].site.code
+        return None
 
     def _init_storages(self) -> Dict[str, Any]:
-        """Initialize configured storage backends."""
+        """
+        Create the configured storage backends.
+
+        Nothing connects here: sink workers connect from their own threads
+        and single-shot writes connect on first use.
+        """
         storages = {}
 
-        # InfluxDB storage - using HTTP API mode for remote server
-        influx_config = {
-            "url": getattr(settings, "INFLUXDB_URL", None),  # Full URL if provided
-            "host": getattr(settings, "INFLUXDB_HOST", "localhost"),
-            "port": getattr(settings, "INFLUXDB_PORT", 8086),
-            "token": getattr(settings, "INFLUXDB_TOKEN", ""),
-            "org": getattr(settings, "INFLUXDB_ORG", "default"),
-            "bucket": getattr(settings, "INFLUXDB_BUCKET", "default"),
-            "docker_mode": False,  # Use HTTP API for remote InfluxDB
-        }
-        try:
-            influx = StorageRegistry.create("influxdb", influx_config)
-            influx.connect()
-            storages["influxdb"] = influx
-            self.logger.info("InfluxDB storage initialized")
-        except Exception as e:
-            self.logger.warning(f"Failed to initialize InfluxDB: {e}")
+        for spec in self._resolve_sink_specs():
+            name = spec["name"]
+            try:
+                storages[name] = StorageRegistry.create(spec["type"], spec["config"])
+                self.sink_options[name] = {
+                    key: spec[key] for key in SINK_WORKER_OPTIONS if key in spec
+                }
+                self.logger.info(f"Storage sink {name} ({spec['type']}) initialized")
+            except Exception as e:
+                self.logger.warning(f"Failed to initialize storage sink {name}: {e}")
 
         return storages
 
+    def _start_fanout(self) -> FanoutWriter:
+        """Start one isolated queue/worker per storage sink."""
+        defaults = {
+            "queue_size": getattr(settings, "ACQUISITION_SINK_QUEUE_SIZE", 1000),
+            "max_retries": getattr(settings, "ACQUISITION_SINK_MAX_RETRIES", 5),
+        }
+        fanout = FanoutWriter()
+        for name, storage in self.storages.items():
+            fanout.add_sink(name, storage, **{**defaults, **self.sink_options.get(name, {})})
+        return fanout
+
     def _group_points_by_device(self) -> Dict[int, Dict[str, Any]]:
         """
         Group points by device for batch reading.
@@ -93,9 +237,35 @@ class AcquisitionService:
                 "precision": int(point.template.precision) if point.template else 2,
             }
             groups[device_id]["points"].append(point_config)
+            self.point_meta[point.code] = self._build_point_meta(point)
 
         return dict(groups)
 
+    @staticmethod
+    def _build_point_meta(point: config_models.Point) -> Dict[str, Any]:
+        """
+        Precompute the measurement and static tags of a point.
+
+        Resolved once per task so formatting a reading needs no database
+        lookups and the storage series key stays stable per point.
+        """
+        device = point.device
+        tags = {
+            "site": device.site.code,
+            "device": device.code,
+            "point": point.code,
+        }
+        if point.template:
+            tags["cn_name"] = point.template.name
+            tags["unit"] = point.template.unit
+
+        return {
+            "measurement": device.metadata.get("device_a_tag", device.code) if device.metadata else device.code,
+            "tags": tags,
+            # Full tag dicts per quality, shared by all samples (filled lazily)
+            "tag_sets": {},
+        }
+
     def acquire_once(self) -> Dict[str, Any]:
         """
         Perform single acquisition cycle.
@@ -134,7 +304,10 @@ class AcquisitionService:
                 errors.append({"device": device.code, "error": str(e)})
 
         # Write to storage
+        self.counters.record(all_data)
         if all_data:
+            self._update_latest_values(all_data)
+            self._publish_live(all_data)
             self._write_to_storage(all_data)
 
         return {
@@ -174,6 +347,10 @@ class AcquisitionService:
         device_protocols = {}
         device_health = {}  # Track last successful read time
 
+        # One isolated queue/worker per sink so a slow sink never blocks polling
+        fanout = self._start_fanout()
+        batch_buffer = []
+
         try:
             # Establish all protocol connections upfront
             for device_id, group in self.device_groups.items():
@@ -203,12 +380,12 @@ class AcquisitionService:
                     }
 
             # Batch data buffer
-            batch_buffer = []
             batch_start_time = time.time()
 
             # Main acquisition loop
             while self._should_continue():
                 cycle_start = time.time()
+                cycle_data = []
 
                 # Read from all devices
                 for device_id, group in self.device_groups.items():
@@ -243,6 +420,7 @@ class AcquisitionService:
                         readings = protocol.read_points(points)
                         formatted_data = self._format_for_storage(readings, device)
                         batch_buffer.extend(formatted_data)
+                        cycle_data.extend(formatted_data)
 
                         # Update health status
                         device_health[device_id]["last_success"] = time.time()
@@ -272,10 +450,16 @@ class AcquisitionService:
                         else:
                             device_health[device_id]["status"] = "error"
 
+                # Publish current values every cycle, independent of storage batching
+                self.counters.record(cycle_data)
+                self._update_latest_values(cycle_data)
+                self._publish_live(cycle_data)
+
                 # Write batch to storage if buffer is full or timeout reached
                 batch_elapsed = time.time() - batch_start_time
                 if batch_buffer and (len(batch_buffer) >= batch_size or batch_elapsed >= batch_timeout):
-                    self._write_to_storage(batch_buffer)
+                    fanout.submit(batch_buffer)
+                    self._mirror_to_sql(batch_buffer)
                     total_points += len(batch_buffer)
                     batch_buffer = []
                     batch_start_time = time.time()
@@ -283,7 +467,7 @@ class AcquisitionService:
                 total_cycles += 1
 
                 # Update session with health info
-                self._update_session_health(device_health)
+                self._update_session_health(device_health, fanout.stats())
 
                 # Sleep based on task schedule
                 cycle_duration = time.time() - cycle_start
@@ -299,11 +483,15 @@ class AcquisitionService:
         finally:
             # Write any remaining buffered data
             if batch_buffer:
-                try:
-                    self._write_to_storage(batch_buffer)
-                    total_points += len(batch_buffer)
-                except Exception as e:
-                    self.logger.error(f"Failed to write final batch: {e}")
+                fanout.submit(batch_buffer)
+                self._mirror_to_sql(batch_buffer)
+                total_points += len(batch_buffer)
+            self._close_sql_mirror()
+            self._close_live_taps()
+
+            # Drain sink queues; each worker disconnects its storage when its thread exits
+            fanout.stop(timeout=getattr(settings, "ACQUISITION_SINK_DRAIN_TIMEOUT", 10.0))
+            self._update_session_health(device_health, fanout.stats(), force=True)
 
             # Disconnect all protocols
             for device_id, protocol in device_protocols.items():
@@ -315,19 +503,13 @@ class AcquisitionService:
                     except Exception as e:
                         self.logger.warning(f"Error disconnecting protocol: {e}")
 
-            # Clean up storage connections
-            for storage in self.storages.values():
-                try:
-                    storage.disconnect()
-                except Exception as e:
-                    self.logger.warning(f"Error disconnecting storage: {e}")
-
         return {
             "status": "completed",
             "total_cycles": total_cycles,
             "total_points": total_points,
             "errors": errors[-10:],  # Last 10 errors
             "device_health": device_health,
+            "storage_sinks": fanout.stats(),
         }
 
     def _should_continue(self) -> bool:
@@ -363,61 +545,116 @@ class AcquisitionService:
             Formatted data points (only good quality data)
         """
         formatted = []
+        # Use current time for timestamp (server-side time) instead of device timestamp
+        # This ensures timestamps are always valid and in sync with the data collection system
+        current_timestamp = int(time.time() * 1e9)  # Convert to nanoseconds
 
         for reading in readings:
-            # Get point details
-            point = self.task.points.filter(code=reading["code"]).first()
-            if not point:
+            meta = self.point_meta.get(reading["code"])
+            if not meta:
                 continue
 
             # All readings should have good quality and real values
             # Protocol layer raises exceptions instead of returning bad/None data
             quality = reading.get("quality", "good")
 
-            # Prepare data point
-            # Use current time for timestamp (server-side time) instead of device timestamp
-            # This ensures timestamps are always valid and in sync with the data collection system
-            current_timestamp = int(time.time() * 1e9)  # Convert to nanoseconds
-
-            data_point = {
-                "measurement": device.metadata.get("device_a_tag", device.code) if device.metadata else device.code,
-                "tags": {
-                    "site": device.site.code,
-                    "device": device.code,
-                    "point": reading["code"],
-                    "quality": quality,
-                },
+            # Samples of one series share one tags dict; sinks must not mutate it
+            tags = meta["tag_sets"].get(quality)
+            if tags is None:
+                tags = meta["tag_sets"][quality] = {**meta["tags"], "quality": quality}
+
+            formatted.append({
+                "measurement": meta["measurement"],
+                "tags": tags,
                 "fields": {
                     reading["code"]: reading["value"],
                 },
                 "time": current_timestamp,
-            }
+            })
 
-            # Add template info if available
-            if point.template:
-                data_point["tags"]["cn_name"] = point.template.name
-                data_point["tags"]["unit"] = point.template.unit
+        return formatted
+
+    def _update_latest_values(self, data: List[Dict[str, Any]]) -> None:
+        """Record the newest reading of each point in the latest-value store."""
+        if not data:
+            return
+        try:
+            self.latest_values.update(build_latest_records(data, self.session.id))
+        except Exception as e:
+            self.logger.warning(f"Failed to update latest values: {e}")
 
-            formatted.append(data_point)
+    def _publish_live(self, data: List[Dict[str, Any]]) -> None:
+        """Hand formatted readings to every live tap; a failing tap never blocks acquisition."""
+        if not data:
+            return
+        for tap in self.live_taps:
+            try:
+                tap.add(data)
+            except Exception as e:
+                self.logger.warning(f"Failed to publish live data to {type(tap).__name__}: {e}")
 
-        return formatted
+    def _close_live_taps(self) -> None:
+        for tap in self.live_taps:
+            try:
+                tap.close()
+            except Exception as e:
+                self.logger.warning(f"Failed to close live tap {type(tap).__name__}: {e}")
+
+    def _mirror_to_sql(self, data: List[Dict[str, Any]]) -> None:
+        """Add sampled readings to the DataPoint writer queue (no-op at ratio 0)."""
+        if not self.data_point_writer.enabled:
+            return
+        try:
+            self.data_point_writer.add(data)
+        except Exception as e:
+            self.logger.warning(f"Failed to mirror data points to SQL: {e}")
+
+    def _close_sql_mirror(self) -> None:
+        """Drain the DataPoint writer thread at the end of the session."""
+        if not self.data_point_writer.enabled:
+            return
+        try:
+            self.data_point_writer.close(timeout=getattr(settings, "ACQUISITION_SINK_DRAIN_TIMEOUT", 10.0))
+        except Exception as e:
+            self.logger.warning(f"Failed to flush data points to SQL: {e}")
 
     def _write_to_storage(self, data: List[Dict[str, Any]]) -> None:
-        """Write data to all configured storage backends (InfluxDB)."""
+        """
+        Write data synchronously to all configured storage backends.
+
+        Used for single-shot acquisition; the continuous loop goes through
+        the per-sink queues of ``FanoutWriter`` instead.
+        """
         for storage_name, storage in self.storages.items():
             try:
+                if not storage.is_connected:
+                    storage.connect()
                 storage.write(data)
                 self.logger.debug(f"Wrote {len(data)} points to {storage_name}")
             except Exception as e:
                 self.logger.error(f"Failed to write to {storage_name}: {e}")
 
-    def _update_session_health(self, device_health: Dict[int, Dict[str, Any]]) -> None:
+    def _update_session_health(
+        self,
+        device_health: Dict[int, Dict[str, Any]],
+        sink_stats: Dict[str, Dict[str, Any]] = None,
+        force: bool = False,
+    ) -> None:
         """
-        Update session metadata with device health information.
+        Update session metadata with device and storage sink health and counters.
+
+        Saved at most every ACQUISITION_SESSION_STATS_FLUSH_INTERVAL seconds
+        unless ``force`` is set.
 
         Args:
             device_health: Dict mapping device_id to health status
+            sink_stats: Optional per-sink queue/retry stats
+            force: Save even if the flush interval has not elapsed
         """
+        now = time.monotonic()
+        if not force and now - self._last_health_flush < getattr(settings, "ACQUISITION_SESSION_STATS_FLUSH_INTERVAL", 5.0):
+            return
+        self._last_health_flush = now
         try:
             # Format health info for storage
             health_summary = {}
@@ -432,6 +669,9 @@ class AcquisitionService:
             # Update session metadata
             self.session.metadata = self.session.metadata or {}
             self.session.metadata["device_health"] = health_summary
+            if sink_stats is not None:
+                self.session.metadata["storage_sinks"] = sink_stats
+            self.session.metadata[COUNTERS_KEY] = self.counters.snapshot()
             self.session.metadata["last_health_update"] = time.time()
             self.session.save(update_fields=["metadata", "updated_at"])
 
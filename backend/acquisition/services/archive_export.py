@@ -0,0 +1,169 @@
+"""Export of InfluxDB history into the columnar Parquet archive."""
+from __future__ import annotations
+
+import glob
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from acquisition.services.acquisition_service import build_storage_config
+from acquisition.services.history_service import flux_string, format_time, parse_timestamp
+from storage import StorageRegistry
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FILE_PREFIX = "export"
+
+# Columns of Flux result rows that are not series tags
+_NON_TAG_COLUMNS = {"result", "table", "_start", "_stop", "_time", "_value", "_field", "_measurement"}
+
+
+def build_export_flux(bucket: str, start: datetime, stop: datetime, site: Optional[str] = None) -> str:
+    """Build the Flux query reading raw samples of one range (optionally one site)."""
+    lines = [
+        f"from(bucket: {flux_string(bucket)})",
+        f"  |> range(start: {format_time(start)}, stop: {format_time(stop)})",
+    ]
+    if site:
+        lines.append(f'  |> filter(fn: (r) => r["site"] == {flux_string(site)})')
+    lines.append('  |> drop(columns: ["_start", "_stop"])')
+    return "\n".join(lines)
+
+
+def row_to_point(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Convert a Flux result row to the ``BaseStorage.write`` data point format."""
+    if row.get("_time") is None or row.get("_value") is None:
+        return None
+    return {
+        "measurement": row.get("_measurement"),
+        "tags": {k: v for k, v in row.items() if k not in _NON_TAG_COLUMNS and v is not None},
+        "fields": {row.get("_field"): row["_value"]},
+        "time": round(parse_timestamp(row["_time"]) * 1e6) * 1000,
+    }
+
+
+def _day_files(root: str, day: str, site: Optional[str], prefix: str) -> List[str]:
+    pattern = os.path.join(root, f"site={site or '*'}", "device=*", f"date={day}", f"{prefix}-*.parquet")
+    return glob.glob(pattern)
+
+
+def discard_staged_day(root: str, day: str, site: Optional[str], staging_prefix: str) -> int:
+    """Remove the staged files of a failed export of ``day``; the published files stay."""
+    paths = _day_files(root, day, site, staging_prefix)
+    for path in paths:
+        os.remove(path)
+    return len(paths)
+
+
+def publish_exported_day(root: str, day: str, site: Optional[str], staging_prefix: str) -> int:
+    """
+    Swap the staged files of ``day`` in for the files of a previous export.
+
+    Staged files start with ``_``, which hive readers (``pyarrow.dataset``,
+    pandas) skip, so the previous export stays visible until the new one
+    is complete.
+    """
+    staged = _day_files(root, day, site, staging_prefix)
+    for path in _day_files(root, day, site, EXPORT_FILE_PREFIX):
+        os.remove(path)
+    for path in staged:
+        directory, name = os.path.split(path)
+        os.replace(path, os.path.join(directory, EXPORT_FILE_PREFIX + name[len(staging_prefix):]))
+    return len(staged)
+
+
+def _chunks(start: datetime, stop: datetime, step: timedelta) -> Iterable[tuple]:
+    cursor = start
+    while cursor < stop:
+        chunk_stop = min(cursor + step, stop)
+        yield cursor, chunk_stop
+        cursor = chunk_stop
+
+
+def export_archive(
+    start: datetime,
+    stop: datetime,
+    storage: Any = None,
+    archive: Any = None,
+    site: Optional[str] = None,
+    chunk: timedelta = timedelta(hours=1),
+    batch_size: int = 5000,
+) -> Dict[str, Any]:
+    """
+    Export raw samples of ``[start, stop)`` into the Parquet archive.
+
+    The range is processed one UTC day at a time: the day is queried in
+    ``chunk`` steps and streamed into the archive as hidden staging files,
+    which are flushed at the end of the day and then swapped in for the
+    files of a previous export. A failed day keeps its previous export. A
+    (site, device, day) partition gets one file per run unless it holds
+    more than the archive's ``flush_rows``.
+
+    Args:
+        start, stop: Range to export
+        storage: Connected InfluxDB storage (defaults to the shared query storage)
+        archive: Archive storage (defaults to one built from settings)
+        site: Only export this site
+        chunk: Query range per Flux request
+        batch_size: Data points handed to the archive per write
+
+    Returns:
+        ``{"days": [...], "rows": n}``
+    """
+    if storage is None:
+        from acquisition.services.history_service import get_query_storage
+        storage = get_query_storage()
+    staging_prefix = f"_{EXPORT_FILE_PREFIX}.{uuid.uuid4().hex[:8]}"
+    if archive is None:
+        archive = StorageRegistry.create(
+            "archive", {**build_storage_config("archive"), "flush_interval": float("inf")}
+        )
+    archive.file_prefix = staging_prefix
+    archive.connect()
+
+    days: List[Dict[str, Any]] = []
+    total = 0
+    day_start = start.astimezone(dt_timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    while day_start < stop:
+        day_stop = day_start + timedelta(days=1)
+        day = day_start.strftime("%Y-%m-%d")
+
+        rows = 0
+        batch: List[Dict[str, Any]] = []
+        try:
+            for chunk_start, chunk_stop in _chunks(max(start, day_start), min(stop, day_stop), chunk):
+                flux = build_export_flux(storage.bucket, chunk_start, chunk_stop, site)
+                for row in storage.iter_query_rows(flux):
+                    point = row_to_point(row)
+                    if point is None:
+                        continue
+                    batch.append(point)
+                    if len(batch) >= batch_size:
+                        archive.write(batch)
+                        rows += len(batch)
+                        batch = []
+            if batch:
+                archive.write(batch)
+                rows += len(batch)
+            archive.flush()
+        except Exception:
+            discard_staged_day(archive.root, day, site, staging_prefix)
+            raise
+        publish_exported_day(archive.root, day, site, staging_prefix)
+
+        logger.info(f"Exported {rows} samples of {day} to archive {archive.root}")
+        days.append({"date": day, "rows": rows})
+        total += rows
+        day_start = day_stop
+
+    return {"days": days, "rows": total}
+
+
+def previous_day_range(now: Optional[datetime] = None) -> tuple:
+    """Return ``[start, stop)`` of the last complete UTC day."""
+    now = now or datetime.now(dt_timezone.utc)
+    stop = now.astimezone(dt_timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return stop - timedelta(days=1), stop
+
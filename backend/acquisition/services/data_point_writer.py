@@ -0,0 +1,235 @@
+"""Batched ingestion of acquisition samples into the DataPoint table."""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import connection
+
+from acquisition import models as acq_models
+
+logger = logging.getLogger(__name__)
+
+
+class DataPointWriter:
+    """
+    Mirror acquisition samples into ``DataPoint`` with ``bulk_create``.
+
+    Samples are buffered and inserted ``batch_size`` rows per statement.
+    ``bulk_create`` does not fire ``post_save``, so instead of one
+    ``data_point_created`` notification per row, each flushed batch sends
+    one ``data_points_batch`` message to the session group (when ``notify``
+    is set). ``sample_ratio`` selects the share of samples that land in SQL;
+    selection is evenly spaced rather than random (0.25 keeps every fourth
+    sample).
+
+    With ``background`` set (the default), full batches are handed to a
+    writer thread through a bounded queue, like the sink workers of
+    ``FanoutWriter``: ``add`` and ``flush`` never wait for the database or
+    the channel layer, and when the queue is full the oldest batch is
+    dropped so a slow database cannot stall acquisition. ``close`` drains
+    the queue at the end of a session.
+    """
+
+    def __init__(
+        self,
+        session: acq_models.AcquisitionSession,
+        batch_size: Optional[int] = None,
+        sample_ratio: float = 1.0,
+        notify: bool = True,
+        background: bool = True,
+        queue_size: Optional[int] = None,
+    ) -> None:
+        """
+        Args:
+            session: Session the rows belong to
+            batch_size: Rows per flush/INSERT (default ACQUISITION_SQL_BATCH_SIZE)
+            sample_ratio: Share of samples written, 0..1 (0 disables the writer)
+            notify: Send one aggregated WebSocket notification per flushed batch
+            background: Insert in a writer thread instead of the calling thread
+            queue_size: Max batches waiting for the writer thread (default ACQUISITION_SQL_QUEUE_SIZE)
+        """
+        self.session = session
+        self.batch_size = max(1, int(batch_size or getattr(settings, "ACQUISITION_SQL_BATCH_SIZE", 500)))
+        self.sample_ratio = min(1.0, max(0.0, float(sample_ratio)))
+        self.notify = notify
+
+        self.background = background
+
+        self._buffer: List[acq_models.DataPoint] = []
+        self._credit = 0.0
+        self._lock = threading.Lock()
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.samples_skipped = 0
+
+        self._queue: queue.Queue = queue.Queue(
+            maxsize=max(1, int(queue_size or getattr(settings, "ACQUISITION_SQL_QUEUE_SIZE", 100)))
+        )
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_ratio > 0
+
+    def add(self, data: Iterable[Dict[str, Any]]) -> None:
+        """
+        Buffer storage data points, flushing whenever a batch is full.
+
+        Args:
+            data: Data points in the ``BaseStorage.write`` format
+        """
+        if not self.enabled:
+            return
+        for point in data:
+            timestamp = point.get("time")
+            timestamp = (
+                datetime.fromtimestamp(timestamp / 1e9, tz=dt_timezone.utc)
+                if timestamp else datetime.now(dt_timezone.utc)
+            )
+            quality = (point.get("tags") or {}).get("quality", "good")
+            for code, value in (point.get("fields") or {}).items():
+                if not self._sample():
+                    self.samples_skipped += 1
+                    continue
+                self._buffer.append(acq_models.DataPoint(
+                    session=self.session,
+                    point_code=code,
+                    timestamp=timestamp,
+                    value=value,
+                    quality=quality,
+                ))
+                if len(self._buffer) >= self.batch_size:
+                    self.flush()
+
+    def flush(self) -> int:
+        """
+        Hand buffered rows to the writer (inserted right away without ``background``).
+
+        Returns:
+            Number of rows handed over
+        """
+        if not self._buffer:
+            return 0
+        rows, self._buffer = self._buffer, []
+        if self.background:
+            self._submit(rows)
+        else:
+            self._write(rows)
+        return len(rows)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """
+        Flush the buffer and stop the writer thread, draining queued batches
+        for up to ``timeout`` seconds. Batches still queued afterwards are dropped.
+        """
+        self.flush()
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                logger.warning(f"Data point writer of session {self.session.id} did not drain within {timeout}s")
+        while True:
+            try:
+                self._record_drop(self._queue.get_nowait(), "shutdown")
+            except queue.Empty:
+                break
+
+    def _submit(self, rows: List[acq_models.DataPoint]) -> None:
+        """Enqueue a batch without blocking, dropping the oldest one when the queue is full."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name=f"datapoint-writer-{self.session.id}", daemon=True
+            )
+            self._thread.start()
+        try:
+            self._queue.put_nowait(rows)
+        except queue.Full:
+            try:
+                self._record_drop(self._queue.get_nowait(), "queue full")
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(rows)
+            except queue.Full:
+                self._record_drop(rows, "queue full")
+
+    def _run(self) -> None:
+        """Writer thread: insert queued batches until stopped and drained."""
+        try:
+            while True:
+                try:
+                    rows = self._queue.get(timeout=0.2)
+                except queue.Empty:
+                    if self._stop_event.is_set():
+                        break
+                    continue
+                try:
+                    self._write(rows)
+                except Exception as e:
+                    self._record_drop(rows, f"insert failed: {e}")
+        finally:
+            # The thread has its own database connection
+            connection.close()
+
+    def _write(self, rows: List[acq_models.DataPoint]) -> None:
+        """Insert one batch and send the aggregated notification."""
+        acq_models.DataPoint.objects.bulk_create(rows, batch_size=self.batch_size)
+        with self._lock:
+            self.rows_written += len(rows)
+        if self.notify:
+            self._send_batch_notification(rows)
+
+    def _record_drop(self, rows: List[acq_models.DataPoint], reason: str) -> None:
+        with self._lock:
+            self.rows_dropped += len(rows)
+        logger.error(f"Dropped {len(rows)} data points of session {self.session.id}: {reason}")
+
+    def _sample(self) -> bool:
+        """Evenly spaced selection of ``sample_ratio`` of the samples."""
+        self._credit += self.sample_ratio
+        if self._credit >= 1.0:
+            self._credit -= 1.0
+            return True
+        return False
+
+    def _send_batch_notification(self, rows: List[acq_models.DataPoint]) -> None:
+        """Send one message for the whole batch, carrying the newest row per point."""
+        channel_layer = get_channel_layer()
+        if not channel_layer:
+            return
+
+        latest: Dict[str, acq_models.DataPoint] = {}
+        for row in rows:
+            latest[row.point_code] = row
+
+        session_group = f"acquisition_session_{self.session.id}"
+        try:
+            async_to_sync(channel_layer.group_send)(
+                session_group,
+                {
+                    "type": "data_points_batch",
+                    "data": {
+                        "session_id": self.session.id,
+                        "count": len(rows),
+                        "points": [
+                            {
+                                "point_code": row.point_code,
+                                "timestamp": row.timestamp.isoformat(),
+                                "value": row.value,
+                                "quality": row.quality,
+                            }
+                            for row in latest.values()
+                        ],
+                    },
+                },
+            )
+        except Exception as e:
+            logger.error(f"Failed to send data point batch notification to {session_group}: {e}")
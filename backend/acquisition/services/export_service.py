@@ -0,0 +1,114 @@
+"""Streaming NDJSON/CSV export of session data points and point history."""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from django.conf import settings
+
+from acquisition import models as acq_models
+
+FORMAT_NDJSON = "ndjson"
+FORMAT_CSV = "csv"
+EXPORT_FORMATS = (FORMAT_NDJSON, FORMAT_CSV)
+
+CONTENT_TYPES = {
+    FORMAT_NDJSON: "application/x-ndjson",
+    FORMAT_CSV: "text/csv; charset=utf-8",
+}
+
+DATA_POINT_COLUMNS = ["point_code", "timestamp", "value", "quality"]
+HISTORY_COLUMNS = ["point_code", "field", "timestamp", "value", "quality"]
+
+# Bytes collected before a chunk is handed to the response
+_CHUNK_BYTES = 64 * 1024
+
+
+def iter_session_rows(
+    session_id: int,
+    point_codes: Optional[Sequence[str]] = None,
+    start: Optional[datetime] = None,
+    stop: Optional[datetime] = None,
+    chunk_size: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream DataPoint rows of a session in time order.
+
+    ``QuerySet.iterator`` fetches ``chunk_size`` rows at a time (a
+    server-side cursor on PostgreSQL) and skips the queryset cache, so
+    memory does not grow with the number of rows.
+    """
+    queryset = acq_models.DataPoint.objects.filter(session_id=session_id)
+    if point_codes:
+        queryset = queryset.filter(point_code__in=point_codes)
+    if start:
+        queryset = queryset.filter(timestamp__gte=start)
+    if stop:
+        queryset = queryset.filter(timestamp__lt=stop)
+
+    chunk_size = chunk_size or getattr(settings, "ACQUISITION_EXPORT_CHUNK_SIZE", 2000)
+    rows = queryset.order_by("timestamp", "id").values_list("point_code", "timestamp", "value", "quality")
+    for point_code, timestamp, value, quality in rows.iterator(chunk_size=chunk_size):
+        yield {
+            "point_code": point_code,
+            "timestamp": timestamp.isoformat(),
+            "value": value,
+            "quality": quality,
+        }
+
+
+def iter_history_rows(query: Any, storage: Any) -> Iterator[Dict[str, Any]]:
+    """Stream raw InfluxDB rows of a history query as they are parsed."""
+    for row in storage.iter_query_rows(query.to_export_flux()):
+        yield {
+            "point_code": row.get("point"),
+            "field": row.get("_field"),
+            "timestamp": row.get("_time"),
+            "value": row.get("_value"),
+            "quality": row.get("quality") or "good",
+        }
+
+
+def encode_ndjson(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode rows as newline-delimited JSON, yielding ~64 KiB chunks."""
+    buffer: List[str] = []
+    size = 0
+    for row in rows:
+        line = json.dumps(row, ensure_ascii=False, default=str) + "\n"
+        buffer.append(line)
+        size += len(line)
+        if size >= _CHUNK_BYTES:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def encode_csv(rows: Iterable[Dict[str, Any]], columns: Sequence[str]) -> Iterator[bytes]:
+    """Encode rows as CSV with a header line, yielding ~64 KiB chunks."""
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=list(columns), extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({
+            key: json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+            for key, value in row.items()
+        })
+        if output.tell() >= _CHUNK_BYTES:
+            yield output.getvalue().encode("utf-8")
+            output.seek(0)
+            output.truncate()
+    if output.tell():
+        yield output.getvalue().encode("utf-8")
+
+
+def encode_rows(rows: Iterable[Dict[str, Any]], export_format: str, columns: Sequence[str]) -> Iterator[bytes]:
+    """Encode rows in the requested export format."""
+    if export_format == FORMAT_CSV:
+        return encode_csv(rows, columns)
+    if export_format == FORMAT_NDJSON:
+        return encode_ndjson(rows)
+    raise ValueError(f"不支持的导出格式: {export_format}")
@@ -0,0 +1,689 @@
+"""Point history queries against the time-series store."""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+from acquisition.services.acquisition_service import build_storage_config
+from storage import StorageRegistry
+from storage.influxdb import InfluxDBStorage
+
+logger = logging.getLogger(__name__)
+
+# Flux time expressions accepted from API clients
+_DURATION_RE = re.compile(r"^-?(\d+(ns|us|ms|s|mo|m|h|d|w|y))+$")
+_RFC3339_RE = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?(Z|[+-]\d{2}:\d{2})$")
+_DURATION_PART_RE = re.compile(r"(\d+)(ns|us|ms|s|mo|m|h|d|w|y)")
+_DURATION_UNITS = {
+    "ns": 1e-9, "us": 1e-6, "ms": 1e-3, "s": 1, "m": 60, "h": 3600,
+    "d": 86400, "w": 604800, "mo": 2592000, "y": 31536000,
+}
+
+# Downsampling modes for resolution-aware queries
+DOWNSAMPLE_NONE = "none"
+DOWNSAMPLE_MEAN = "mean"
+DOWNSAMPLE_MINMAX = "minmax"
+DOWNSAMPLE_LTTB = "lttb"
+DOWNSAMPLE_MODES = (DOWNSAMPLE_NONE, DOWNSAMPLE_MEAN, DOWNSAMPLE_MINMAX, DOWNSAMPLE_LTTB)
+
+# Read from the full-resolution bucket regardless of rollup tiers
+TIER_RAW = "raw"
+
+SOURCE_INFLUXDB = "influxdb"
+SOURCE_LOCAL = "local"
+
+_query_storage: Optional[InfluxDBStorage] = None
+_query_storage_lock = threading.Lock()
+
+_history_cache: Optional["HistoryCache"] = None
+_local_store: Optional[Any] = None
+
+
+def get_query_storage() -> InfluxDBStorage:
+    """
+    Return the process-wide InfluxDB storage used for history queries.
+
+    The client is created once and reused, so every request shares its
+    HTTP connection pool instead of opening a new connection.
+    """
+    global _query_storage
+    with _query_storage_lock:
+        if _query_storage is None or not _query_storage.is_connected:
+            storage = StorageRegistry.create("influxdb", build_storage_config("influxdb"))
+            storage.connect()
+            _query_storage = storage
+        return _query_storage
+
+
+def get_local_store() -> Optional[Any]:
+    """
+    Return the process-wide local store used as history fallback.
+
+    None unless ``ACQUISITION_LOCAL_STORE_ENABLED`` is set and the store file exists.
+    """
+    global _local_store
+    if not getattr(settings, "ACQUISITION_LOCAL_STORE_ENABLED", False):
+        return None
+    with _query_storage_lock:
+        if _local_store is None:
+            config = build_storage_config("local")
+            if not os.path.exists(config["path"]):
+                return None
+            store = StorageRegistry.create("local", config)
+            store.connect()
+            _local_store = store
+        return _local_store
+
+
+def flux_string(value: Any) -> str:
+    """Quote a value as a Flux string literal."""
+    return '"' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def flux_time(value: str) -> str:
+    """
+    Validate a Flux time expression.
+
+    Accepts ``now()``, relative durations (``-1h``, ``-1d12h``) and
+    RFC3339 timestamps.
+
+    Raises:
+        ValueError: If the expression is not a valid time
+    """
+    value = (value or "").strip()
+    if value == "now()" or _DURATION_RE.match(value) or _RFC3339_RE.match(value):
+        return value
+    raise ValueError(f"无效的时间参数: {value}")
+
+
+def resolve_time(value: str, now: Optional[datetime] = None) -> datetime:
+    """Resolve a validated Flux time expression to an aware datetime."""
+    now = now or datetime.now(dt_timezone.utc)
+    if value == "now()":
+        return now
+    if _RFC3339_RE.match(value):
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return datetime.fromtimestamp(now.timestamp() + duration_seconds(value), tz=dt_timezone.utc)
+
+
+def duration_seconds(value: str) -> float:
+    """Convert a Flux duration (``-1h``, ``1d12h``, ``30s``) to seconds (``mo`` = 30d, ``y`` = 365d)."""
+    seconds = sum(int(n) * _DURATION_UNITS[unit] for n, unit in _DURATION_PART_RE.findall(value))
+    return -seconds if value.startswith("-") else seconds
+
+
+def format_time(value: datetime) -> str:
+    """Format an aware datetime as an RFC3339 UTC Flux time literal."""
+    return value.astimezone(dt_timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def parse_timestamp(value: str) -> float:
+    """Convert an RFC3339 timestamp (nanosecond precision allowed) to epoch seconds."""
+    if "." in value:
+        head, _, tail = value.partition(".")
+        digits = re.match(r"\d*", tail).group()
+        value = f"{head}.{digits[:6]}{tail[len(digits):]}"
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+
+
+def lttb(data: List[Dict[str, Any]], threshold: int) -> List[Dict[str, Any]]:
+    """
+    Downsample rows with Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last row and, per bucket, the row forming the
+    largest triangle with its neighbours, which preserves peaks and the
+    visual shape of the series. Rows without a numeric value are dropped.
+
+    Args:
+        data: Rows ``{"timestamp", "value", ...}`` in time order
+        threshold: Max rows to return
+
+    Returns:
+        Selected rows (original dicts), in time order
+    """
+    rows = [r for r in data if isinstance(r.get("value"), (int, float)) and not isinstance(r.get("value"), bool)]
+    if threshold >= len(rows) or threshold < 3:
+        return rows
+
+    xs = [parse_timestamp(r["timestamp"]) for r in rows]
+    ys = [float(r["value"]) for r in rows]
+    sampled = [rows[0]]
+    bucket_size = (len(rows) - 2) / (threshold - 2)
+    a = 0
+
+    for i in range(threshold - 2):
+        # Average point of the next bucket is the third triangle vertex
+        next_start = int(math.floor((i + 1) * bucket_size)) + 1
+        next_end = min(int(math.floor((i + 2) * bucket_size)) + 1, len(rows))
+        span = max(next_end - next_start, 1)
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        start = int(math.floor(i * bucket_size)) + 1
+        end = int(math.floor((i + 1) * bucket_size)) + 1
+        best_area = -1.0
+        best = start
+        for j in range(start, end):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > best_area:
+                best_area = area
+                best = j
+        sampled.append(rows[best])
+        a = best
+
+    sampled.append(rows[-1])
+    return sampled
+
+
+@dataclass
+class HistoryQuery:
+    """
+    History query for one or more points over one time range.
+
+    With ``max_points`` set, the query is resolution-aware: ``downsample``
+    selects how the range is reduced to at most ``max_points`` rows per series.
+
+        - ``mean``: ``aggregateWindow`` mean per window (computed in InfluxDB)
+        - ``minmax``: min and max row per window, keeping their real timestamps
+          (computed in InfluxDB, shape-preserving)
+        - ``lttb``: the whole range is pre-bucketed in InfluxDB into min/max
+          rows (``ACQUISITION_HISTORY_LTTB_OVERSAMPLE`` x ``max_points``)
+          which are then reduced with LTTB on the server; ``limit`` does not apply
+    """
+
+    point_codes: List[str]
+    start: str = "-1h"
+    stop: str = "now()"
+    fields: List[str] = field(default_factory=list)
+    limit: int = 1000
+    bucket: Optional[str] = None
+    max_points: Optional[int] = None
+    downsample: str = DOWNSAMPLE_NONE
+    every_ms: Optional[int] = None
+    tier: Optional[str] = None
+    source: str = field(default=SOURCE_INFLUXDB, init=False)
+    # Last closed window of the tier; later rows are read from the raw bucket
+    tier_until: Optional[str] = field(default=None, init=False)
+
+    def __post_init__(self) -> None:
+        if not self.point_codes:
+            raise ValueError("缺少参数: point_code")
+        self.start = flux_time(self.start)
+        self.stop = flux_time(self.stop)
+        self.limit = max(1, int(self.limit))
+        if self.downsample not in DOWNSAMPLE_MODES:
+            raise ValueError(f"无效的降采样模式: {self.downsample}，可选 {', '.join(DOWNSAMPLE_MODES)}")
+        if self.max_points:
+            self.max_points = max(2, int(self.max_points))
+            if self.downsample == DOWNSAMPLE_NONE:
+                self.downsample = DOWNSAMPLE_MINMAX
+        elif self.downsample != DOWNSAMPLE_NONE:
+            raise ValueError("降采样需要指定 max_points 或 width")
+        self._route_to_tier()
+        if not self.bucket:
+            self.bucket = getattr(settings, "INFLUXDB_BUCKET", "default")
+
+    def _route_to_tier(self) -> None:
+        """
+        Pick the rollup tier to read from.
+
+        ``tier`` None (auto) selects the coarsest tier whose window still fits
+        one output row and whose coverage reaches the query start, for
+        downsampled queries without an explicit bucket; ``raw`` forces the
+        raw bucket; any other value names a tier.
+
+        When the range ends after the last closed window of the tier (a
+        range ending now always does), ``tier_until`` is set and the rest
+        of the range is stitched from raw rows.
+        """
+        from acquisition.services import rollup_service
+
+        if self.tier == TIER_RAW:
+            self.tier = None
+            return
+        if self.tier:
+            if not self.max_points:
+                raise ValueError("汇总层级查询需要指定 max_points 或 width")
+            tier = rollup_service.get_tier(self.tier)
+        elif self.max_points and not self.bucket and not self.every_ms:
+            tier = rollup_service.select_tier(self.window_ms() / 1000, resolve_time(self.start))
+        else:
+            return
+        if tier is None:
+            return
+
+        coverage = rollup_service.get_coverage(tier)
+        if coverage is not None and resolve_time(self.stop) > coverage[1]:
+            if coverage[1] <= resolve_time(self.start):
+                # Nothing of the range is rolled up yet; the bucket may be the
+                # tier's when the query was copied from a routed one
+                self.tier = None
+                self.bucket = getattr(settings, "INFLUXDB_BUCKET", "default")
+                return
+            self.tier_until = format_time(coverage[1])
+        self.tier = tier.name
+        self.bucket = tier.bucket
+
+    def window_ms(self) -> int:
+        """
+        Aggregation window in milliseconds so the range yields ~``max_points`` rows.
+
+        LTTB pre-buckets into a finer grid of ``max_points`` x oversample rows.
+        """
+        if self.every_ms:
+            return self.every_ms
+        span = (resolve_time(self.stop) - resolve_time(self.start)).total_seconds()
+        if self.downsample == DOWNSAMPLE_MINMAX:
+            windows = self.max_points // 2
+        elif self.downsample == DOWNSAMPLE_LTTB:
+            windows = self.max_points * max(1, getattr(settings, "ACQUISITION_HISTORY_LTTB_OVERSAMPLE", 4)) // 2
+        else:
+            windows = self.max_points
+        return max(1, int(math.ceil(span * 1000 / max(1, windows))))
+
+    def _series_lines(self, bucket: str, start: str, stop: str) -> List[str]:
+        if len(self.point_codes) == 1:
+            point_filter = f'r["point"] == {flux_string(self.point_codes[0])}'
+        else:
+            # One set-membership test instead of an or-chain with one clause per point
+            point_set = ", ".join(flux_string(code) for code in self.point_codes)
+            point_filter = f'contains(value: r["point"], set: [{point_set}])'
+        lines = [
+            f"from(bucket: {flux_string(bucket)})",
+            f"  |> range(start: {start}, stop: {stop})",
+            f"  |> filter(fn: (r) => {point_filter})",
+        ]
+        if self.fields:
+            field_filter = " or ".join(f'r["_field"] == {flux_string(name)}' for name in self.fields)
+            lines.append(f"  |> filter(fn: (r) => {field_filter})")
+        return lines
+
+    def _source_lines(self) -> List[str]:
+        if not self.tier:
+            return self._series_lines(self.bucket, self.start, self.stop) + [
+                '  |> keep(columns: ["_time", "_value", "_field", "point", "quality"])',
+            ]
+
+        # Rollup rows are stamped with their window stop, so the last closed
+        # window (stamped tier_until) is included with a 1us margin
+        tier_stop = self.stop
+        if self.tier_until:
+            tier_stop = format_time(resolve_time(self.tier_until) + timedelta(microseconds=1))
+        lines = self._series_lines(self.bucket, self.start, tier_stop)
+        # Rollup rows: min/max for shape-preserving queries, mean otherwise
+        if self.downsample in (DOWNSAMPLE_MINMAX, DOWNSAMPLE_LTTB):
+            lines.append('  |> filter(fn: (r) => r["stat"] == "min" or r["stat"] == "max")')
+        else:
+            lines.append('  |> filter(fn: (r) => r["stat"] == "mean")')
+        lines.append('  |> keep(columns: ["_time", "_value", "_field", "point", "stat"])')
+        if not self.tier_until:
+            return lines
+
+        # Open tail after the last closed window: numeric raw rows as floats like the rollups
+        raw_bucket = getattr(settings, "INFLUXDB_BUCKET", "default")
+        raw = self._series_lines(raw_bucket, self.tier_until, self.stop) + [
+            '  |> filter(fn: (r) => types.isType(v: r._value, type: "float") or types.isType(v: r._value, type: "int"))',
+            "  |> toFloat()",
+            '  |> keep(columns: ["_time", "_value", "_field", "point", "quality"])',
+        ]
+        return [
+            "union(tables: [",
+            *("  " + line for line in lines),
+            "  ,",
+            *("  " + line for line in raw),
+            "])",
+        ]
+
+    def to_flux(self) -> str:
+        """Build the Flux query; ``limit`` and ``max_points`` apply per series."""
+        # One table per series: quality (and stat) stay columns but leave the
+        # group key, otherwise mixed-quality rows come back as separate,
+        # individually sorted tables instead of one time-ordered series
+        lines = self._source_lines() + ['  |> group(columns: ["point", "_field"])']
+        header = 'import "types"\n' if self.downsample == DOWNSAMPLE_MEAN or self.tier_until else ""
+
+        if self.downsample == DOWNSAMPLE_MEAN:
+            lines.extend([
+                '  |> filter(fn: (r) => types.isType(v: r._value, type: "float") or types.isType(v: r._value, type: "int"))',
+                f"  |> aggregateWindow(every: {self.window_ms()}ms, fn: mean, createEmpty: false)",
+                '  |> sort(columns: ["_time"])',
+            ])
+            return header + "\n".join(lines)
+
+        if self.downsample in (DOWNSAMPLE_MINMAX, DOWNSAMPLE_LTTB):
+            # LTTB reduces the (finer) min/max buckets after the query
+            every = f"{self.window_ms()}ms"
+            min_source, max_source = "data", "data"
+            if self.tier:
+                # Stitched raw rows have no stat column and count for both
+                min_source = 'data |> filter(fn: (r) => not exists r.stat or r.stat == "min")'
+                max_source = 'data |> filter(fn: (r) => not exists r.stat or r.stat == "max")'
+            lines = [
+                "data = " + "\n".join(lines).lstrip(),
+                f"mins = {min_source} |> window(every: {every}) |> min()",
+                f"maxs = {max_source} |> window(every: {every}) |> max()",
+                "union(tables: [mins, maxs])",
+                '  |> group(columns: ["point", "_field"])',
+                '  |> sort(columns: ["_time"])',
+            ]
+            if self.downsample == DOWNSAMPLE_MINMAX:
+                lines.append(f"  |> limit(n: {self.max_points})")
+            return header + "\n".join(lines)
+
+        # Raw rows
+        lines.extend([
+            '  |> sort(columns: ["_time"])',
+            f"  |> limit(n: {self.limit})",
+        ])
+        return "\n".join(lines)
+
+    def to_export_flux(self) -> str:
+        """Build the Flux query streaming every raw row of the range (no limit or downsampling)."""
+        return "\n".join(self._source_lines())
+
+
+class HistoryCache:
+    """
+    LRU cache of history query results with tail stitching.
+
+    Entries are keyed by (bucket, points, fields, time window, resolution).
+    On a repeated query, rows older than the last fetched time minus
+    ``lateness`` (aligned down to the aggregation window for downsampled
+    queries) are closed and reused; only the open tail after them is
+    fetched and appended, and rows that slid out of a relative window are
+    trimmed. Entries are refetched in full after ``ttl`` seconds and the
+    cache is bounded by the total number of cached rows.
+
+    Raw queries whose series hit ``limit`` cannot be stitched (the cached
+    rows are not the whole range) and are refetched on every call unless
+    the range is closed.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_rows: int = 500_000,
+        max_entries: int = 256,
+        lateness: float = 5.0,
+    ) -> None:
+        """
+        Args:
+            ttl: Seconds after which an entry is refetched in full
+            max_rows: Max rows held across all entries (LRU eviction)
+            max_entries: Max number of entries
+            lateness: Seconds of recent data always refetched to pick up late writes
+        """
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.max_entries = max_entries
+        self.lateness = lateness
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._rows = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(query: HistoryQuery) -> tuple:
+        return (
+            query.bucket, tuple(query.point_codes), tuple(query.fields),
+            query.start, query.stop, query.downsample, query.max_points, query.limit,
+        )
+
+    def fetch(
+        self,
+        query: HistoryQuery,
+        storage: InfluxDBStorage,
+        now: Optional[datetime] = None,
+    ) -> Dict[tuple, Dict[str, Any]]:
+        """
+        Return raw series for ``query``, reusing cached closed segments.
+
+        Args:
+            query: History query
+            storage: Storage used for full and tail fetches
+            now: Current time (defaults to the wall clock)
+
+        Returns:
+            Series dict keyed by (point, field), before LTTB reduction
+        """
+        now = now or datetime.now(dt_timezone.utc)
+        start = resolve_time(query.start, now)
+        stop = resolve_time(query.stop, now)
+        closed = bool(_RFC3339_RE.match(query.start) and _RFC3339_RE.match(query.stop))
+        every_ms = query.window_ms() if query.downsample != DOWNSAMPLE_NONE else None
+        key = self.cache_key(query)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        fresh = entry is not None and time.monotonic() - entry["created_at"] < self.ttl
+
+        if fresh and closed:
+            self.hits += 1
+            return entry["series"]
+
+        if fresh and entry["stitchable"] and entry["fetched_until"] <= stop:
+            self.hits += 1
+            boundary = self._tail_boundary(entry["fetched_until"], every_ms, start)
+            tail = _fetch_series(replace(query, start=format_time(boundary), stop=format_time(stop), every_ms=every_ms), storage)
+            series = self._stitch(entry["series"], tail, start, boundary, query.downsample == DOWNSAMPLE_MEAN)
+            stitchable = not self._truncated(tail, query)
+            self._store(key, series, stop, stitchable, created_at=entry["created_at"])
+            return series
+
+        self.misses += 1
+        series = _fetch_series(replace(query, start=format_time(start), stop=format_time(stop), every_ms=every_ms), storage)
+        truncated = self._truncated(series, query)
+        if closed or not truncated:
+            self._store(key, series, stop, not truncated)
+        return series
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "rows": self._rows, "hits": self.hits, "misses": self.misses}
+
+    def _tail_boundary(self, fetched_until: datetime, every_ms: Optional[int], start: datetime) -> datetime:
+        """Start of the open tail: last fetch minus lateness, aligned to the window grid."""
+        boundary = fetched_until.timestamp() - self.lateness
+        if every_ms:
+            boundary = math.floor(boundary * 1000 / every_ms) * every_ms / 1000
+        return max(datetime.fromtimestamp(boundary, tz=dt_timezone.utc), start)
+
+    @staticmethod
+    def _stitch(
+        cached: Dict[tuple, Dict[str, Any]],
+        tail: Dict[tuple, Dict[str, Any]],
+        start: datetime,
+        boundary: datetime,
+        stop_stamped: bool,
+    ) -> Dict[tuple, Dict[str, Any]]:
+        """Keep cached rows in [start, boundary) and append the tail rows."""
+        low, high = start.timestamp(), boundary.timestamp()
+        series: Dict[tuple, Dict[str, Any]] = {}
+        for key, entry in cached.items():
+            kept = []
+            for row in entry["data"]:
+                ts = parse_timestamp(row["timestamp"])
+                # aggregateWindow stamps rows with the window stop
+                if ts >= low and (ts <= high if stop_stamped else ts < high):
+                    kept.append(row)
+            series[key] = {**entry, "data": kept}
+        for key, entry in tail.items():
+            if key in series:
+                series[key]["data"].extend(entry["data"])
+            else:
+                series[key] = entry
+        return {key: entry for key, entry in series.items() if entry["data"]}
+
+    @staticmethod
+    def _truncated(series: Dict[tuple, Dict[str, Any]], query: HistoryQuery) -> bool:
+        """Whether a raw series hit ``limit`` (rows beyond it were not fetched)."""
+        if query.downsample != DOWNSAMPLE_NONE:
+            return False
+        return any(len(entry["data"]) >= query.limit for entry in series.values())
+
+    def _store(
+        self,
+        key: tuple,
+        series: Dict[tuple, Dict[str, Any]],
+        fetched_until: datetime,
+        stitchable: bool,
+        created_at: Optional[float] = None,
+    ) -> None:
+        rows = sum(len(entry["data"]) for entry in series.values())
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._rows -= previous["rows"]
+            if rows > self.max_rows:
+                return
+            self._entries[key] = {
+                "series": series,
+                "fetched_until": fetched_until,
+                "stitchable": stitchable,
+                "created_at": created_at if created_at is not None else time.monotonic(),
+                "rows": rows,
+            }
+            self._rows += rows
+            while self._entries and (self._rows > self.max_rows or len(self._entries) > self.max_entries):
+                _, evicted = self._entries.popitem(last=False)
+                self._rows -= evicted["rows"]
+
+
+def get_history_cache() -> Optional[HistoryCache]:
+    """Return the process-wide history cache, or None if disabled in settings."""
+    global _history_cache
+    if not getattr(settings, "ACQUISITION_HISTORY_CACHE_ENABLED", True):
+        return None
+    with _query_storage_lock:
+        if _history_cache is None:
+            _history_cache = HistoryCache(
+                ttl=getattr(settings, "ACQUISITION_HISTORY_CACHE_TTL", 300.0),
+                max_rows=getattr(settings, "ACQUISITION_HISTORY_CACHE_MAX_ROWS", 500_000),
+                lateness=getattr(settings, "ACQUISITION_HISTORY_CACHE_LATENESS", 5.0),
+            )
+        return _history_cache
+
+
+def _fetch_series(query: HistoryQuery, storage: InfluxDBStorage) -> Dict[tuple, Dict[str, Any]]:
+    """Run a query and group rows by (point, field)."""
+    return _group_rows(storage.iter_query_rows(query.to_flux()))
+
+
+def _fetch_series_local(query: HistoryQuery, store: Any) -> Dict[tuple, Dict[str, Any]]:
+    """
+    Read raw rows for a query from the local store.
+
+    Downsampled queries are reduced with LTTB afterwards (see
+    ``query_point_history``), whatever their mode or tier.
+    """
+    now = datetime.now(dt_timezone.utc)
+    rows = store.query_range(
+        query.point_codes,
+        int(resolve_time(query.start, now).timestamp() * 1e9),
+        int(resolve_time(query.stop, now).timestamp() * 1e9),
+        fields=query.fields,
+        limit=query.limit if not query.max_points else None,
+    )
+    return _group_rows(rows)
+
+
+def _group_rows(rows: Iterable[Dict[str, Any]]) -> Dict[tuple, Dict[str, Any]]:
+    series: Dict[tuple, Dict[str, Any]] = {}
+    for row in rows:
+        key = (row.get("point"), row.get("_field"))
+        entry = series.get(key)
+        if entry is None:
+            entry = series[key] = {"point_code": key[0], "field": key[1], "data": []}
+        entry["data"].append({
+            "timestamp": row.get("_time"),
+            "value": row.get("_value"),
+            "quality": row.get("quality") or "good",
+        })
+    return series
+
+
+def align_series(series: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert series into columnar form on a shared time axis.
+
+    Args:
+        series: Output of ``query_point_history``
+
+    Returns:
+        ``{"timestamps": [...], "series": [{"point_code", "field", "values": [...]}]}``
+        where every ``values`` array is aligned to ``timestamps`` (None where a
+        series has no sample at that time)
+    """
+    labels: Dict[float, str] = {}
+    for entry in series:
+        for row in entry["data"]:
+            if row["timestamp"]:
+                labels.setdefault(parse_timestamp(row["timestamp"]), row["timestamp"])
+    axis = sorted(labels)
+    index = {ts: position for position, ts in enumerate(axis)}
+
+    columns = []
+    for entry in series:
+        values: List[Any] = [None] * len(axis)
+        for row in entry["data"]:
+            if row["timestamp"]:
+                values[index[parse_timestamp(row["timestamp"])]] = row["value"]
+        columns.append({"point_code": entry["point_code"], "field": entry["field"], "values": values})
+    return {"timestamps": [labels[ts] for ts in axis], "series": columns}
+
+
+def query_point_history(
+    query: HistoryQuery,
+    storage: Optional[InfluxDBStorage] = None,
+    cache: Optional[HistoryCache] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run a history query and group rows into series.
+
+    Args:
+        query: History query
+        storage: Storage to query (defaults to the shared query storage)
+        cache: Result cache; when given, repeated queries only fetch the open tail
+
+    Returns:
+        List of series ``{"point_code", "field", "data": [{"timestamp", "value", "quality"}]}``
+        in the order of ``query.point_codes``; ``query.source`` tells whether
+        InfluxDB or the local store (used when InfluxDB is unreachable) answered
+    """
+    try:
+        storage = storage or get_query_storage()
+        series = cache.fetch(query, storage) if cache is not None else _fetch_series(query, storage)
+        query.source = SOURCE_INFLUXDB
+    except Exception as e:
+        local_store = get_local_store()
+        if local_store is None:
+            raise
+        logger.warning(f"InfluxDB history query failed ({e}), falling back to local store")
+        series = _fetch_series_local(query, local_store)
+        query.source = SOURCE_LOCAL
+
+    result = [dict(entry) for entry in series.values()]
+    if query.downsample == DOWNSAMPLE_LTTB or (query.source == SOURCE_LOCAL and query.max_points):
+        for entry in result:
+            entry["data"] = lttb(entry["data"], query.max_points)
+
+    order = {code: index for index, code in enumerate(query.point_codes)}
+    return sorted(result, key=lambda s: (order.get(s["point_code"], len(order)), s["field"] or ""))
@@ -0,0 +1,143 @@
+"""Latest-value table per point, updated by the acquisition pipeline."""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_store: Optional["LatestValueStore"] = None
+_store_lock = threading.Lock()
+
+
+def build_latest_records(
+    data: Iterable[Dict[str, Any]],
+    session_id: Optional[int] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Build latest-value records from storage data points.
+
+    Args:
+        data: Data points in the ``BaseStorage.write`` format
+        session_id: Acquisition session that produced the data
+
+    Returns:
+        Dict mapping point code to ``{"value", "quality", "timestamp", "session_id"}``;
+        the last reading of a point wins
+    """
+    records: Dict[str, Dict[str, Any]] = {}
+    for point in data:
+        tags = point.get("tags") or {}
+        timestamp = point.get("time")
+        if timestamp:
+            timestamp = datetime.fromtimestamp(timestamp / 1e9, tz=dt_timezone.utc).isoformat()
+        for code, value in (point.get("fields") or {}).items():
+            records[code] = {
+                "value": value,
+                "quality": tags.get("quality", "good"),
+                "timestamp": timestamp,
+                "session_id": session_id,
+            }
+    return records
+
+
+class LatestValueStore(ABC):
+    """Interface of the latest-value table."""
+
+    @abstractmethod
+    def update(self, records: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the current records of the given points."""
+        pass
+
+    @abstractmethod
+    def get_many(self, point_codes: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Return current records keyed by point code (None if never read)."""
+        pass
+
+
+class MemoryLatestValueStore(LatestValueStore):
+    """Process-local store, for single-process deployments and tests."""
+
+    def __init__(self) -> None:
+        self._values: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def update(self, records: Dict[str, Dict[str, Any]]) -> None:
+        with self._lock:
+            self._values.update(records)
+
+    def get_many(self, point_codes: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        with self._lock:
+            return {code: self._values.get(code) for code in point_codes}
+
+
+class RedisLatestValueStore(LatestValueStore):
+    """
+    Store shared between acquisition workers and API processes.
+
+    All points live in one Redis hash (field = point code, value = JSON
+    record), so a batch update is one ``HSET`` and a bulk read of
+    thousands of points is one ``HMGET``. After a Redis error, updates are
+    skipped for ``retry_interval`` seconds so acquisition is never slowed
+    down by an unavailable Redis.
+    """
+
+    def __init__(self, client: Any, key: str = "acquisition:latest_values", retry_interval: float = 30.0) -> None:
+        self.client = client
+        self.key = key
+        self.retry_interval = retry_interval
+        self._suspended_until = 0.0
+
+    def update(self, records: Dict[str, Dict[str, Any]]) -> None:
+        if not records or time.monotonic() < self._suspended_until:
+            return
+        try:
+            self.client.hset(
+                self.key,
+                mapping={code: json.dumps(record, default=str) for code, record in records.items()},
+            )
+        except Exception as e:
+            self._suspended_until = time.monotonic() + self.retry_interval
+            logger.warning(f"Failed to update latest values in Redis, retrying in {self.retry_interval}s: {e}")
+
+    def get_many(self, point_codes: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        if not point_codes:
+            return {}
+        raw = self.client.hmget(self.key, point_codes)
+        return {code: json.loads(value) if value else None for code, value in zip(point_codes, raw)}
+
+
+def get_latest_value_store() -> LatestValueStore:
+    """
+    Return the process-wide latest-value store.
+
+    ``ACQUISITION_LATEST_VALUE_BACKEND`` selects ``redis`` (default, shared
+    across processes) or ``memory``.
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            backend = getattr(settings, "ACQUISITION_LATEST_VALUE_BACKEND", "redis")
+            if backend == "redis":
+                import redis
+
+                _store = RedisLatestValueStore(
+                    redis.Redis.from_url(
+                        getattr(settings, "ACQUISITION_LATEST_VALUE_REDIS_URL", "redis://localhost:6379/1"),
+                        socket_timeout=2.0,
+                        socket_connect_timeout=2.0,
+                    ),
+                    key=getattr(settings, "ACQUISITION_LATEST_VALUE_KEY", "acquisition:latest_values"),
+                )
+            elif backend == "memory":
+                _store = MemoryLatestValueStore()
+            else:
+                raise ValueError(f"Unknown latest value backend '{backend}'. Available: ['redis', 'memory']")
+        return _store
@@ -0,0 +1,232 @@
+"""Coalesced live data frames for WebSocket clients."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def session_group(session_id: int) -> str:
+    return f"acquisition_session_{session_id}"
+
+
+class LiveBroadcaster:
+    """
+    Accumulate samples of one session and publish one frame per interval.
+
+    ``add``/``add_sample`` only update an in-memory accumulator (latest
+    value per point, plus min/max/count of numeric values over the
+    interval). A background thread sends at most one ``live_frame`` group
+    message every ``interval`` seconds while there is something new, so
+    channel-layer traffic depends on the interval and the number of
+    changed points rather than on the sample rate. The thread exits after
+    ``idle_timeout`` seconds without samples (calling ``on_idle``) and is
+    restarted on demand.
+    """
+
+    def __init__(
+        self,
+        session_id: int,
+        interval: Optional[float] = None,
+        include_range: Optional[bool] = None,
+        idle_timeout: float = 30.0,
+        send: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        on_idle: Optional[Callable[["LiveBroadcaster"], None]] = None,
+    ) -> None:
+        """
+        Args:
+            session_id: Session whose group receives the frames
+            interval: Seconds between frames (default ACQUISITION_LIVE_INTERVAL)
+            include_range: Add min/max/count over the interval (default ACQUISITION_LIVE_INCLUDE_RANGE)
+            idle_timeout: Seconds without samples before the sender thread exits
+            send: ``send(group, message)`` override (defaults to the channel layer)
+            on_idle: Called with the broadcaster when its sender thread exits for lack of samples
+        """
+        self.session_id = session_id
+        self.interval = float(interval if interval is not None else getattr(settings, "ACQUISITION_LIVE_INTERVAL", 0.2))
+        self.include_range = (
+            include_range if include_range is not None else getattr(settings, "ACQUISITION_LIVE_INCLUDE_RANGE", True)
+        )
+        self.idle_timeout = idle_timeout
+        self._send = send or self._group_send
+        self._on_idle = on_idle
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._points: Dict[str, Dict[str, Any]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._last_sent = 0.0
+        self.seq = 0
+        self.samples = 0
+
+    def add(self, data: Iterable[Dict[str, Any]]) -> None:
+        """Accumulate data points in the ``BaseStorage.write`` format."""
+        for point in data:
+            timestamp = point.get("time")
+            timestamp = (
+                datetime.fromtimestamp(timestamp / 1e9, tz=dt_timezone.utc).isoformat() if timestamp else None
+            )
+            quality = (point.get("tags") or {}).get("quality", "good")
+            for code, value in (point.get("fields") or {}).items():
+                self.add_sample(code, value, timestamp, quality, notify=False)
+        self._notify()
+
+    def add_sample(
+        self,
+        point_code: str,
+        value: Any,
+        timestamp: Optional[str],
+        quality: str = "good",
+        notify: bool = True,
+    ) -> None:
+        """Accumulate one sample."""
+        numeric = isinstance(value, (int, float)) and not isinstance(value, bool)
+        with self._lock:
+            self.samples += 1
+            entry = self._points.get(point_code)
+            if entry is None:
+                entry = self._points[point_code] = {"point_code": point_code, "count": 0}
+                if self.include_range and numeric:
+                    entry["min"] = entry["max"] = value
+            elif self.include_range and numeric:
+                entry["min"] = value if entry.get("min") is None else min(entry["min"], value)
+                entry["max"] = value if entry.get("max") is None else max(entry["max"], value)
+            entry.update(value=value, timestamp=timestamp, quality=quality)
+            entry["count"] += 1
+        if notify:
+            self._notify()
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """
+        Send the accumulated frame now.
+
+        Returns:
+            The frame payload, or None if nothing was pending
+        """
+        with self._lock:
+            if not self._points:
+                return None
+            points, self._points = self._points, {}
+            self.seq += 1
+            frame = {
+                "session_id": self.session_id,
+                "seq": self.seq,
+                "interval_ms": int(self.interval * 1000),
+                "points": list(points.values()),
+            }
+            self._last_sent = time.monotonic()
+        try:
+            self._send(session_group(self.session_id), {"type": "live_frame", "data": frame})
+        except Exception as e:
+            logger.error(f"Failed to send live frame to {session_group(self.session_id)}: {e}")
+        return frame
+
+    def close(self) -> None:
+        """Send what is pending and stop the sender thread."""
+        self._closed = True
+        self._wakeup.set()
+        thread = self._thread
+        if thread and thread is not threading.current_thread():
+            thread.join(timeout=self.interval * 2 + 1)
+        self.flush()
+
+    def _notify(self) -> None:
+        if self._closed:
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f"live-broadcast-{self.session_id}", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._closed:
+            if not self._wakeup.wait(timeout=self.idle_timeout):
+                with self._lock:
+                    idle = not self._points
+                    if idle:
+                        self._thread = None
+                if idle:
+                    if self._on_idle:
+                        self._on_idle(self)
+                    return
+            self._wakeup.clear()
+            if self._closed:
+                return
+            delay = self._last_sent + self.interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.flush()
+
+    @staticmethod
+    def _group_send(group: str, message: Dict[str, Any]) -> None:
+        channel_layer = get_channel_layer()
+        if channel_layer:
+            async_to_sync(channel_layer.group_send)(group, message)
+
+
+def merge_frames(pending: Optional[Dict[str, Any]], frame: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge a newer live frame into a pending one.
+
+    Used by consumers that cap the frame rate per client: latest values
+    come from the newer frame, min/max/count cover both.
+    """
+    if not pending:
+        return frame
+    points = {entry["point_code"]: dict(entry) for entry in pending["points"]}
+    for entry in frame["points"]:
+        previous = points.get(entry["point_code"])
+        merged = dict(entry)
+        if previous:
+            merged["count"] = previous.get("count", 0) + entry.get("count", 0)
+            for key, pick in (("min", min), ("max", max)):
+                values = [v for v in (previous.get(key), entry.get(key)) if v is not None]
+                if values:
+                    merged[key] = pick(values)
+        points[entry["point_code"]] = merged
+    return {**frame, "points": list(points.values())}
+
+
+_broadcasters: Dict[int, LiveBroadcaster] = {}
+_broadcasters_lock = threading.Lock()
+
+
+def get_live_broadcaster(session_id: int) -> LiveBroadcaster:
+    """
+    Return the process-wide broadcaster of a session (for code paths without their own).
+
+    The entry is dropped when its sender thread goes idle, so processes that
+    never see the session stop still release it.
+    """
+    with _broadcasters_lock:
+        broadcaster = _broadcasters.get(session_id)
+        if broadcaster is None:
+            broadcaster = _broadcasters[session_id] = LiveBroadcaster(session_id, on_idle=_drop_idle_broadcaster)
+        return broadcaster
+
+
+def _drop_idle_broadcaster(broadcaster: LiveBroadcaster) -> None:
+    with _broadcasters_lock:
+        if _broadcasters.get(broadcaster.session_id) is broadcaster:
+            del _broadcasters[broadcaster.session_id]
+
+
+def release_live_broadcaster(session_id: int) -> None:
+    """Flush and drop the process-wide broadcaster of a session."""
+    with _broadcasters_lock:
+        broadcaster = _broadcasters.pop(session_id, None)
+    if broadcaster:
+        broadcaster.close()
+
@@ -0,0 +1,101 @@
+"""Live taps on the acquisition pipeline, independent of SQL persistence."""
+from __future__ import annotations
+
+import json
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+
+from acquisition.services.live_broadcast import LiveBroadcaster
+
+logger = logging.getLogger(__name__)
+
+
+class RedisStreamTap:
+    """
+    Append formatted batches to a per-session Redis stream.
+
+    One ``XADD`` per batch (``session_id``, ``count`` and the compact JSON
+    ``points`` list), trimmed approximately to ``maxlen`` entries, so any
+    process can replay or follow the live data with ``XREAD``. After a
+    Redis error, batches are skipped for ``retry_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        session_id: int,
+        key: str = "acquisition:live:{session_id}",
+        maxlen: int = 10000,
+        retry_interval: float = 30.0,
+    ) -> None:
+        self.client = client
+        self.session_id = session_id
+        self.key = key.format(session_id=session_id)
+        self.maxlen = maxlen
+        self.retry_interval = retry_interval
+        self._suspended_until = 0.0
+
+    def add(self, data: Iterable[Dict[str, Any]]) -> None:
+        if time.monotonic() < self._suspended_until:
+            return
+        points = [
+            {
+                "point_code": code,
+                "value": value,
+                "time": point.get("time"),
+                "quality": (point.get("tags") or {}).get("quality", "good"),
+            }
+            for point in data
+            for code, value in (point.get("fields") or {}).items()
+        ]
+        if not points:
+            return
+        try:
+            self.client.xadd(
+                self.key,
+                {"session_id": self.session_id, "count": len(points), "points": json.dumps(points, default=str)},
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+        except Exception as e:
+            self._suspended_until = time.monotonic() + self.retry_interval
+            logger.warning(f"Failed to publish to Redis stream {self.key}, retrying in {self.retry_interval}s: {e}")
+
+    def close(self) -> None:
+        pass
+
+
+def build_taps(session_id: int, names: Optional[List[str]] = None) -> List[Any]:
+    """
+    Create the live taps of a session.
+
+    ``ACQUISITION_LIVE_TAPS`` lists ``channels`` (coalesced frames on the
+    session's channel-layer group, see ``LiveBroadcaster``) and/or
+    ``redis_stream`` (``RedisStreamTap``). Every tap has ``add(data)`` and
+    ``close()``.
+    """
+    if names is None:
+        names = getattr(settings, "ACQUISITION_LIVE_TAPS", ["channels"])
+    taps = []
+    for name in names:
+        if name == "channels":
+            taps.append(LiveBroadcaster(session_id))
+        elif name == "redis_stream":
+            import redis
+
+            taps.append(RedisStreamTap(
+                redis.Redis.from_url(
+                    getattr(settings, "ACQUISITION_LIVE_STREAM_REDIS_URL", "redis://localhost:6379/1"),
+                    socket_timeout=2.0,
+                    socket_connect_timeout=2.0,
+                ),
+                session_id,
+                key=getattr(settings, "ACQUISITION_LIVE_STREAM_KEY", "acquisition:live:{session_id}"),
+                maxlen=getattr(settings, "ACQUISITION_LIVE_STREAM_MAXLEN", 10000),
+            ))
+        else:
+            raise ValueError(f"Unknown live tap '{name}'. Available: ['channels', 'redis_stream']")
+    return taps
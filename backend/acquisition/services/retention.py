@@ -0,0 +1,204 @@
+"""Retention of DataPoint rows: chunked purge and PostgreSQL partition maintenance."""
+from __future__ import annotations
+
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from acquisition import models as acq_models
+from configuration import models as config_models
+
+logger = logging.getLogger(__name__)
+
+DATAPOINT_TABLE = acq_models.DataPoint._meta.db_table
+# Monthly partitions: acquisition_datapoint_p202401 holds [2024-01-01, 2024-02-01)
+_PARTITION_RE = re.compile(rf"^{DATAPOINT_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def resolve_retention_days(task: config_models.AcqTask) -> int:
+    """
+    Effective retention of a task's data in days (0 = keep forever).
+
+    Precedence: task ``data_retention_days`` > site ``data_retention_days``
+    > ``ACQUISITION_DATAPOINT_RETENTION_DAYS``.
+    """
+    if task.data_retention_days is not None:
+        return task.data_retention_days
+    site_days = (
+        config_models.Site.objects.filter(devices__points__tasks=task, data_retention_days__isnull=False)
+        .values_list("data_retention_days", flat=True)
+        .first()
+    )
+    if site_days is not None:
+        return site_days
+    return getattr(settings, "ACQUISITION_DATAPOINT_RETENTION_DAYS", 0)
+
+
+def delete_in_batches(queryset, batch_size: int = 5000, max_batches: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Delete rows of ``queryset`` in bounded batches.
+
+    Each batch selects up to ``batch_size`` primary keys and deletes them in
+    its own short transaction, so locks and WAL/undo are bounded and
+    concurrent acquisition writes are never blocked for long.
+
+    Returns:
+        ``{"deleted": rows, "batches": n, "complete": bool}``
+    """
+    deleted = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        ids = list(queryset.values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return {"deleted": deleted, "batches": batches, "complete": True}
+        with transaction.atomic():
+            count, _ = queryset.model.objects.filter(pk__in=ids).delete()
+        deleted += count
+        batches += 1
+    return {"deleted": deleted, "batches": batches, "complete": not queryset.exists()}
+
+
+def purge_session_data(session_id: int, batch_size: int = 5000, delete_session: bool = False) -> Dict[str, Any]:
+    """
+    Delete all DataPoint rows of a session in batches, then optionally the session.
+
+    Avoids the single huge cascade transaction of ``session.delete()``.
+    """
+    result = delete_in_batches(acq_models.DataPoint.objects.filter(session_id=session_id), batch_size=batch_size)
+    if delete_session:
+        acq_models.AcquisitionSession.objects.filter(pk=session_id).delete()
+    return result
+
+
+def purge_expired_data_points(
+    batch_size: int = 5000,
+    max_batches: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Delete DataPoint rows older than the retention of their task.
+
+    On a partitioned PostgreSQL table, whole monthly partitions older than
+    the longest retention are dropped first, then the remaining expired
+    rows are deleted in batches.
+
+    Args:
+        batch_size: Rows per delete batch
+        max_batches: Batch budget for this run (None = until done)
+        now: Reference time (defaults to now)
+
+    Returns:
+        Summary with deleted rows per task, dropped partitions and whether
+        everything expired was removed
+    """
+    now = now or timezone.now()
+    tasks = list(config_models.AcqTask.objects.filter(sessions__isnull=False).distinct())
+    retention = {task.id: resolve_retention_days(task) for task in tasks}
+
+    dropped: List[str] = []
+    if tasks and all(retention.values()) and is_partitioned():
+        dropped = drop_expired_partitions(now - timedelta(days=max(retention.values())))
+
+    summary: Dict[str, Any] = {"deleted": 0, "tasks": {}, "partitions_dropped": dropped, "complete": True}
+    remaining = max_batches
+    for task in tasks:
+        days = retention[task.id]
+        if not days:
+            continue
+        if remaining is not None and remaining <= 0:
+            summary["complete"] = False
+            break
+
+        session_ids = list(task.sessions.values_list("id", flat=True))
+        expired = acq_models.DataPoint.objects.filter(
+            session_id__in=session_ids,
+            timestamp__lt=now - timedelta(days=days),
+        )
+        result = delete_in_batches(expired, batch_size=batch_size, max_batches=remaining)
+        if remaining is not None:
+            remaining -= result["batches"]
+        if result["deleted"]:
+            summary["tasks"][task.code] = result["deleted"]
+            summary["deleted"] += result["deleted"]
+        summary["complete"] = summary["complete"] and result["complete"]
+
+    return summary
+
+
+def is_partitioned() -> bool:
+    """Whether the DataPoint table is a range-partitioned PostgreSQL table."""
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE relname = %s", [DATAPOINT_TABLE])
+        row = cursor.fetchone()
+    return bool(row) and row[0] == "p"
+
+
+def _month_start(value: datetime, offset: int = 0) -> datetime:
+    month = value.year * 12 + value.month - 1 + offset
+    return datetime(month // 12, month % 12 + 1, 1, tzinfo=value.tzinfo)
+
+
+def ensure_partitions(months_ahead: int = 2, now: Optional[datetime] = None) -> List[str]:
+    """
+    Create monthly partitions from the current month up to ``months_ahead``.
+
+    Returns:
+        Names of partitions that were created
+    """
+    now = now or timezone.now()
+    created = []
+    with connection.cursor() as cursor:
+        for offset in range(months_ahead + 1):
+            start = _month_start(now, offset)
+            end = _month_start(now, offset + 1)
+            name = f"{DATAPOINT_TABLE}_p{start:%Y%m}"
+            cursor.execute("SELECT 1 FROM pg_class WHERE relname = %s", [name])
+            if cursor.fetchone():
+                continue
+            cursor.execute(
+                f'CREATE TABLE "{name}" PARTITION OF "{DATAPOINT_TABLE}" '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+            created.append(name)
+    if created:
+        logger.info(f"Created DataPoint partitions: {created}")
+    return created
+
+
+def drop_expired_partitions(cutoff: datetime) -> List[str]:
+    """
+    Drop monthly partitions whose whole range ends before ``cutoff``.
+
+    Dropping a partition is a metadata operation, independent of its size.
+
+    Returns:
+        Names of dropped partitions
+    """
+    dropped = []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s",
+            [DATAPOINT_TABLE],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+        for name in sorted(names):
+            match = _PARTITION_RE.match(name)
+            if not match:
+                continue
+            start = datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=cutoff.tzinfo)
+            if _month_start(start, 1) <= cutoff:
+                cursor.execute(f'DROP TABLE "{name}"')
+                dropped.append(name)
+    if dropped:
+        logger.info(f"Dropped expired DataPoint partitions: {dropped}")
+    return dropped
@@ -0,0 +1,247 @@
+"""Managed InfluxDB rollup tiers (min/max/mean/count per window)."""
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from acquisition.services.history_service import duration_seconds, flux_string, flux_time, format_time
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_STATS = ("min", "max", "mean", "count")
+
+# Range of closed windows aggregated into a tier, per tier name
+COVERAGE_KEY = "acquisition:rollup_coverage:{}"
+
+
+@dataclass(frozen=True)
+class RollupTier:
+    """
+    One rollup tier.
+
+    Rows keep the measurement, tags and field of the source series and get
+    an extra ``stat`` tag (min/max/mean/count); ``_time`` is the window stop.
+    """
+
+    name: str
+    every: str
+    bucket: str
+    lookback: str
+    retention: Optional[str] = None
+    backfill: Optional[str] = None
+    backfill_chunk: Optional[str] = None
+
+    @property
+    def every_seconds(self) -> float:
+        return duration_seconds(self.every)
+
+
+def get_rollup_tiers() -> List[RollupTier]:
+    """Return configured tiers, finest first (empty when rollups are disabled)."""
+    if not getattr(settings, "INFLUXDB_ROLLUP_ENABLED", False):
+        return []
+    tiers = []
+    for spec in getattr(settings, "INFLUXDB_ROLLUP_TIERS", []):
+        every = flux_time(spec["every"])
+        backfill = spec.get("backfill", spec.get("retention"))
+        tiers.append(RollupTier(
+            name=spec["name"],
+            every=every,
+            bucket=spec["bucket"],
+            lookback=flux_time(spec.get("lookback") or f"{int(duration_seconds(every) * 3)}s"),
+            retention=spec.get("retention"),
+            backfill=flux_time(backfill) if backfill else None,
+            backfill_chunk=flux_time(spec.get("backfill_chunk") or f"{int(duration_seconds(every) * 1440)}s"),
+        ))
+    return sorted(tiers, key=lambda tier: tier.every_seconds)
+
+
+def get_tier(name: str) -> RollupTier:
+    """Return a tier by name."""
+    for tier in get_rollup_tiers():
+        if tier.name == name:
+            return tier
+    raise ValueError(f"未知的汇总层级: {name}")
+
+
+def select_tier(window_seconds: float, start: datetime) -> Optional[RollupTier]:
+    """
+    Return the coarsest tier whose window is not larger than ``window_seconds``
+    and whose aggregated range reaches back to ``start``.
+
+    Tiers without recorded coverage (not rolled up or backfilled yet) are
+    never selected, so a query is only routed to rows that exist.
+
+    Args:
+        window_seconds: Time covered by one output row of the query
+        start: Start of the queried range
+
+    Returns:
+        Tier, or None if raw data is needed
+    """
+    selected = None
+    for tier in get_rollup_tiers():
+        if tier.every_seconds > window_seconds:
+            continue
+        coverage = get_coverage(tier)
+        if coverage is not None and coverage[0] <= start:
+            selected = tier
+    return selected
+
+
+def get_coverage(tier: RollupTier) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Return ``(from, until)`` of the contiguous range of closed windows in a tier.
+
+    Kept in the Django cache by the rollup runs; API processes only see it
+    when ``CACHE_URL`` points at a cache shared with the Celery workers.
+    """
+    value = cache.get(COVERAGE_KEY.format(tier.name))
+    if not value:
+        return None
+    return (
+        datetime.fromtimestamp(value["from"], tz=dt_timezone.utc),
+        datetime.fromtimestamp(value["until"], tz=dt_timezone.utc),
+    )
+
+
+def record_coverage(tier: RollupTier, start: datetime, stop: datetime) -> None:
+    """
+    Extend the tier coverage by an aggregated range.
+
+    Overlapping or adjacent ranges are merged. A range after a gap (e.g.
+    rollups paused longer than the lookback) restarts the coverage there;
+    backfill then closes the gap going backwards.
+    """
+    current = get_coverage(tier)
+    if current is not None and start <= current[1]:
+        if stop < current[0]:
+            return
+        start, stop = min(start, current[0]), max(stop, current[1])
+    cache.set(COVERAGE_KEY.format(tier.name), {"from": start.timestamp(), "until": stop.timestamp()}, timeout=None)
+
+
+def rollup_window(tier: RollupTier, now: Optional[datetime] = None) -> tuple:
+    """
+    Range to (re)aggregate in one incremental run.
+
+    The stop is aligned down to the tier window after subtracting
+    ``INFLUXDB_ROLLUP_LATENESS`` so only closed windows are written; the
+    start reaches ``lookback`` further back. Rows are keyed by series and
+    window, so re-aggregating an overlapping range overwrites them.
+    """
+    now = now or datetime.now(dt_timezone.utc)
+    lateness = duration_seconds(getattr(settings, "INFLUXDB_ROLLUP_LATENESS", "1m"))
+    every = tier.every_seconds
+    stop = math.floor((now.timestamp() - lateness) / every) * every
+    start = stop - abs(duration_seconds(tier.lookback))
+    return (
+        datetime.fromtimestamp(start, tz=dt_timezone.utc),
+        datetime.fromtimestamp(stop, tz=dt_timezone.utc),
+    )
+
+
+def build_rollup_flux(source_bucket: str, tier: RollupTier, start: datetime, stop: datetime, org: str) -> str:
+    """Build the Flux query aggregating raw numeric samples into ``tier.bucket``."""
+    stats = []
+    for stat in ROLLUP_STATS:
+        stats.append(
+            f"  data |> aggregateWindow(every: {tier.every}, fn: {stat}, createEmpty: false)"
+            f' |> toFloat() |> set(key: "stat", value: "{stat}")'
+        )
+    return "\n".join([
+        'import "types"',
+        f"data = from(bucket: {flux_string(source_bucket)})",
+        f"  |> range(start: {format_time(start)}, stop: {format_time(stop)})",
+        '  |> filter(fn: (r) => types.isType(v: r._value, type: "float") or types.isType(v: r._value, type: "int"))',
+        # Only good samples, so each series is one table once the quality tag is dropped
+        '  |> filter(fn: (r) => not exists r.quality or r.quality == "good")',
+        '  |> drop(columns: ["quality"])',
+        "union(tables: [",
+        ",\n".join(stats),
+        "])",
+        '  |> drop(columns: ["_start", "_stop"])',
+        f"  |> to(bucket: {flux_string(tier.bucket)}, org: {flux_string(org)})",
+    ])
+
+
+def run_rollup(
+    tier: RollupTier,
+    storage: Any,
+    start: Optional[datetime] = None,
+    stop: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Aggregate one range of raw data into a tier.
+
+    Args:
+        tier: Target tier
+        storage: Connected InfluxDB storage (source bucket = ``storage.bucket``)
+        start, stop: Range to aggregate (defaults to the incremental window)
+
+    Returns:
+        ``{"tier", "start", "stop", "rows"}``
+    """
+    if start is None or stop is None:
+        start, stop = rollup_window(tier)
+    flux = build_rollup_flux(storage.bucket, tier, start, stop, storage.org)
+    rows = sum(1 for _ in storage.iter_query_rows(flux))
+    record_coverage(tier, start, stop)
+    logger.info(f"Rolled up {rows} rows into tier {tier.name} for [{format_time(start)}, {format_time(stop)})")
+    return {"tier": tier.name, "start": format_time(start), "stop": format_time(stop), "rows": rows}
+
+
+def backfill_rollup(tier: RollupTier, storage: Any, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+    """
+    Aggregate the next older chunk of history into a tier.
+
+    Works backwards from the start of the tier coverage, one
+    ``backfill_chunk`` per call, until the coverage reaches ``backfill``
+    (defaults to the tier retention) before ``now``. Called after every
+    incremental run, so a new tier fills up over successive runs without
+    one long blocking job.
+
+    Returns:
+        The ``run_rollup`` summary, or None if there is nothing to backfill
+    """
+    coverage = get_coverage(tier)
+    if not tier.backfill or coverage is None:
+        return None
+    now = now or datetime.now(dt_timezone.utc)
+    every = tier.every_seconds
+    horizon = math.floor((now.timestamp() - abs(duration_seconds(tier.backfill))) / every) * every
+    stop = coverage[0].timestamp()
+    if stop <= horizon:
+        return None
+    start = max(stop - abs(duration_seconds(tier.backfill_chunk)), horizon)
+    return run_rollup(
+        tier,
+        storage,
+        datetime.fromtimestamp(start, tz=dt_timezone.utc),
+        datetime.fromtimestamp(stop, tz=dt_timezone.utc),
+    )
+
+
+def ensure_rollup_buckets(storage: Any) -> List[str]:
+    """Create missing tier buckets with their retention; returns created bucket names."""
+    from influxdb_client import BucketRetentionRules
+
+    buckets_api = storage.client.buckets_api()
+    created = []
+    for tier in get_rollup_tiers():
+        if buckets_api.find_bucket_by_name(tier.bucket):
+            continue
+        rules = None
+        if tier.retention:
+            rules = BucketRetentionRules(type="expire", every_seconds=int(duration_seconds(tier.retention)))
+        buckets_api.create_bucket(bucket_name=tier.bucket, retention_rules=rules, org=storage.org)
+        created.append(tier.bucket)
+    if created:
+        logger.info(f"Created rollup buckets: {created}")
+    return created
@@ -0,0 +1,171 @@
+"""Concurrent device validation before an acquisition session starts."""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Set
+
+from acquisition.protocols import ProtocolRegistry
+
+logger = logging.getLogger(__name__)
+
+
+def validate_device(device: Any, points: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Connect to one device and read its points once.
+
+    Returns:
+        ``{"result": {...}, "failed_points": [...]}`` where ``result`` is the
+        per-device entry of the startup validation report
+    """
+    failed_points = []
+    try:
+        device_config = {
+            "source_ip": device.ip_address,
+            "source_port": device.port,
+            "protocol_type": device.protocol,
+            **(device.metadata or {})
+        }
+        protocol = ProtocolRegistry.create(device.protocol, device_config)
+        protocol.connect()
+        try:
+            readings = protocol.read_points(points)
+        finally:
+            protocol.disconnect()
+    except Exception as e:
+        return {
+            "result": {
+                "status": "error",
+                "connected": False,
+                "error": str(e),
+                "total_points": len(points),
+            },
+            "failed_points": [
+                {"device": device.code, "point": point["code"], "reason": f"设备连接失败: {e}"}
+                for point in points
+            ],
+        }
+
+    read_codes = {reading["code"] for reading in readings}
+    for point in points:
+        if point["code"] not in read_codes:
+            failed_points.append({"device": device.code, "point": point["code"], "reason": "无法读取"})
+
+    failed_count = len(points) - len(readings)
+    return {
+        "result": {
+            "status": "healthy" if failed_count <= 0 else "partial",
+            "connected": True,
+            "total_points": len(points),
+            "successful_points": len(readings),
+            "failed_points": max(failed_count, 0),
+        },
+        "failed_points": failed_points,
+    }
+
+
+def validate_devices(
+    device_groups: Dict[int, Dict[str, Any]],
+    device_timeout: float = 5.0,
+    max_workers: int = 16,
+) -> Dict[str, Any]:
+    """
+    Validate all devices of a task concurrently.
+
+    Up to ``max_workers`` devices are checked at once, each in its own
+    daemon thread with its own deadline of ``device_timeout`` seconds from
+    the moment its check starts. A device that misses its deadline is
+    reported with status ``timeout`` and its thread is abandoned (it
+    disconnects on its own when the blocking call returns), so a slow
+    gateway does not delay the other devices. An abandoned thread keeps
+    its worker slot until its blocking call returns, so at most
+    ``max_workers`` connections are open at any time; when every slot is
+    held by abandoned threads for ``device_timeout`` seconds, the devices
+    still waiting are reported as timed out as well.
+    The wall time is about ``device_timeout * ceil(devices / max_workers)``
+    in the worst case instead of the sum over all devices.
+
+    Args:
+        device_groups: ``{device_id: {"device": Device, "points": [point_config, ...]}}``
+        device_timeout: Deadline per device in seconds
+        max_workers: Devices validated at the same time
+
+    Returns:
+        ``{"device_results", "failed_points", "total_points", "all_healthy"}``
+    """
+    results: "queue.Queue[tuple]" = queue.Queue()
+    pending = list(device_groups.values())
+    running: Dict[str, tuple] = {}
+    abandoned: Set[str] = set()
+    device_results: Dict[str, Dict[str, Any]] = {}
+    failed_points: List[Dict[str, Any]] = []
+    max_workers = max(1, max_workers)
+    stalled_until = None
+
+    def run(group: Dict[str, Any]) -> None:
+        try:
+            outcome = validate_device(group["device"], group["points"])
+        except Exception as e:  # never leave the caller waiting for a crashed check
+            outcome = {
+                "result": {"status": "error", "connected": False, "error": str(e), "total_points": len(group["points"])},
+                "failed_points": [],
+            }
+        results.put((group["device"].code, outcome))
+
+    def time_out(code: str, group: Dict[str, Any]) -> None:
+        device_results[code] = {
+            "status": "timeout",
+            "connected": False,
+            "error": f"验证超时 ({device_timeout}s)",
+            "total_points": len(group["points"]),
+        }
+        failed_points.extend({"device": code, "point": point["code"], "reason": "验证超时"} for point in group["points"])
+
+    while pending or running:
+        while pending and len(running) + len(abandoned) < max_workers:
+            group = pending.pop(0)
+            thread = threading.Thread(target=run, args=(group,), name=f"validate-{group['device'].code}", daemon=True)
+            running[group["device"].code] = (group, time.monotonic() + device_timeout)
+            thread.start()
+
+        if running:
+            stalled_until = None
+            next_deadline = min(deadline for _, deadline in running.values())
+        else:
+            # Every slot is held by an abandoned check; wait for one to return
+            if stalled_until is None:
+                stalled_until = time.monotonic() + device_timeout
+            next_deadline = stalled_until
+        try:
+            code, outcome = results.get(timeout=max(0.0, next_deadline - time.monotonic()))
+        except queue.Empty:
+            now = time.monotonic()
+            for code, (group, deadline) in list(running.items()):
+                if deadline <= now:
+                    del running[code]
+                    abandoned.add(code)
+                    logger.warning(f"Startup validation of device {code} timed out after {device_timeout}s")
+                    time_out(code, group)
+            if not running and stalled_until is not None and stalled_until <= now:
+                logger.warning(f"No validation slot freed up within {device_timeout}s, {len(pending)} devices not checked")
+                for group in pending:
+                    time_out(group["device"].code, group)
+                pending = []
+            continue
+
+        # Late results of abandoned checks only free their slot
+        if running.pop(code, None) is None:
+            abandoned.discard(code)
+            stalled_until = None
+            continue
+        device_results[code] = outcome["result"]
+        failed_points.extend(outcome["failed_points"])
+
+    return {
+        "device_results": device_results,
+        "failed_points": failed_points,
+        "total_points": sum(len(group["points"]) for group in device_groups.values()),
+        "all_healthy": all(result["status"] == "healthy" for result in device_results.values()),
+    }
@@ -1,5 +1,6 @@
 """Django signals for sending WebSocket notifications."""
 import logging
+from django.conf import settings
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from channels.layers import get_channel_layer
@@ -9,7 +10,6 @@ from acquisition import models as acq_models
 
 logger = logging.getLogger(__name__)
 
-
 @receiver(post_save, sender=acq_models.AcquisitionSession)
 def session_status_changed(sender, instance, created, **kwargs):
     """
@@ -47,6 +47,12 @@ def session_status_changed(sender, instance, created, **kwargs):
     except Exception as e:
         logger.error(f"Failed to send WebSocket notification to {session_group}: {e}")
 
+    if instance.status in [acq_models.AcquisitionSession.STATUS_STOPPED,
+                           acq_models.AcquisitionSession.STATUS_ERROR]:
+        from acquisition.services.live_broadcast import release_live_broadcaster
+
+        release_live_broadcaster(instance.id)
+
     # Send to global group
     global_group = 'acquisition_global'
     try:
@@ -88,12 +94,27 @@ def data_point_created(sender, instance, created, **kwargs):
     """
     Send WebSocket notification when a new data point is created.
 
-    Note: This can generate a lot of traffic for high-frequency data.
-    Consider batching or sampling if performance is an issue.
+    With ``ACQUISITION_LIVE_BROADCAST_ENABLED`` the row is handed to the
+    session's ``LiveBroadcaster``, which sends one coalesced frame per
+    interval; otherwise one message per row is sent, which can generate a
+    lot of traffic for high-frequency data. Bulk writers use
+    ``DataPointWriter``, whose ``bulk_create`` sends no ``post_save`` and
+    one notification per batch instead.
     """
     if not created:
         return
 
+    if getattr(settings, "ACQUISITION_LIVE_BROADCAST_ENABLED", True):
+        from acquisition.services.live_broadcast import get_live_broadcaster
+
+        get_live_broadcaster(instance.session_id).add_sample(
+            instance.point_code,
+            instance.value,
+            instance.timestamp.isoformat(),
+            instance.quality,
+        )
+        return
+
     channel_layer = get_channel_layer()
     if not channel_layer:
         return
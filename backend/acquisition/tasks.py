@@ -11,6 +11,7 @@ from django.utils import timezone
 from acquisition import models as acq_models
 from acquisition.protocols import ProtocolRegistry
 from acquisition.services.acquisition_service import AcquisitionService
+from acquisition.services.session_stats import COUNTERS_KEY
 from configuration import models as config_models
 from storage import StorageRegistry
 
@@ -18,13 +19,16 @@ logger = logging.getLogger(__name__)
 
 
 @shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 3})
-def start_acquisition_task(self, task_id: int, config_version_id: int = None) -> Dict[str, Any]:
+def start_acquisition_task(
+    self, task_id: int, config_version_id: int = None, session_id: int = None
+) -> Dict[str, Any]:
     """
     Start continuous data acquisition for a task.
 
     Args:
         task_id: ID of the AcqTask to execute
         config_version_id: Optional specific configuration version
+        session_id: Session created by the caller before dispatch (a new one is created if omitted)
 
     Returns:
         Dict with execution results
@@ -40,15 +44,36 @@ def start_acquisition_task(self, task_id: int, config_version_id: int = None) ->
 
         if not task.is_active:
             logger.warning(f"Task {task_id} is not active, skipping")
+            if session_id is not None:
+                acq_models.AcquisitionSession.objects.filter(pk=session_id).update(
+                    status=acq_models.AcquisitionSession.STATUS_STOPPED,
+                    error_message="Task is not active",
+                    stopped_at=timezone.now(),
+                )
             return {"status": "skipped", "reason": "Task is not active"}
 
-        # Create acquisition session
-        session = acq_models.AcquisitionSession.objects.create(
-            task=task,
-            status=acq_models.AcquisitionSession.STATUS_RUNNING,
-            celery_task_id=self.request.id,
-            started_at=timezone.now(),
-        )
+        if session_id is not None:
+            # Session created by the API before dispatch; also reached again on retries
+            session = acq_models.AcquisitionSession.objects.get(pk=session_id)
+            if session.status == acq_models.AcquisitionSession.STATUS_STOPPED:
+                logger.warning(f"Session {session_id} was stopped before it started, skipping")
+                return {"status": "skipped", "reason": "Session already stopped"}
+            session.status = acq_models.AcquisitionSession.STATUS_RUNNING
+            session.celery_task_id = self.request.id or session.celery_task_id
+            session.error_message = ""
+            session.stopped_at = None
+            session.started_at = session.started_at or timezone.now()
+            session.save(update_fields=[
+                "status", "celery_task_id", "error_message", "started_at", "stopped_at", "updated_at"
+            ])
+        else:
+            # Create acquisition session
+            session = acq_models.AcquisitionSession.objects.create(
+                task=task,
+                status=acq_models.AcquisitionSession.STATUS_RUNNING,
+                celery_task_id=self.request.id,
+                started_at=timezone.now(),
+            )
 
         try:
             # Use acquisition service to run the task
@@ -151,7 +176,11 @@ def acquire_once(task_id: int) -> Dict[str, Any]:
         # Update session
         session.status = acq_models.AcquisitionSession.STATUS_STOPPED
         session.stopped_at = timezone.now()
-        session.metadata = {"single_acquisition": True, "points_read": len(result.get("data", []))}
+        session.metadata = {
+            "single_acquisition": True,
+            "points_read": len(result.get("data", [])),
+            COUNTERS_KEY: service.counters.snapshot(),
+        }
         session.save()
 
         logger.info(f"Single acquisition for task {task_id} completed")
@@ -235,3 +264,124 @@ def test_storage_connection(storage_type: str, storage_config: Dict[str, Any]) -
             "storage": storage_type,
             "error": str(e),
         }
+
+
+@shared_task(bind=True)
+def purge_expired_data_points(self, batch_size: int = None, max_batches: int = None) -> Dict[str, Any]:
+    """
+    Delete DataPoint rows past their retention in bounded batches.
+
+    Runs periodically (see ``CELERY_BEAT_SCHEDULE``). When the batch budget
+    is used up before everything expired is gone, the task re-queues itself.
+
+    Args:
+        batch_size: Rows per delete batch (default ACQUISITION_PURGE_BATCH_SIZE)
+        max_batches: Batches per run (default ACQUISITION_PURGE_MAX_BATCHES)
+
+    Returns:
+        Purge summary
+    """
+    from django.conf import settings
+    from acquisition.services import retention
+
+    batch_size = batch_size or getattr(settings, "ACQUISITION_PURGE_BATCH_SIZE", 5000)
+    max_batches = max_batches or getattr(settings, "ACQUISITION_PURGE_MAX_BATCHES", 200)
+
+    if retention.is_partitioned():
+        retention.ensure_partitions()
+
+    result = retention.purge_expired_data_points(batch_size=batch_size, max_batches=max_batches)
+    logger.info(
+        f"Purged {result['deleted']} expired data points, "
+        f"dropped partitions {result['partitions_dropped']}, complete={result['complete']}"
+    )
+
+    if not result["complete"]:
+        purge_expired_data_points.apply_async(
+            kwargs={"batch_size": batch_size, "max_batches": max_batches},
+            countdown=getattr(settings, "ACQUISITION_PURGE_REQUEUE_DELAY", 10),
+        )
+    return result
+
+
+@shared_task
+def purge_session_data(session_id: int, delete_session: bool = True) -> Dict[str, Any]:
+    """
+    Delete a session's data points in batches, then the session itself.
+
+    Used instead of ``session.delete()`` so large sessions are not removed
+    in one cascading transaction.
+    """
+    from django.conf import settings
+    from acquisition.services import retention
+
+    result = retention.purge_session_data(
+        session_id,
+        batch_size=getattr(settings, "ACQUISITION_PURGE_BATCH_SIZE", 5000),
+        delete_session=delete_session,
+    )
+    logger.info(f"Purged {result['deleted']} data points of session {session_id}")
+    return result
+
+
+@shared_task
+def run_rollups() -> Dict[str, Any]:
+    """
+    Incrementally aggregate raw InfluxDB data into every rollup tier.
+
+    Each run re-aggregates the tier's lookback range up to the last closed
+    window; overlapping runs overwrite the same rows. Afterwards one older
+    chunk is backfilled per tier until the tier covers its backfill range.
+    """
+    from acquisition.services import rollup_service
+    from acquisition.services.history_service import get_query_storage
+
+    tiers = rollup_service.get_rollup_tiers()
+    if not tiers:
+        return {"status": "disabled"}
+
+    storage = get_query_storage()
+    try:
+        rollup_service.ensure_rollup_buckets(storage)
+    except Exception as e:
+        logger.warning(f"Could not ensure rollup buckets: {e}")
+
+    results = []
+    for tier in tiers:
+        try:
+            result = rollup_service.run_rollup(tier, storage)
+            result["backfill"] = rollup_service.backfill_rollup(tier, storage)
+            results.append(result)
+        except Exception as e:
+            logger.error(f"Rollup into tier {tier.name} failed: {e}", exc_info=True)
+            results.append({"tier": tier.name, "error": str(e)})
+    return {"status": "completed", "tiers": results}
+
+
+@shared_task
+def export_archive(start: str = None, stop: str = None, site_code: str = None) -> Dict[str, Any]:
+    """
+    Export raw InfluxDB samples into the Parquet archive.
+
+    Args:
+        start, stop: RFC3339 range (defaults to the previous UTC day)
+        site_code: Only export this site
+
+    Returns:
+        Export summary per day
+    """
+    from datetime import datetime
+
+    from django.conf import settings
+
+    from acquisition.services import archive_export
+
+    if start is None and stop is None and not getattr(settings, "ACQUISITION_ARCHIVE_EXPORT_ENABLED", False):
+        return {"status": "disabled"}
+
+    default_start, default_stop = archive_export.previous_day_range()
+    start_dt = datetime.fromisoformat(start.replace("Z", "+00:00")) if start else default_start
+    stop_dt = datetime.fromisoformat(stop.replace("Z", "+00:00")) if stop else default_stop
+    result = archive_export.export_archive(start_dt, stop_dt, site=site_code)
+    logger.info(f"Archive export finished: {result['rows']} samples over {len(result['days'])} days")
+    return {"status": "completed", **result}
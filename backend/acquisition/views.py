@@ -1,10 +1,14 @@
 """ViewSets for acquisition APIs."""
 from __future__ import annotations
 
+import base64
+import itertools
+import json
 import logging
 from typing import Dict, Any
 
 from django.db.models import Count, Q
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import mixins, status, viewsets
@@ -17,6 +21,42 @@ from configuration import models as config_models
 logger = logging.getLogger(__name__)
 
 
+def _split_param(value: str | None) -> list:
+    """Split a comma separated query parameter into a list of non-empty values."""
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+def _encode_cursor(timestamp, pk: int) -> str:
+    """Encode a (timestamp, id) keyset position as an opaque URL-safe token."""
+    raw = json.dumps([timestamp.isoformat(), pk], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(token: str):
+    """Decode a token from ``_encode_cursor``; raises ValueError if it is malformed."""
+    from django.utils.dateparse import parse_datetime
+
+    try:
+        timestamp, pk = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+        parsed = parse_datetime(timestamp)
+    except Exception as e:
+        raise ValueError(f"无效的游标: {token}") from e
+    if parsed is None or not isinstance(pk, int):
+        raise ValueError(f"无效的游标: {token}")
+    return parsed, pk
+
+
+def _streaming_export(chunks, export_format: str, filename: str) -> StreamingHttpResponse:
+    """Wrap encoded export chunks in a streaming download response."""
+    from acquisition.services.export_service import CONTENT_TYPES
+
+    response = StreamingHttpResponse(chunks, content_type=CONTENT_TYPES[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    # Keep reverse proxies from buffering the whole export
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @extend_schema_view(
     list=extend_schema(summary="列出采集会话", description="查询所有采集会话历史"),
     retrieve=extend_schema(summary="查看会话详情", description="获取指定采集会话的详细信息"),
@@ -39,12 +79,12 @@ class AcquisitionSessionViewSet(
 
     @extend_schema(
         summary="启动采集任务",
-        description="同步验证连接并启动采集任务（5秒超时）",
+        description="并发验证设备连接（每台设备独立超时）并启动采集任务",
         request=serializers.StartTaskSerializer,
         responses={
             201: serializers.AcquisitionSessionSerializer,
             400: {"description": "请求参数错误、任务已在运行或连接验证失败"},
-            504: {"description": "启动超时"},
+            503: {"description": "任务调度失败"},
         }
     )
     @action(detail=False, methods=['post'], url_path='start-task')
@@ -60,18 +100,19 @@ class AcquisitionSessionViewSet(
             "metadata": {}                     // 可选
         }
 
-        该接口会在5秒内完成以下操作：
-        1. 验证设备连接
+        该接口会完成以下操作：
+        1. 并发验证设备连接（每台设备 ACQUISITION_STARTUP_DEVICE_TIMEOUT 秒超时）
         2. 检查测点配置
-        3. 启动后台采集任务
+        3. 创建会话并启动后台采集任务（会话ID在派发前确定）
         4. 返回详细的健康状态报告
         """
         import time
-        from acquisition.protocols import ProtocolRegistry
+        import uuid
+        from acquisition.services.startup_validation import validate_devices
         from collections import defaultdict
+        from django.conf import settings
 
         start_time = time.time()
-        TIMEOUT = 5.0  # 5秒超时
 
         serializer = serializers.StartTaskSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -113,80 +154,16 @@ class AcquisitionSessionViewSet(
             }
             device_groups[device_id]["points"].append(point_config)
 
-        # 同步验证所有设备连接和测点
-        validation_results = {}
-        all_healthy = True
-        total_points = 0
-        failed_points = []
-
-        for device_id, group in device_groups.items():
-            if time.time() - start_time > TIMEOUT:
-                return Response(
-                    {
-                        "detail": "启动验证超时",
-                        "timeout": TIMEOUT,
-                        "elapsed": time.time() - start_time,
-                    },
-                    status=status.HTTP_504_GATEWAY_TIMEOUT
-                )
-
-            device = group["device"]
-            points = group["points"]
-            total_points += len(points)
-
-            try:
-                # 创建协议实例并验证连接
-                device_config = {
-                    "source_ip": device.ip_address,
-                    "source_port": device.port,
-                    "protocol_type": device.protocol,
-                    **(device.metadata or {})
-                }
-
-                protocol = ProtocolRegistry.create(device.protocol, device_config)
-                protocol.connect()
-
-                # 尝试读取测点验证
-                try:
-                    readings = protocol.read_points(points)
-                    successful_points = len(readings)
-                    failed_count = len(points) - successful_points
-
-                    if failed_count > 0:
-                        all_healthy = False
-                        for point in points:
-                            if not any(r["code"] == point["code"] for r in readings):
-                                failed_points.append({
-                                    "device": device.code,
-                                    "point": point["code"],
-                                    "reason": "无法读取"
-                                })
-
-                    validation_results[device.code] = {
-                        "status": "healthy" if failed_count == 0 else "partial",
-                        "connected": True,
-                        "total_points": len(points),
-                        "successful_points": successful_points,
-                        "failed_points": failed_count,
-                    }
-                finally:
-                    protocol.disconnect()
-
-            except Exception as e:
-                all_healthy = False
-                validation_results[device.code] = {
-                    "status": "error",
-                    "connected": False,
-                    "error": str(e),
-                    "total_points": len(points),
-                }
-                # 标记所有测点为失败
-                for point in points:
-                    failed_points.append({
-                        "device": device.code,
-                        "point": point["code"],
-                        "reason": f"设备连接失败: {str(e)}"
-                    })
+        # 并发验证所有设备连接和测点，每台设备独立计时
+        validation = validate_devices(
+            device_groups,
+            device_timeout=getattr(settings, "ACQUISITION_STARTUP_DEVICE_TIMEOUT", 5.0),
+            max_workers=getattr(settings, "ACQUISITION_STARTUP_MAX_WORKERS", 16),
+        )
+        validation_results = validation["device_results"]
+        failed_points = validation["failed_points"]
+        total_points = validation["total_points"]
+        all_healthy = validation["all_healthy"]
 
         # 如果所有设备都无法连接，返回错误
         if not any(v.get("connected") for v in validation_results.values()):
@@ -208,30 +185,49 @@ class AcquisitionSessionViewSet(
                 defaults={'host': worker_identifier}
             )
 
-        # 启动Celery后台任务
-        config_version_id = serializer.validated_data.get('config_version_id')
-        celery_result = tasks.start_acquisition_task.delay(task_id, config_version_id)
+        # 先创建会话再派发任务，会话ID与Celery任务ID在派发前即已确定
+        startup_validation = {
+            "timestamp": timezone.now().isoformat(),
+            "all_healthy": all_healthy,
+            "total_points": total_points,
+            "failed_points_count": len(failed_points),
+            "device_results": validation_results,
+            "elapsed_seconds": time.time() - start_time,
+        }
+        if failed_points:
+            startup_validation["failed_points"] = failed_points[:20]
 
-        # 等待会话创建
-        time.sleep(0.5)
-        session = acq_models.AcquisitionSession.objects.filter(
-            celery_task_id=celery_result.id
-        ).first()
+        celery_task_id = str(uuid.uuid4())
+        session = acq_models.AcquisitionSession.objects.create(
+            task=task,
+            worker=worker,
+            status=acq_models.AcquisitionSession.STATUS_RUNNING,
+            celery_task_id=celery_task_id,
+            started_at=timezone.now(),
+            metadata={
+                **(serializer.validated_data.get('metadata') or {}),
+                "startup_validation": startup_validation,
+            },
+        )
 
-        # 将验证结果写入会话元数据
-        if session:
-            session.metadata = session.metadata or {}
-            session.metadata["startup_validation"] = {
-                "timestamp": timezone.now().isoformat(),
-                "all_healthy": all_healthy,
-                "total_points": total_points,
-                "failed_points_count": len(failed_points),
-                "device_results": validation_results,
-                "elapsed_seconds": time.time() - start_time,
-            }
-            if failed_points:
-                session.metadata["startup_validation"]["failed_points"] = failed_points[:20]
-            session.save(update_fields=['metadata'])
+        # 启动Celery后台任务
+        config_version_id = serializer.validated_data.get('config_version_id')
+        try:
+            celery_result = tasks.start_acquisition_task.apply_async(
+                args=(task_id, config_version_id),
+                kwargs={"session_id": session.id},
+                task_id=celery_task_id,
+            )
+        except Exception as e:
+            logger.error(f"Failed to dispatch acquisition task {task_id}: {e}", exc_info=True)
+            session.status = acq_models.AcquisitionSession.STATUS_ERROR
+            session.error_message = f"任务调度失败: {e}"
+            session.stopped_at = timezone.now()
+            session.save(update_fields=['status', 'error_message', 'stopped_at', 'updated_at'])
+            return Response(
+                {"detail": f"任务调度失败: {e}", "session_id": session.id},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
 
         logger.info(
             f"Started acquisition task {task_id} ({task.code}), "
@@ -242,7 +238,7 @@ class AcquisitionSessionViewSet(
         # 构建响应
         response_data = {
             "detail": "任务启动成功" if all_healthy else "任务已启动但部分测点异常",
-            "session_id": session.id if session else None,
+            "session_id": session.id,
             "celery_task_id": celery_result.id,
             "task_code": task.code,
             "validation": {
@@ -351,23 +347,12 @@ class AcquisitionSessionViewSet(
 
         GET /api/acquisition/sessions/{id}/status/
         """
-        session = self.get_object()
+        from acquisition.services.session_stats import session_counters
 
-        # 统计数据点
-        data_points_count = acq_models.DataPoint.objects.filter(
-            session=session
-        ).count()
-
-        # 统计错误数据点
-        error_count = acq_models.DataPoint.objects.filter(
-            session=session,
-            quality__in=['bad', 'uncertain']
-        ).count()
+        session = self.get_object()
 
-        # 获取最后一次读取时间
-        last_data_point = acq_models.DataPoint.objects.filter(
-            session=session
-        ).order_by('-timestamp').first()
+        # 采集流程定期写入的计数器，不再扫描 DataPoint 表
+        counters = session_counters(session)
 
         # 计算运行时长
         duration_seconds = None
@@ -384,9 +369,10 @@ class AcquisitionSessionViewSet(
             'started_at': session.started_at,
             'stopped_at': session.stopped_at,
             'duration_seconds': duration_seconds,
-            'points_read': data_points_count,
-            'last_read_time': last_data_point.timestamp if last_data_point else None,
-            'error_count': error_count,
+            'points_read': counters['points_read'],
+            'last_read_time': counters['last_read_time'],
+            'error_count': counters['error_count'],
+            'points_per_second': counters['points_per_second'],
             'error_message': session.error_message,
             'metadata': session.metadata or {},
         }
@@ -415,7 +401,7 @@ class AcquisitionSessionViewSet(
 
     @extend_schema(
         summary="查询会话的数据点",
-        description="获取指定会话采集的数据点列表",
+        description="按 (timestamp, id) 倒序游标分页获取会话数据点，翻页深度不影响查询耗时；总数仅在 with_count=true 时计算",
         responses=serializers.DataPointSerializer(many=True)
     )
     @action(detail=True, methods=['get'], url_path='data-points')
@@ -423,24 +409,106 @@ class AcquisitionSessionViewSet(
         """
         查询会话的数据点
 
-        GET /api/acquisition/sessions/{id}/data-points/?limit=100&offset=0
+        GET /api/acquisition/sessions/{id}/data-points/?limit=100&cursor=<next_cursor>
+
+        可选参数:
+            limit: 每页数量（默认 100，最大 1000）
+            cursor: 上一页返回的 next_cursor，缺省为第一页
+            offset: 兼容旧客户端的偏移分页（未提供 cursor 时生效，深翻页较慢）
+            with_count: true 时返回精确总数（全量计数，代价较高），否则 count 为 null
         """
         session = self.get_object()
 
         # 分页参数
-        limit = int(request.query_params.get('limit', 100))
-        offset = int(request.query_params.get('offset', 0))
+        try:
+            limit = min(max(int(request.query_params.get('limit', 100)), 1), 1000)
+            offset = int(request.query_params.get('offset', 0))
+        except ValueError:
+            return Response(
+                {"detail": "limit / offset 必须为整数"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        data_points = acq_models.DataPoint.objects.filter(
-            session=session
-        ).order_by('-timestamp')[offset:offset + limit]
+        queryset = acq_models.DataPoint.objects.filter(session=session)
+        page = queryset.order_by('-timestamp', '-id')
 
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            try:
+                timestamp, last_id = _decode_cursor(cursor)
+            except ValueError as e:
+                return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            # 键集分页: 直接从上一页最后一行之后开始扫描索引
+            page = page.filter(Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=last_id))
+        elif offset:
+            page = page[offset:]
+
+        # 多取一行判断是否还有下一页
+        data_points = list(page[:limit + 1])
+        has_more = len(data_points) > limit
+        data_points = data_points[:limit]
+
+        with_count = request.query_params.get('with_count', '').lower() in ('1', 'true', 'yes')
         serializer = serializers.DataPointSerializer(data_points, many=True)
         return Response({
-            'count': acq_models.DataPoint.objects.filter(session=session).count(),
+            'count': queryset.count() if with_count else None,
+            'next_cursor': (
+                _encode_cursor(data_points[-1].timestamp, data_points[-1].id) if has_more else None
+            ),
             'results': serializer.data,
         })
 
+    @extend_schema(
+        summary="流式导出会话数据点",
+        description="按时间顺序以 NDJSON 或 CSV 流式导出会话的全部数据点，内存占用与数据量无关",
+        responses={200: {"description": "NDJSON / CSV 数据流"}}
+    )
+    @action(detail=True, methods=['get'], url_path='data-points/export')
+    def export_data_points(self, request, pk=None):
+        """
+        流式导出会话数据点
+
+        GET /api/acquisition/sessions/{id}/data-points/export/?export_format=csv
+
+        可选参数:
+            export_format: ndjson（默认）/ csv
+            point_codes: 逗号分隔的测点编码过滤
+            start_time / end_time: ISO 8601 时间范围 [start_time, end_time)
+        """
+        from django.utils.dateparse import parse_datetime
+        from acquisition.services import export_service
+
+        session = self.get_object()
+        export_format = request.query_params.get('export_format', export_service.FORMAT_NDJSON)
+        if export_format not in export_service.EXPORT_FORMATS:
+            return Response(
+                {"detail": f"不支持的导出格式: {export_format}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        bounds = {}
+        for name in ('start_time', 'end_time'):
+            value = request.query_params.get(name)
+            if value:
+                bounds[name] = parse_datetime(value)
+                if bounds[name] is None:
+                    return Response(
+                        {"detail": f"无效的时间参数: {value}"},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+        rows = export_service.iter_session_rows(
+            session.id,
+            point_codes=_split_param(request.query_params.get('point_codes')),
+            start=bounds.get('start_time'),
+            stop=bounds.get('end_time'),
+        )
+        return _streaming_export(
+            export_service.encode_rows(rows, export_format, export_service.DATA_POINT_COLUMNS),
+            export_format,
+            f"session_{session.id}_data_points",
+        )
+
     @extend_schema(
         summary="查询测点历史数据趋势",
         description="获取指定测点的历史数据，用于绘制趋势图",
@@ -469,9 +537,24 @@ class AcquisitionSessionViewSet(
         查询测点历史数据 (from InfluxDB)
 
         GET /api/acquisition/sessions/point-history/?point_code=xxx&start_time=xxx&end_time=xxx&limit=1000
+
+        可选参数:
+            point_codes: 逗号分隔的多个测点编码
+            fields: 逗号分隔的字段名过滤
+            bucket: InfluxDB bucket（默认 INFLUXDB_BUCKET）
+            width / max_points: 图表像素宽度或最大点数，指定后按分辨率降采样
+            downsample: 降采样方式 minmax（默认）/ mean / lttb
+            cache: 设为 false 时跳过查询缓存
+            tier: 汇总层级（如 1m / 1h），raw 表示原始数据；默认按分辨率自动选择
         """
+        from django.conf import settings
+        from acquisition.services.history_service import HistoryQuery, get_history_cache, query_point_history
+
+        point_codes = _split_param(request.query_params.get('point_codes'))
         point_code = request.query_params.get('point_code')
-        if not point_code:
+        if point_code and point_code not in point_codes:
+            point_codes.insert(0, point_code)
+        if not point_codes:
             return Response(
                 {"detail": "缺少参数: point_code"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -480,81 +563,262 @@ class AcquisitionSessionViewSet(
         # 时间范围参数
         start_time = request.query_params.get('start_time', '-1h')  # Default to last hour
         end_time = request.query_params.get('end_time', 'now()')
-        limit = int(request.query_params.get('limit', 1000))
-
-        # Query InfluxDB using Docker CLI (workaround for external auth issue)
-        import subprocess
-
-        # Build Flux query
-        flux_query = f'from(bucket:"iot-data") |> range(start: {start_time}, stop: {end_time}) |> filter(fn: (r) => r["point"] == "{point_code}") |> limit(n: {limit}) |> sort(columns: ["_time"])'
 
         try:
-            result = subprocess.run(
-                ['docker', 'exec', 'influxdb', 'influx', 'query', flux_query, '--raw'],
-                capture_output=True,
-                text=True,
-                timeout=10
+            max_points = request.query_params.get('max_points') or request.query_params.get('width')
+            if max_points:
+                max_points = min(int(max_points), getattr(settings, 'ACQUISITION_HISTORY_MAX_POINTS', 5000))
+            query = HistoryQuery(
+                point_codes=point_codes,
+                start=start_time,
+                stop=end_time,
+                fields=_split_param(request.query_params.get('fields')),
+                limit=int(request.query_params.get('limit', 1000)),
+                bucket=request.query_params.get('bucket'),
+                max_points=max_points or None,
+                downsample=request.query_params.get('downsample', 'none'),
+                tier=request.query_params.get('tier') or None,
             )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            if result.returncode != 0:
-                raise Exception(f"Docker command failed: {result.stderr}")
-
-            # Parse CSV output (InfluxDB format with leading commas for data rows)
-            data = []
-            lines = result.stdout.strip().split('\n')
-
-            # Find header line (starts with ,result,table,...)
-            header_idx = -1
-            for i, line in enumerate(lines):
-                if line.startswith(',result,table,'):
-                    header_idx = i
-                    break
-
-            if header_idx >= 0 and len(lines) > header_idx + 1:
-                headers = lines[header_idx].split(',')
-                time_idx = headers.index('_time') if '_time' in headers else -1
-                value_idx = headers.index('_value') if '_value' in headers else -1
-
-                for line in lines[header_idx + 1:]:
-                    # Data lines start with double comma ,,
-                    if not line.startswith(',,') or not line.strip():
-                        continue
-
-                    parts = line.split(',')
-                    if len(parts) > max(time_idx, value_idx) and time_idx >= 0 and value_idx >= 0:
-                        try:
-                            # InfluxDB timestamps are in RFC3339 format
-                            timestamp = parts[time_idx] if time_idx < len(parts) else ''
-                            value = float(parts[value_idx]) if value_idx < len(parts) and parts[value_idx] else 0
-
-                            data.append({
-                                'timestamp': timestamp,
-                                'value': value,
-                                'quality': 'good',
-                            })
-                        except (ValueError, IndexError) as e:
-                            logger.debug(f"Failed to parse line: {line}, error: {e}")
-                            continue
+        try:
+            cache = get_history_cache() if request.query_params.get('cache', 'true') != 'false' else None
+            series = query_point_history(query, cache=cache)
+            data = [row for s in series if s['point_code'] == point_codes[0] for row in s['data']]
 
             return Response({
-                'point_code': point_code,
+                'point_code': point_codes[0],
                 'start_time': start_time,
                 'end_time': end_time,
+                'bucket': query.bucket,
+                'downsample': query.downsample,
+                'max_points': query.max_points,
+                'tier': query.tier or 'raw',
+                'source': query.source,
                 'count': len(data),
                 'data': data,
+                'series': series,
             })
 
         except Exception as e:
             logger.error(f"Failed to query InfluxDB: {e}")
             return Response({
-                'point_code': point_code,
+                'point_code': point_codes[0],
                 'start_time': start_time,
                 'end_time': end_time,
                 'count': 0,
                 'data': [],
+                'series': [],
                 'error': str(e),
             })
 
+    @extend_schema(
+        summary="批量查询多个测点的历史数据",
+        description="一次 InfluxDB 查询读取多个测点同一时间范围的数据，返回共享时间轴和每个测点的数值数组",
+        request=serializers.BatchHistoryRequestSerializer,
+        responses={
+            200: {
+                "description": "列式对齐的历史数据",
+                "content": {
+                    "application/json": {
+                        "example": {
+                            "timestamps": ["2025-10-10T00:00:00Z", "2025-10-10T00:01:00Z"],
+                            "series": [
+                                {"point_code": "Temperature_01", "field": "Temperature_01", "values": [25.5, 25.6]},
+                                {"point_code": "Pressure_01", "field": "Pressure_01", "values": [1.01, None]}
+                            ]
+                        }
+                    }
+                }
+            }
+        }
+    )
+    @action(detail=False, methods=['get', 'post'], url_path='batch-history')
+    def batch_history(self, request):
+        """
+        批量查询测点历史数据 (from InfluxDB)
+
+        GET /api/acquisition/sessions/batch-history/?point_codes=a,b,c&start_time=-6h&max_points=800
+        POST /api/acquisition/sessions/batch-history/
+        {
+            "point_codes": ["a", "b", "c"],
+            "start_time": "-6h",
+            "end_time": "now()",
+            "max_points": 800  (可选，指定后默认按 mean 窗口降采样，各测点时间轴一致)
+        }
+        """
+        from django.conf import settings
+        from acquisition.services.history_service import (
+            HistoryQuery,
+            align_series,
+            get_history_cache,
+            query_point_history,
+        )
+
+        if request.method == 'GET':
+            payload = {
+                key: value for key, value in request.query_params.items()
+                if key not in ('point_codes', 'fields', 'cache')
+            }
+            payload['point_codes'] = _split_param(request.query_params.get('point_codes'))
+            payload['fields'] = _split_param(request.query_params.get('fields'))
+        else:
+            payload = request.data
+        serializer = serializers.BatchHistoryRequestSerializer(data=payload)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+
+        max_points = params.get('max_points')
+        if max_points:
+            max_points = min(max_points, getattr(settings, 'ACQUISITION_HISTORY_MAX_POINTS', 5000))
+        try:
+            query = HistoryQuery(
+                point_codes=list(dict.fromkeys(params['point_codes'])),
+                start=params['start_time'],
+                stop=params['end_time'],
+                fields=params['fields'],
+                limit=params['limit'],
+                bucket=params.get('bucket') or None,
+                max_points=max_points or None,
+                # Window means share their timestamps across points, so columns line up
+                downsample=params.get('downsample') or ('mean' if max_points else 'none'),
+                tier=params.get('tier') or None,
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            cache = get_history_cache() if request.query_params.get('cache', 'true') != 'false' else None
+            series = query_point_history(query, cache=cache)
+        except Exception as e:
+            logger.error(f"Failed to query InfluxDB: {e}")
+            return Response({"detail": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        aligned = align_series(series)
+        returned = {entry['point_code'] for entry in series}
+        return Response({
+            'point_codes': query.point_codes,
+            'start_time': query.start,
+            'end_time': query.stop,
+            'bucket': query.bucket,
+            'downsample': query.downsample,
+            'max_points': query.max_points,
+            'tier': query.tier or 'raw',
+            'source': query.source,
+            'count': len(aligned['timestamps']),
+            'missing': [code for code in query.point_codes if code not in returned],
+            **aligned,
+        })
+
+    @extend_schema(
+        summary="流式导出测点历史数据",
+        description="从 InfluxDB 流式读取时间范围内的全部原始数据，并以 NDJSON 或 CSV 格式边读边输出（不截断、不降采样）",
+        responses={200: {"description": "NDJSON / CSV 数据流"}}
+    )
+    @action(detail=False, methods=['get'], url_path='point-history/export')
+    def export_point_history(self, request):
+        """
+        流式导出测点历史数据 (from InfluxDB)
+
+        GET /api/acquisition/sessions/point-history/export/?point_codes=a,b&start_time=-7d&export_format=csv
+
+        可选参数:
+            export_format: ndjson（默认）/ csv
+            fields: 逗号分隔的字段名过滤
+            bucket: InfluxDB bucket（默认 INFLUXDB_BUCKET）
+        """
+        from acquisition.services import export_service
+        from acquisition.services.history_service import HistoryQuery, get_query_storage
+
+        point_codes = _split_param(request.query_params.get('point_codes'))
+        point_code = request.query_params.get('point_code')
+        if point_code and point_code not in point_codes:
+            point_codes.insert(0, point_code)
+        if not point_codes:
+            return Response(
+                {"detail": "缺少参数: point_code"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        export_format = request.query_params.get('export_format', export_service.FORMAT_NDJSON)
+        if export_format not in export_service.EXPORT_FORMATS:
+            return Response(
+                {"detail": f"不支持的导出格式: {export_format}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            query = HistoryQuery(
+                point_codes=point_codes,
+                start=request.query_params.get('start_time', '-1h'),
+                stop=request.query_params.get('end_time', 'now()'),
+                fields=_split_param(request.query_params.get('fields')),
+                bucket=request.query_params.get('bucket'),
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            rows = export_service.iter_history_rows(query, get_query_storage())
+            chunks = export_service.encode_rows(rows, export_format, export_service.HISTORY_COLUMNS)
+            # Run the query before the response starts so InfluxDB errors still get a status code
+            first = next(chunks, b'')
+        except Exception as e:
+            logger.error(f"Failed to export point history from InfluxDB: {e}")
+            return Response({"detail": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        return _streaming_export(itertools.chain([first], chunks), export_format, "point_history")
+
+    @extend_schema(
+        summary="批量查询测点当前值",
+        description="从最新值缓存读取测点的当前值、质量、时间戳和来源会话，不访问数据库或 InfluxDB",
+        request=serializers.CurrentValuesRequestSerializer,
+        responses={200: {"description": "测点当前值"}}
+    )
+    @action(detail=False, methods=['get', 'post'], url_path='current-values')
+    def current_values(self, request):
+        """
+        批量查询测点当前值
+
+        GET /api/acquisition/sessions/current-values/?point_codes=a,b,c
+        POST /api/acquisition/sessions/current-values/
+        {
+            "point_codes": ["a", "b", "c"],
+            "task_id": 1  (可选，查询任务下全部测点)
+        }
+        """
+        from acquisition.services.latest_values import get_latest_value_store
+
+        if request.method == 'GET':
+            payload = {'point_codes': _split_param(request.query_params.get('point_codes'))}
+            if request.query_params.get('task_id'):
+                payload['task_id'] = request.query_params['task_id']
+        else:
+            payload = request.data
+        serializer = serializers.CurrentValuesRequestSerializer(data=payload)
+        serializer.is_valid(raise_exception=True)
+
+        point_codes = list(serializer.validated_data['point_codes'])
+        task_id = serializer.validated_data.get('task_id')
+        if task_id:
+            point_codes.extend(
+                config_models.Point.objects.filter(tasks__id=task_id).values_list('code', flat=True)
+            )
+        point_codes = list(dict.fromkeys(point_codes))
+
+        try:
+            values = get_latest_value_store().get_many(point_codes)
+        except Exception as e:
+            logger.error(f"Failed to read latest values: {e}")
+            return Response({"detail": f"最新值缓存不可用: {e}"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        return Response({
+            'count': sum(1 for value in values.values() if value is not None),
+            'values': values,
+            'missing': [code for code, value in values.items() if value is None],
+        })
+
     @extend_schema(
         summary="测试单次采集",
         description="执行单次采集测试，不创建持久会话",
@@ -5,3 +5,7 @@ class ConfigurationConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "configuration"
     verbose_name = "????"
+
+    def ready(self):
+        """Import signals."""
+        import configuration.signals  # noqa
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-19 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuration', '0004_alter_importjob_status_alter_taskrun_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='acqtask',
+            name='storage_sinks',
+            field=models.JSONField(blank=True, default=list, help_text='存储目标列表，为空时使用站点/全局配置'),
+        ),
+    ]
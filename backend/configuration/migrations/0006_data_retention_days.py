@@ -0,0 +1,23 @@
+# Generated by Django 4.2.25 on 2026-10-19 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuration', '0005_acqtask_storage_sinks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='acqtask',
+            name='data_retention_days',
+            field=models.PositiveIntegerField(blank=True, help_text='采集数据保留天数，为空时使用站点/全局配置，0 表示永久保留', null=True),
+        ),
+        migrations.AddField(
+            model_name='site',
+            name='data_retention_days',
+            field=models.PositiveIntegerField(blank=True, help_text='采集数据保留天数，为空时使用全局配置，0 表示永久保留', null=True),
+        ),
+    ]
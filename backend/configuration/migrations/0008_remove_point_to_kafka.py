@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-19 05:03
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('configuration', '0007_configrevision'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='point',
+            name='to_kafka',
+        ),
+    ]
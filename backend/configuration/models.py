@@ -22,6 +22,9 @@ class Site(TimeStampedModel):
     code = models.CharField(max_length=64, unique=True)
     name = models.CharField(max_length=128)
     description = models.TextField(blank=True)
+    data_retention_days = models.PositiveIntegerField(
+        null=True, blank=True, help_text="采集数据保留天数，为空时使用全局配置，0 表示永久保留"
+    )
 
     class Meta:
         ordering = ["code"]
@@ -112,6 +115,10 @@ class AcqTask(TimeStampedModel):
     description = models.TextField(blank=True)
     schedule = models.CharField(max_length=64, default="continuous")
     is_active = models.BooleanField(default=True)
+    storage_sinks = models.JSONField(default=list, blank=True, help_text="存储目标列表，为空时使用站点/全局配置")
+    data_retention_days = models.PositiveIntegerField(
+        null=True, blank=True, help_text="采集数据保留天数，为空时使用站点/全局配置，0 表示永久保留"
+    )
 
     points = models.ManyToManyField(Point, through="TaskPoint", related_name="tasks")
 
@@ -229,3 +236,16 @@ class TaskRun(TimeStampedModel):
 
     def __str__(self) -> str:
         return f"{self.task.code}:{self.status}"
+
+
+class ConfigRevision(models.Model):
+    """Monotonic revision counter of configuration data, per site code and global."""
+
+    GLOBAL_SCOPE = "*"
+
+    scope = models.CharField(max_length=64, unique=True, help_text="站点编码，* 表示全部站点")
+    revision = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self) -> str:
+        return f"{self.scope}@{self.revision}"
@@ -15,7 +15,7 @@ class SiteSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = models.Site
-        fields = ["id", "code", "name", "description", "created_at", "updated_at"]
+        fields = ["id", "code", "name", "description", "data_retention_days", "created_at", "updated_at"]
         read_only_fields = ("id", "created_at", "updated_at")
 
 
@@ -103,7 +103,7 @@ class AcqTaskSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = models.AcqTask
-        fields = ["id", "code", "name", "description", "schedule", "is_active", "points", "created_at", "updated_at"]
+        fields = ["id", "code", "name", "description", "schedule", "is_active", "storage_sinks", "data_retention_days", "points", "created_at", "updated_at"]
         read_only_fields = ("id", "created_at", "updated_at")
 
     def create(self, validated_data):
@@ -203,3 +203,18 @@ class ImportDiffSerializer(serializers.Serializer):
 class TaskControlSerializer(serializers.Serializer):
     worker = serializers.CharField(required=False, allow_blank=True)
     note = serializers.CharField(required=False, allow_blank=True)
+
+
+class BulkTaskControlSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=["start", "stop"])
+    site_code = serializers.CharField(required=False, allow_blank=True)
+    task_ids = serializers.ListField(child=serializers.IntegerField(), required=False)
+    task_codes = serializers.ListField(child=serializers.CharField(), required=False)
+    only_active = serializers.BooleanField(required=False, default=True)
+    worker = serializers.CharField(required=False, allow_blank=True)
+    note = serializers.CharField(required=False, allow_blank=True)
+
+    def validate(self, attrs):
+        if not (attrs.get("site_code") or attrs.get("task_ids") or attrs.get("task_codes")):
+            raise serializers.ValidationError("需指定 site_code、task_ids 或 task_codes 中的至少一项")
+        return attrs
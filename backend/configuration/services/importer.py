@@ -11,6 +11,7 @@ from django.db import transaction
 from django.utils import timezone
 
 from configuration import models
+from configuration.services.revisions import batch_revision_bumps, bump_revision
 
 logger = logging.getLogger(__name__)
 
@@ -199,6 +200,7 @@ class ExcelImportService:
         }
 
     @transaction.atomic
+    @batch_revision_bumps()
     def apply(self, site_code: str = "default", created_by: str = "", mode: str = "merge") -> Dict[str, object]:
         """
         应用配置到数据库。
@@ -424,6 +426,9 @@ class ExcelImportService:
             "task_versions": task_version_ids,
         }
 
+        # One revision bump for the whole import (ETag of the config list APIs)
+        bump_revision([site.code])
+
         self.job.status = models.ImportJob.STATUS_APPLIED
         self.job.related_version_id = task_version_ids[0] if task_version_ids else None
         summary = self.job.summary or {}
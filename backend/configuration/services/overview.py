@@ -0,0 +1,95 @@
+"""Cached per-site task overview for the dashboard."""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Exists, OuterRef, Q
+from django.utils import timezone
+
+from configuration import models
+
+# Bumped on every change that affects an overview; part of each cache key
+GENERATION_KEY = "config:task_overview:generation"
+
+
+def _generation() -> int:
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+        generation = cache.get(GENERATION_KEY, 1)
+    return generation
+
+
+def invalidate_task_overview() -> None:
+    """
+    Invalidate the cached overviews of all sites.
+
+    A single counter increment instead of finding the sites touched by a
+    change: entries of older generations are simply never read again and
+    expire with their TTL.
+    """
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 2, timeout=None)
+
+
+def build_task_overview(site_code: str, now: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Compute the overview of one site with grouped aggregate queries.
+
+    Tasks of the site are selected with ``EXISTS`` subqueries (a point of
+    the site, at least one config version) instead of joining the M2M
+    table and de-duplicating, the task counts come from one conditional
+    aggregate and the run status histogram from one ``GROUP BY status``.
+    """
+    now = now or timezone.now()
+    site_tasks = models.AcqTask.objects.filter(
+        Exists(models.TaskPoint.objects.filter(task=OuterRef("pk"), point__device__site__code=site_code)),
+        Exists(models.ConfigVersion.objects.filter(task=OuterRef("pk"))),
+    )
+    counts = site_tasks.aggregate(total=Count("id"), active=Count("id", filter=Q(is_active=True)))
+
+    runs_qs = models.TaskRun.objects.filter(task__in=site_tasks.values("id"))
+    status_counter = {
+        row["status"]: row["count"]
+        for row in runs_qs.order_by().values("status").annotate(count=Count("id"))
+    }
+
+    recent_runs = (
+        runs_qs.filter(created_at__gte=now - timedelta(hours=24))
+        .select_related("task", "worker")
+        .order_by("-created_at")[:20]
+    )
+    recent_data = [
+        {
+            "task": run.task.code,
+            "status": run.status,
+            "started_at": run.started_at,
+            "finished_at": run.finished_at,
+            "worker": run.worker.identifier if run.worker else None,
+            "log_reference": run.log_reference,
+        }
+        for run in recent_runs
+    ]
+
+    return {
+        "total_tasks": counts["total"],
+        "active_tasks": counts["active"],
+        "status": status_counter,
+        "recent_runs": recent_data,
+        "generated_at": now,
+    }
+
+
+def get_task_overview(site_code: str) -> Dict[str, Any]:
+    """Return the overview of a site from the cache, computing it at most once per TTL or change."""
+    key = f"config:task_overview:{_generation()}:{site_code}"
+    payload = cache.get(key)
+    if payload is None:
+        payload = build_task_overview(site_code)
+        cache.set(key, payload, timeout=getattr(settings, "CONFIG_OVERVIEW_CACHE_TTL", 10.0))
+    return payload
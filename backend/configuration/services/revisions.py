@@ -0,0 +1,89 @@
+"""Configuration revision counters backing conditional GETs of the config APIs."""
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, Iterator, Optional, Set, Tuple
+
+from django.db import DatabaseError
+from django.db.models import F
+from django.utils import timezone
+
+from configuration import models
+
+_batch = threading.local()
+
+
+def bump_revision(site_codes: Iterable[Optional[str]] = ()) -> None:
+    """
+    Increment the revision of the given sites and the global revision.
+
+    Inside ``batch_revision_bumps`` the scopes are only collected and
+    bumped once when the outermost batch exits.
+    """
+    scopes = {models.ConfigRevision.GLOBAL_SCOPE, *(code for code in site_codes if code)}
+    pending = getattr(_batch, "scopes", None)
+    if pending is not None:
+        pending.update(scopes)
+        return
+    _apply(scopes)
+
+
+def _apply(scopes: Set[str]) -> None:
+    models.ConfigRevision.objects.bulk_create(
+        [models.ConfigRevision(scope=scope) for scope in scopes], ignore_conflicts=True
+    )
+    models.ConfigRevision.objects.filter(scope__in=scopes).update(
+        revision=F("revision") + 1, updated_at=timezone.now()
+    )
+
+
+@contextmanager
+def batch_revision_bumps() -> Iterator[None]:
+    """
+    Coalesce the revision bumps of a bulk write (e.g. an Excel import) into one update.
+
+    Usable as a decorator. Nested batches are merged into the outermost one.
+    """
+    outer = getattr(_batch, "scopes", None)
+    if outer is not None:
+        yield
+        return
+    _batch.scopes = set()
+    try:
+        yield
+    except BaseException:
+        # Writes made before the error may be committed already (outside a transaction)
+        scopes, _batch.scopes = _batch.scopes, None
+        if scopes:
+            try:
+                _apply(scopes)
+            except DatabaseError:
+                pass
+        raise
+    scopes, _batch.scopes = _batch.scopes, None
+    if scopes:
+        _apply(scopes)
+
+
+def get_revision(site_code: Optional[str] = None) -> Tuple[int, Optional[datetime]]:
+    """Return ``(revision, updated_at)`` of a site, or the global one; one indexed lookup."""
+    row = (
+        models.ConfigRevision.objects.filter(scope=site_code or models.ConfigRevision.GLOBAL_SCOPE)
+        .values_list("revision", "updated_at")
+        .first()
+    )
+    return row or (0, None)
+
+
+def sites_of_points(point_ids: Iterable[int]) -> Set[str]:
+    return set(
+        models.Point.objects.filter(id__in=list(point_ids)).values_list("device__site__code", flat=True).distinct()
+    )
+
+
+def sites_of_task(task_id: int) -> Set[str]:
+    return set(
+        models.TaskPoint.objects.filter(task_id=task_id).values_list("point__device__site__code", flat=True).distinct()
+    )
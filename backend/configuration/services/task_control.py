@@ -0,0 +1,217 @@
+"""Bulk start/stop of acquisition tasks."""
+from __future__ import annotations
+
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from configuration import models
+from configuration.services.overview import invalidate_task_overview
+
+logger = logging.getLogger(__name__)
+
+ACTION_START = "start"
+ACTION_STOP = "stop"
+
+
+@dataclass
+class BulkControlResult:
+    """批量启停结果汇总，逐任务记录处理状态。"""
+
+    action: str
+    items: List[Dict[str, Any]] = field(default_factory=list)
+
+    def add(self, task: models.AcqTask, status: str, **extra: Any) -> None:
+        self.items.append({"task_id": task.id, "task_code": task.code, "status": status, **extra})
+
+    def to_dict(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for item in self.items:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        return {
+            "action": self.action,
+            "requested": len(self.items),
+            "counts": counts,
+            "results": sorted(self.items, key=lambda item: item["task_code"]),
+        }
+
+
+def select_tasks(
+    site_code: Optional[str] = None,
+    task_ids: Optional[Iterable[int]] = None,
+    task_codes: Optional[Iterable[str]] = None,
+    only_active: bool = True,
+):
+    """Resolve the tasks addressed by a bulk request (selectors are combined with AND)."""
+    queryset = models.AcqTask.objects.all()
+    if site_code:
+        queryset = queryset.filter(points__device__site__code=site_code)
+    if task_ids:
+        queryset = queryset.filter(id__in=list(task_ids))
+    if task_codes:
+        queryset = queryset.filter(code__in=list(task_codes))
+    if only_active:
+        queryset = queryset.filter(is_active=True)
+    return queryset.distinct().order_by("code")
+
+
+def _dispatch_parallel(calls: List[Callable[[], Any]], max_concurrency: int) -> List[Any]:
+    """Run broker calls with bounded concurrency; returns each result or the raised exception."""
+
+    def guarded(call: Callable[[], Any]) -> Any:
+        try:
+            return call()
+        except Exception as e:
+            return e
+
+    if not calls:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(calls))), thread_name_prefix="bulk-control") as pool:
+        return list(pool.map(guarded, calls))
+
+
+def bulk_start(
+    tasks: Iterable[models.AcqTask],
+    worker_identifier: Optional[str] = None,
+    note: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+    stagger: Optional[float] = None,
+) -> BulkControlResult:
+    """
+    Start acquisition for many tasks.
+
+    Tasks that already have a running session are skipped. For the others
+    a session is created up front (so a repeated request sees them as
+    running), then the Celery tasks are queued by up to ``max_concurrency``
+    threads. The n-th started task gets a countdown of ``n * stagger``
+    seconds, so workers open device connections gradually instead of all
+    gateways being hit at once. Database work stays on the calling thread;
+    only the broker round trips run in parallel.
+    """
+    from acquisition import models as acq_models, tasks as acq_tasks
+
+    max_concurrency = max_concurrency or getattr(settings, "ACQUISITION_BULK_MAX_CONCURRENCY", 8)
+    stagger = stagger if stagger is not None else getattr(settings, "ACQUISITION_BULK_STAGGER_INTERVAL", 0.5)
+    tasks = list(tasks)
+    result = BulkControlResult(ACTION_START)
+
+    running = dict(
+        acq_models.AcquisitionSession.objects.filter(
+            task__in=tasks, status=acq_models.AcquisitionSession.STATUS_RUNNING
+        ).values_list("task_id", "id")
+    )
+    worker = None
+    if worker_identifier:
+        worker, _ = models.WorkerEndpoint.objects.get_or_create(
+            identifier=worker_identifier,
+            defaults={"host": worker_identifier},
+        )
+
+    pending = []
+    for task in tasks:
+        if task.id in running:
+            result.add(task, "skipped", detail="任务已在运行中", session_id=running[task.id])
+            continue
+        session = acq_models.AcquisitionSession.objects.create(
+            task=task,
+            worker=worker,
+            status=acq_models.AcquisitionSession.STATUS_RUNNING,
+            celery_task_id=str(uuid.uuid4()),
+            metadata={"bulk_start": True},
+        )
+        pending.append((task, session, round(len(pending) * stagger, 3)))
+
+    outcomes = _dispatch_parallel(
+        [
+            (lambda task=task, session=session, countdown=countdown: acq_tasks.start_acquisition_task.apply_async(
+                args=(task.id, None),
+                kwargs={"session_id": session.id},
+                task_id=session.celery_task_id,
+                countdown=countdown,
+            ))
+            for task, session, countdown in pending
+        ],
+        max_concurrency,
+    )
+
+    runs = []
+    for (task, session, countdown), outcome in zip(pending, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Failed to dispatch acquisition task {task.code}: {outcome}")
+            session.status = acq_models.AcquisitionSession.STATUS_ERROR
+            session.error_message = f"任务调度失败: {outcome}"
+            session.stopped_at = timezone.now()
+            session.save(update_fields=["status", "error_message", "stopped_at", "updated_at"])
+            result.add(task, "error", detail=str(outcome), session_id=session.id)
+            continue
+        runs.append(models.TaskRun(
+            task=task,
+            worker=worker,
+            status=models.TaskRun.STATUS_RUNNING,
+            started_at=timezone.now(),
+            context={"note": note, "celery_task_id": session.celery_task_id, "bulk": True},
+        ))
+        result.add(task, "started", session_id=session.id, celery_task_id=session.celery_task_id, countdown=countdown)
+
+    # 创建TaskRun记录（兼容旧系统）; bulk_create does not send post_save
+    models.TaskRun.objects.bulk_create(runs)
+    if runs:
+        invalidate_task_overview()
+    return result
+
+
+def bulk_stop(
+    tasks: Iterable[models.AcqTask],
+    note: Optional[str] = None,
+    max_concurrency: Optional[int] = None,
+) -> BulkControlResult:
+    """Send stop requests for the running sessions of many tasks."""
+    from acquisition import models as acq_models, tasks as acq_tasks
+
+    max_concurrency = max_concurrency or getattr(settings, "ACQUISITION_BULK_MAX_CONCURRENCY", 8)
+    tasks = list(tasks)
+    result = BulkControlResult(ACTION_STOP)
+
+    sessions: Dict[int, List[int]] = {}
+    for task_id, session_id in acq_models.AcquisitionSession.objects.filter(
+        task__in=tasks, status=acq_models.AcquisitionSession.STATUS_RUNNING
+    ).values_list("task_id", "id"):
+        sessions.setdefault(task_id, []).append(session_id)
+
+    targets = []
+    for task in tasks:
+        if task.id not in sessions:
+            result.add(task, "skipped", detail="未找到运行中的会话")
+            continue
+        targets.extend((task, session_id) for session_id in sessions[task.id])
+
+    outcomes = _dispatch_parallel(
+        [lambda session_id=session_id: acq_tasks.stop_acquisition_task.delay(session_id) for _, session_id in targets],
+        max_concurrency,
+    )
+
+    stopped = set()
+    for (task, session_id), outcome in zip(targets, outcomes):
+        if isinstance(outcome, Exception):
+            logger.error(f"Failed to send stop for session {session_id} of task {task.code}: {outcome}")
+            result.add(task, "error", detail=str(outcome), session_id=session_id)
+            continue
+        stopped.add(task.id)
+        result.add(task, "stopped", session_id=session_id)
+
+    # 更新TaskRun记录（兼容旧系统）
+    for run in models.TaskRun.objects.filter(task_id__in=stopped, status=models.TaskRun.STATUS_RUNNING):
+        context = run.context or {}
+        if note:
+            context["note"] = note
+        context["stopped_via_api"] = True
+        run.status = models.TaskRun.STATUS_STOPPED
+        run.finished_at = timezone.now()
+        run.context = context
+        run.save(update_fields=["status", "finished_at", "context", "updated_at"])
+    return result
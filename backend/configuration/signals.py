@@ -0,0 +1,107 @@
+"""Signal handlers keeping configuration read models fresh."""
+from __future__ import annotations
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from configuration import models
+from configuration.services.overview import invalidate_task_overview
+from configuration.services.revisions import bump_revision, sites_of_points, sites_of_task
+
+
+@receiver(post_save, sender=models.TaskRun)
+@receiver(post_delete, sender=models.TaskRun)
+@receiver(post_save, sender=models.AcqTask)
+@receiver(post_delete, sender=models.AcqTask)
+@receiver(post_save, sender=models.ConfigVersion)
+@receiver(post_delete, sender=models.ConfigVersion)
+def task_overview_changed(sender, **kwargs):
+    """Drop cached task overviews when runs, tasks or versions change."""
+    invalidate_task_overview()
+
+
+@receiver(m2m_changed, sender=models.AcqTask.points.through)
+def task_points_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Task membership of a site depends on its points; the task lists show point ids."""
+    if action == "pre_clear":
+        # Sites of the removed points are gone after the clear
+        bump_revision(sites_of_task(instance.pk) if not reverse else sites_of_points([instance.pk]))
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    invalidate_task_overview()
+    if reverse:
+        sites = sites_of_points([instance.pk])
+        for task_id in pk_set or ():
+            sites |= sites_of_task(task_id)
+    else:
+        sites = sites_of_task(instance.pk) | sites_of_points(pk_set or ())
+    bump_revision(sites)
+
+
+# Configuration revisions (ETag/Last-Modified of the config list APIs). Deletes are
+# handled in pre_delete, while the rows leading to the site still exist. An update
+# may move a row to another site (or rename the site), so pre_save records the
+# site it had before and post_save bumps both.
+
+# Lookup of the site code from each model, used to read the stored (previous) site
+_SITE_LOOKUPS = {
+    models.Site: "code",
+    models.Device: "site__code",
+    models.Channel: "device__site__code",
+    models.Point: "device__site__code",
+}
+
+
+@receiver(pre_save, sender=models.Site)
+@receiver(pre_save, sender=models.Device)
+@receiver(pre_save, sender=models.Channel)
+@receiver(pre_save, sender=models.Point)
+def remember_previous_site(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    instance._previous_site_code = (
+        sender.objects.filter(pk=instance.pk).values_list(_SITE_LOOKUPS[sender], flat=True).first()
+    )
+
+
+def _bump_sites(instance, site_code):
+    bump_revision([site_code, instance.__dict__.pop("_previous_site_code", None)])
+
+
+@receiver(post_save, sender=models.Site)
+@receiver(pre_delete, sender=models.Site)
+def site_changed(sender, instance, **kwargs):
+    _bump_sites(instance, instance.code)
+
+
+@receiver(post_save, sender=models.Device)
+@receiver(pre_delete, sender=models.Device)
+def device_changed(sender, instance, **kwargs):
+    _bump_sites(instance, instance.site.code)
+
+
+@receiver(post_save, sender=models.Channel)
+@receiver(pre_delete, sender=models.Channel)
+def channel_changed(sender, instance, **kwargs):
+    _bump_sites(instance, instance.device.site.code)
+
+
+@receiver(post_save, sender=models.Point)
+@receiver(pre_delete, sender=models.Point)
+def point_changed(sender, instance, **kwargs):
+    _bump_sites(instance, instance.device.site.code)
+
+
+@receiver(post_save, sender=models.PointTemplate)
+@receiver(pre_delete, sender=models.PointTemplate)
+def point_template_changed(sender, instance, **kwargs):
+    """Point lists embed template details."""
+    bump_revision(
+        models.Point.objects.filter(template=instance).values_list("device__site__code", flat=True).distinct()
+    )
+
+
+@receiver(post_save, sender=models.AcqTask)
+@receiver(pre_delete, sender=models.AcqTask)
+def task_changed(sender, instance, **kwargs):
+    bump_revision(sites_of_task(instance.pk))
@@ -2,20 +2,60 @@
 """ViewSets for configuration APIs."""
 from __future__ import annotations
 
-from datetime import timedelta
 from pathlib import Path
 
-from django.db.models import Max
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from configuration.services import overview as overview_service, revisions, task_control
 from configuration.services.importer import ExcelImportService
 from . import models, serializers, tasks
 
 
+class ConditionalListMixin:
+    """
+    列表接口的条件请求支持。
+
+    ETag/Last-Modified 来自配置修订号（传 site_code 时为该站点的修订号，否则为全局修订号），
+    任何配置写入或导入都会递增修订号；客户端携带 If-None-Match / If-Modified-Since 且未变更时
+    返回 304，只需一次修订号查询，无需查询和序列化列表。
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, lambda: super(ConditionalListMixin, self).list(request, *args, **kwargs))
+
+    def conditional_response(self, request, build):
+        """Answer 304 when the client's validators match, otherwise ``build()`` the response."""
+        site_code = request.query_params.get("site_code")
+        revision, modified = revisions.get_revision(site_code)
+        etag = f'W/"{self.basename}-{revision}"'
+        last_modified = int(modified.timestamp()) if modified else None
+
+        response = get_conditional_response(request._request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = build()
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        # 允许浏览器缓存，但每次使用前都需重新验证
+        patch_cache_control(response, no_cache=True)
+        return response
+
+
+def _filter_by_site(queryset, request, lookup: str):
+    """Restrict list queries to ``?site_code=`` when given."""
+    site_code = request.query_params.get("site_code")
+    if site_code:
+        queryset = queryset.filter(**{lookup: site_code})
+    return queryset
+
+
 @extend_schema_view(
     list=extend_schema(summary="列出所有站点"),
     retrieve=extend_schema(summary="查看站点"),
@@ -39,27 +79,36 @@ class SiteViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(summary="部分更新采集连接"),
     destroy=extend_schema(summary="删除采集连接"),
 )
-class DeviceViewSet(viewsets.ModelViewSet):
+class DeviceViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """采集连接管理。"""
 
     queryset = models.Device.objects.select_related("site").order_by("protocol", "ip_address", "port")
     serializer_class = serializers.DeviceSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list":
+            queryset = _filter_by_site(queryset, self.request, "site__code")
+        return queryset
+
     def list(self, request, *args, **kwargs):
         if request.query_params.get("distinct"):
-            site_code = request.query_params.get("site_code", "default")
-            seen = set()
-            devices = []
-            for device in models.Device.objects.filter(site__code=site_code).order_by("protocol", "ip_address", "port"):
-                key = (device.protocol, device.ip_address, device.port)
-                if key in seen:
-                    continue
-                seen.add(key)
-                devices.append(device)
-            serializer = self.get_serializer(devices, many=True)
-            return Response(serializer.data)
+            return self.conditional_response(request, lambda: self._distinct_list(request))
         return super().list(request, *args, **kwargs)
 
+    def _distinct_list(self, request):
+        site_code = request.query_params.get("site_code", "default")
+        seen = set()
+        devices = []
+        for device in models.Device.objects.filter(site__code=site_code).order_by("protocol", "ip_address", "port"):
+            key = (device.protocol, device.ip_address, device.port)
+            if key in seen:
+                continue
+            seen.add(key)
+            devices.append(device)
+        serializer = self.get_serializer(devices, many=True)
+        return Response(serializer.data)
+
     @extend_schema(summary="获取设备的所有测点", responses=serializers.PointSerializer(many=True))
     @action(detail=True, methods=["get"], url_path="points")
     def list_points(self, request, pk=None):
@@ -165,12 +214,18 @@ class ChannelViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(summary="部分更新测点"),
     destroy=extend_schema(summary="删除测点"),
 )
-class PointViewSet(viewsets.ModelViewSet):
+class PointViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """测点管理：定义设备上的采集点及属性。"""
 
     queryset = models.Point.objects.select_related("device", "channel").prefetch_related("tasks").order_by("device", "code")
     serializer_class = serializers.PointSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list":
+            queryset = _filter_by_site(queryset, self.request, "device__site__code")
+        return queryset
+
 
 @extend_schema_view(
     list=extend_schema(summary="列出采集任务"),
@@ -180,12 +235,23 @@ class PointViewSet(viewsets.ModelViewSet):
     partial_update=extend_schema(summary="部分更新采集任务"),
     destroy=extend_schema(summary="删除采集任务"),
 )
-class AcqTaskViewSet(viewsets.ModelViewSet):
+class AcqTaskViewSet(ConditionalListMixin, viewsets.ModelViewSet):
     """采集任务管理：维护任务及其测点。"""
 
     queryset = models.AcqTask.objects.prefetch_related("points").order_by("code")
     serializer_class = serializers.AcqTaskSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == "list" and self.request.query_params.get("site_code"):
+            # 任务通过测点归属站点，可能关联多个站点的测点
+            queryset = queryset.filter(
+                Exists(models.TaskPoint.objects.filter(
+                    task=OuterRef("pk"), point__device__site__code=self.request.query_params["site_code"]
+                ))
+            )
+        return queryset
+
     @extend_schema(summary="查看任务关联的测点列表", responses=serializers.PointSerializer(many=True))
     @action(detail=True, methods=["get"], url_path="points")
     def list_points(self, request, pk=None):
@@ -197,49 +263,8 @@ class AcqTaskViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"], url_path="overview")
     def overview(self, request):
         site_code = request.query_params.get("site_code", "default")
-        now = timezone.now()
-        recent_window = now - timedelta(hours=24)
-
-        base_qs = (
-            models.AcqTask.objects.filter(points__device__site__code=site_code)
-            .annotate(last_version=Max("versions__version"))
-            .filter(last_version__isnull=False)
-            .distinct()
-        )
-        total_tasks = base_qs.count()
-        active_tasks = base_qs.filter(is_active=True).count()
-
-        runs_qs = (
-            models.TaskRun.objects.filter(task__in=base_qs)
-            .select_related("task", "worker")
-            .order_by("-created_at")
-        )
-        recent_runs = runs_qs.filter(created_at__gte=recent_window)[:20]
-
-        status_counter: dict[str, int] = {}
-        for status_value in runs_qs.values_list("status", flat=True):
-            status_counter[status_value] = status_counter.get(status_value, 0) + 1
-
-        recent_data = [
-            {
-                "task": run.task.code,
-                "status": run.status,
-                "started_at": run.started_at,
-                "finished_at": run.finished_at,
-                "worker": run.worker.identifier if run.worker else None,
-                "log_reference": run.log_reference,
-            }
-            for run in recent_runs
-        ]
-
-        payload = {
-            "total_tasks": total_tasks,
-            "active_tasks": active_tasks,
-            "status": status_counter,
-            "recent_runs": recent_data,
-            "generated_at": now,
-        }
-        serializer = serializers.TaskOverviewSerializer(payload)
+        # 按站点缓存（短 TTL），任务/运行记录/版本变更时立即失效
+        serializer = serializers.TaskOverviewSerializer(overview_service.get_task_overview(site_code))
         return Response(serializer.data)
 
     @extend_schema(summary="启动采集任务", request=serializers.TaskControlSerializer)
@@ -300,6 +325,28 @@ class AcqTaskViewSet(viewsets.ModelViewSet):
             "message": "请通过 /api/acquisition/sessions/active/ 查询会话状态"
         })
 
+    @extend_schema(summary="批量启动/停止采集任务", request=serializers.BulkTaskControlSerializer)
+    @action(detail=False, methods=["post"], url_path="bulk-control")
+    def bulk_control(self, request):
+        """
+        按站点、任务ID/编码批量启停任务：并发派发（有上限），启动时错峰建立设备连接，返回汇总结果。
+        """
+        serializer = serializers.BulkTaskControlSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        tasks_qs = task_control.select_tasks(
+            site_code=data.get("site_code"),
+            task_ids=data.get("task_ids"),
+            task_codes=data.get("task_codes"),
+            only_active=data["only_active"] if data["action"] == task_control.ACTION_START else False,
+        )
+        if data["action"] == task_control.ACTION_START:
+            result = task_control.bulk_start(tasks_qs, worker_identifier=data.get("worker"), note=data.get("note"))
+        else:
+            result = task_control.bulk_stop(tasks_qs, note=data.get("note"))
+        return Response(result.to_dict())
+
     @extend_schema(summary="停止采集任务", request=serializers.TaskControlSerializer)
     @action(detail=True, methods=["post"], url_path="stop")
     def stop(self, request, pk=None):
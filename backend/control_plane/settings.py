@@ -77,6 +77,13 @@ DATABASES = {
     }
 }
 
+# Shared cache for API read models (task overview, ...); set CACHE_URL=redis://host:6379/2 so
+# every API process sees the same entries and invalidations
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+
+# TTL (seconds) of the cached per-site task overview; task/run/version changes invalidate it earlier
+CONFIG_OVERVIEW_CACHE_TTL = env.float("CONFIG_OVERVIEW_CACHE_TTL", default=10.0)
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -114,6 +121,20 @@ CELERY_RESULT_BACKEND = env.str("CELERY_RESULT_BACKEND", default=CELERY_BROKER_U
 CELERY_TASK_ALWAYS_EAGER = env.bool("CELERY_TASK_ALWAYS_EAGER", default=False)
 CELERY_TASK_EAGER_PROPAGATES = env.bool("CELERY_TASK_EAGER_PROPAGATES", default=True)
 CELERY_TASK_TIME_LIMIT = env.int("CELERY_TASK_TIME_LIMIT", default=600)
+CELERY_BEAT_SCHEDULE = {
+    "purge-expired-data-points": {
+        "task": "acquisition.tasks.purge_expired_data_points",
+        "schedule": env.float("ACQUISITION_PURGE_INTERVAL", default=3600.0),
+    },
+    "run-influxdb-rollups": {
+        "task": "acquisition.tasks.run_rollups",
+        "schedule": env.float("INFLUXDB_ROLLUP_INTERVAL", default=60.0),
+    },
+    "export-archive": {
+        "task": "acquisition.tasks.export_archive",
+        "schedule": env.float("ACQUISITION_ARCHIVE_EXPORT_INTERVAL", default=86400.0),
+    },
+}
 
 # InfluxDB Settings
 INFLUXDB_HOST = env.str("INFLUXDB_HOST", default="localhost")
@@ -122,10 +143,40 @@ INFLUXDB_TOKEN = env.str("INFLUXDB_TOKEN", default="")
 INFLUXDB_ORG = env.str("INFLUXDB_ORG", default="default")
 INFLUXDB_BUCKET = env.str("INFLUXDB_BUCKET", default="default")
 
+# Rollup tiers (min/max/mean/count per window) aggregated incrementally from INFLUXDB_BUCKET.
+# Tier buckets are created on the first run if the token may create buckets.
+# point_history reads the coarsest tier that still fits the requested resolution and whose
+# coverage reaches the query start; windows after the tier's last closed one come from raw data.
+# Each run also backfills one "backfill_chunk" (default 1440 windows) of older data until the tier
+# covers "backfill" (default: retention). Coverage lives in the Django cache, so routing in API
+# processes needs a CACHE_URL shared with the Celery workers.
+INFLUXDB_ROLLUP_ENABLED = env.bool("INFLUXDB_ROLLUP_ENABLED", default=False)
+INFLUXDB_ROLLUP_LATENESS = env.str("INFLUXDB_ROLLUP_LATENESS", default="1m")
+INFLUXDB_ROLLUP_TIERS = [
+    {"name": "1m", "every": "1m", "bucket": f"{INFLUXDB_BUCKET}_1m", "lookback": "10m", "retention": "90d"},
+    {"name": "1h", "every": "1h", "bucket": f"{INFLUXDB_BUCKET}_1h", "lookback": "3h", "retention": "1825d"},
+]
+
+# Write mode: "sync" (one blocking request per write) or "batching"
+# (background batching with gzip and jittered exponential retry)
+INFLUXDB_WRITE_MODE = env.str("INFLUXDB_WRITE_MODE", default="sync")
+INFLUXDB_ENABLE_GZIP = env.bool("INFLUXDB_ENABLE_GZIP", default=True)
+INFLUXDB_BATCH_SIZE = env.int("INFLUXDB_BATCH_SIZE", default=5000)
+INFLUXDB_FLUSH_INTERVAL_MS = env.int("INFLUXDB_FLUSH_INTERVAL_MS", default=1000)
+INFLUXDB_JITTER_INTERVAL_MS = env.int("INFLUXDB_JITTER_INTERVAL_MS", default=0)
+INFLUXDB_RETRY_INTERVAL_MS = env.int("INFLUXDB_RETRY_INTERVAL_MS", default=5000)
+INFLUXDB_MAX_RETRIES = env.int("INFLUXDB_MAX_RETRIES", default=5)
+INFLUXDB_MAX_RETRY_DELAY_MS = env.int("INFLUXDB_MAX_RETRY_DELAY_MS", default=125000)
+INFLUXDB_MAX_RETRY_TIME_MS = env.int("INFLUXDB_MAX_RETRY_TIME_MS", default=180000)
+
 # Kafka Settings (Optional)
 KAFKA_ENABLED = env.bool("KAFKA_ENABLED", default=False)
 KAFKA_BOOTSTRAP_SERVERS = env.str("KAFKA_BOOTSTRAP_SERVERS", default="localhost:9092")
 KAFKA_TOPIC = env.str("KAFKA_TOPIC", default="acquisition_data")
+KAFKA_COMPRESSION_TYPE = env.str("KAFKA_COMPRESSION_TYPE", default="gzip")  # gzip, or snappy/lz4/zstd (needs python-snappy/lz4/zstandard)
+KAFKA_LINGER_MS = env.int("KAFKA_LINGER_MS", default=20)
+KAFKA_BATCH_SIZE = env.int("KAFKA_BATCH_SIZE", default=262144)
+KAFKA_ACKS = env.str("KAFKA_ACKS", default="1")
 
 # Logging Configuration
 LOGGING = {
@@ -212,3 +263,102 @@ ACQUISITION_CONNECTION_TIMEOUT = env.float("ACQUISITION_CONNECTION_TIMEOUT", def
 
 # Maximum number of consecutive reconnection attempts before giving up
 ACQUISITION_MAX_RECONNECT_ATTEMPTS = env.int("ACQUISITION_MAX_RECONNECT_ATTEMPTS", default=3)
+
+# Embedded SQLite time-series store on the edge node (local buffering + offline point_history fallback)
+ACQUISITION_LOCAL_STORE_ENABLED = env.bool("ACQUISITION_LOCAL_STORE_ENABLED", default=False)
+ACQUISITION_LOCAL_STORE_PATH = env.str("ACQUISITION_LOCAL_STORE_PATH", default=str(BASE_DIR / "data" / "edge_tsdb.sqlite3"))
+ACQUISITION_LOCAL_STORE_MAX_BYTES = env.int("ACQUISITION_LOCAL_STORE_MAX_BYTES", default=512 * 1024 * 1024)
+ACQUISITION_LOCAL_STORE_MAX_AGE = env.int("ACQUISITION_LOCAL_STORE_MAX_AGE", default=None)
+
+# Parquet archive partitioned by site/device/day (requires pyarrow); usable as the "archive"
+# sink and written by the daily export job when ACQUISITION_ARCHIVE_EXPORT_ENABLED is set
+ACQUISITION_ARCHIVE_ROOT = env.str("ACQUISITION_ARCHIVE_ROOT", default=str(BASE_DIR / "data" / "archive"))
+ACQUISITION_ARCHIVE_COMPRESSION = env.str("ACQUISITION_ARCHIVE_COMPRESSION", default="zstd")
+ACQUISITION_ARCHIVE_FLUSH_ROWS = env.int("ACQUISITION_ARCHIVE_FLUSH_ROWS", default=100000)
+ACQUISITION_ARCHIVE_FLUSH_INTERVAL = env.float("ACQUISITION_ARCHIVE_FLUSH_INTERVAL", default=300.0)
+ACQUISITION_ARCHIVE_EXPORT_ENABLED = env.bool("ACQUISITION_ARCHIVE_EXPORT_ENABLED", default=False)
+
+# Storage sinks written by every task (overridden per site below or per task via AcqTask.storage_sinks)
+# Entries are storage names or dicts: {"name": ..., "type": ..., "config": {...}, "queue_size": ...}
+ACQUISITION_STORAGE_SINKS = env.list(
+    "ACQUISITION_STORAGE_SINKS",
+    default=["influxdb"] + (["kafka"] if KAFKA_ENABLED else []) + (["local"] if ACQUISITION_LOCAL_STORE_ENABLED else []),
+)
+
+# Per-site sink lists keyed by site code
+ACQUISITION_SITE_STORAGE_SINKS = {}
+
+# Per-sink queue length (batches) and retries before a batch is dropped
+ACQUISITION_SINK_QUEUE_SIZE = env.int("ACQUISITION_SINK_QUEUE_SIZE", default=1000)
+ACQUISITION_SINK_MAX_RETRIES = env.int("ACQUISITION_SINK_MAX_RETRIES", default=5)
+
+# Time allowed for sink queues to drain when a session stops (seconds)
+ACQUISITION_SINK_DRAIN_TIMEOUT = env.float("ACQUISITION_SINK_DRAIN_TIMEOUT", default=10.0)
+
+# Startup validation in start-task: deadline per device (seconds) and devices checked concurrently
+ACQUISITION_STARTUP_DEVICE_TIMEOUT = env.float("ACQUISITION_STARTUP_DEVICE_TIMEOUT", default=5.0)
+ACQUISITION_STARTUP_MAX_WORKERS = env.int("ACQUISITION_STARTUP_MAX_WORKERS", default=16)
+
+# Bulk task start/stop: concurrent broker dispatches and delay between consecutive task starts (seconds)
+ACQUISITION_BULK_MAX_CONCURRENCY = env.int("ACQUISITION_BULK_MAX_CONCURRENCY", default=8)
+ACQUISITION_BULK_STAGGER_INTERVAL = env.float("ACQUISITION_BULK_STAGGER_INTERVAL", default=0.5)
+
+# Interval (seconds) at which session health and counters (points read, errors, rate) are saved
+ACQUISITION_SESSION_STATS_FLUSH_INTERVAL = env.float("ACQUISITION_SESSION_STATS_FLUSH_INTERVAL", default=5.0)
+
+# Upper bound of points per series for resolution-aware history queries
+ACQUISITION_HISTORY_MAX_POINTS = env.int("ACQUISITION_HISTORY_MAX_POINTS", default=5000)
+
+# LTTB history queries pre-bucket the range into min/max rows, OVERSAMPLE x max_points per series,
+# before reducing them with LTTB
+ACQUISITION_HISTORY_LTTB_OVERSAMPLE = env.int("ACQUISITION_HISTORY_LTTB_OVERSAMPLE", default=4)
+
+# History query cache: full refetch after TTL (seconds), bounded by total cached rows;
+# the last LATENESS seconds are always refetched to pick up late writes
+ACQUISITION_HISTORY_CACHE_ENABLED = env.bool("ACQUISITION_HISTORY_CACHE_ENABLED", default=True)
+ACQUISITION_HISTORY_CACHE_TTL = env.float("ACQUISITION_HISTORY_CACHE_TTL", default=300.0)
+ACQUISITION_HISTORY_CACHE_MAX_ROWS = env.int("ACQUISITION_HISTORY_CACHE_MAX_ROWS", default=500000)
+ACQUISITION_HISTORY_CACHE_LATENESS = env.float("ACQUISITION_HISTORY_CACHE_LATENESS", default=5.0)
+
+# Latest value per point ("redis" shares values between workers and API processes, "memory" is process-local)
+ACQUISITION_LATEST_VALUE_BACKEND = env.str("ACQUISITION_LATEST_VALUE_BACKEND", default="redis")
+ACQUISITION_LATEST_VALUE_REDIS_URL = env.str(
+    "ACQUISITION_LATEST_VALUE_REDIS_URL",
+    default=f"redis://{env.str('REDIS_HOST', default='127.0.0.1')}:{env.int('REDIS_PORT', default=6379)}/1",
+)
+ACQUISITION_LATEST_VALUE_KEY = env.str("ACQUISITION_LATEST_VALUE_KEY", default="acquisition:latest_values")
+
+# Live WebSocket frames: one coalesced frame per session every INTERVAL seconds with the latest
+# value (and min/max over the interval) per changed point; clients get at most CLIENT_MAX_FPS frames/s
+ACQUISITION_LIVE_BROADCAST_ENABLED = env.bool("ACQUISITION_LIVE_BROADCAST_ENABLED", default=True)
+ACQUISITION_LIVE_INTERVAL = env.float("ACQUISITION_LIVE_INTERVAL", default=0.2)
+ACQUISITION_LIVE_INCLUDE_RANGE = env.bool("ACQUISITION_LIVE_INCLUDE_RANGE", default=True)
+ACQUISITION_LIVE_CLIENT_MAX_FPS = env.float("ACQUISITION_LIVE_CLIENT_MAX_FPS", default=5.0)
+
+# Live taps fed directly by the acquisition pipeline: "channels" (frames above) and/or "redis_stream"
+# (one XADD per batch to STREAM_KEY, trimmed to about STREAM_MAXLEN entries, for consumers outside Django)
+ACQUISITION_LIVE_TAPS = env.list("ACQUISITION_LIVE_TAPS", default=["channels"])
+ACQUISITION_LIVE_STREAM_REDIS_URL = env.str(
+    "ACQUISITION_LIVE_STREAM_REDIS_URL", default=ACQUISITION_LATEST_VALUE_REDIS_URL
+)
+ACQUISITION_LIVE_STREAM_KEY = env.str("ACQUISITION_LIVE_STREAM_KEY", default="acquisition:live:{session_id}")
+ACQUISITION_LIVE_STREAM_MAXLEN = env.int("ACQUISITION_LIVE_STREAM_MAXLEN", default=10000)
+
+# Point codes + patterns one WebSocket client may subscribe to
+ACQUISITION_WS_MAX_SUBSCRIPTIONS = env.int("ACQUISITION_WS_MAX_SUBSCRIPTIONS", default=1000)
+
+# Rows fetched per database round trip by the streaming data point export
+ACQUISITION_EXPORT_CHUNK_SIZE = env.int("ACQUISITION_EXPORT_CHUNK_SIZE", default=2000)
+
+# Share of samples mirrored into the DataPoint table (0 disables, 1 keeps all) and rows per bulk insert
+ACQUISITION_SQL_SAMPLE_RATIO = env.float("ACQUISITION_SQL_SAMPLE_RATIO", default=0.0)
+ACQUISITION_SQL_BATCH_SIZE = env.int("ACQUISITION_SQL_BATCH_SIZE", default=500)
+# Batches waiting for the DataPoint writer thread; the oldest is dropped when full
+ACQUISITION_SQL_QUEUE_SIZE = env.int("ACQUISITION_SQL_QUEUE_SIZE", default=100)
+
+# DataPoint retention (days, 0 keeps forever; overridden per site/task). Nothing is purged
+# unless a site or task sets data_retention_days or this default is raised.
+ACQUISITION_DATAPOINT_RETENTION_DAYS = env.int("ACQUISITION_DATAPOINT_RETENTION_DAYS", default=0)
+ACQUISITION_PURGE_BATCH_SIZE = env.int("ACQUISITION_PURGE_BATCH_SIZE", default=5000)
+ACQUISITION_PURGE_MAX_BATCHES = env.int("ACQUISITION_PURGE_MAX_BATCHES", default=200)
+ACQUISITION_PURGE_REQUEUE_DELAY = env.int("ACQUISITION_PURGE_REQUEUE_DELAY", default=10)
@@ -1,5 +1,8 @@
 """Storage backends for time-series data."""
 from .base import BaseStorage, StorageRegistry
+from .archive import ArchiveStorage
 from .influxdb import InfluxDBStorage
+from .kafka import KafkaStorage
+from .local import LocalStorage
 
-__all__ = ["BaseStorage", "StorageRegistry", "InfluxDBStorage"]
+__all__ = ["BaseStorage", "StorageRegistry", "ArchiveStorage", "InfluxDBStorage", "KafkaStorage", "LocalStorage"]
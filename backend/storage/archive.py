@@ -0,0 +1,188 @@
+"""Columnar Parquet archive of acquisition samples for offline analytics."""
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional dependency, only needed when the archive sink is used
+    pa = None
+    pq = None
+
+from .base import BaseStorage, StorageError, StorageRegistry, WriteError
+
+# Partition key: (site, device, day)
+PartitionKey = Tuple[str, str, str]
+
+
+def _partition_value(value: Any) -> str:
+    """Make a tag value safe as a hive partition directory name."""
+    text = str(value) if value not in (None, "") else "_unknown"
+    return text.replace("/", "_").replace("\\", "_").replace("=", "_")
+
+
+@StorageRegistry.register("archive")
+class ArchiveStorage(BaseStorage):
+    """
+    Parquet archive partitioned by site, device and day.
+
+    Files are laid out as ``<root>/site=<site>/device=<device>/date=<YYYY-MM-DD>/part-*.parquet``
+    (hive partitioning, readable with ``pyarrow.dataset`` or pandas in one
+    call). Each file holds the columns ``time`` (timestamp[ns, UTC],
+    delta encoded), ``point`` and ``quality`` (dictionary encoded),
+    ``field`` and ``value`` (float64, byte-stream-split), sorted by point
+    and time, and compressed with ``compression`` (default zstd).
+
+    Samples are buffered and written when ``flush_rows`` rows are pending
+    or ``flush_interval`` seconds have passed, so the sink does not produce
+    tiny files. Non-numeric values are not archived.
+    """
+
+    def __init__(self, config: Dict[str, Any]) -> None:
+        super().__init__(config)
+        self.root = str(config.get("root", "archive"))
+        self.compression = config.get("compression", "zstd")
+        self.flush_rows = int(config.get("flush_rows", 100000))
+        self.flush_interval = float(config.get("flush_interval", 300.0))
+        self.row_group_size = int(config.get("row_group_size", 128 * 1024))
+        self.file_prefix = config.get("file_prefix", "part")
+        self._lock = threading.Lock()
+        self._buffers: Dict[PartitionKey, Dict[str, list]] = defaultdict(
+            lambda: {"time": [], "point": [], "field": [], "value": [], "quality": []}
+        )
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self.skipped = 0
+
+    def connect(self) -> bool:
+        """Check pyarrow is available and create the archive root."""
+        if pa is None:
+            raise StorageError("pyarrow is required for the archive storage (pip install pyarrow)")
+        try:
+            os.makedirs(self.root, exist_ok=True)
+        except OSError as e:
+            raise StorageError(f"Archive root {self.root} not writable: {e}") from e
+        self.is_connected = True
+        self.logger.info(f"Archiving to {self.root}")
+        return True
+
+    def disconnect(self) -> None:
+        """Write pending samples and close."""
+        try:
+            if self.is_connected:
+                self.flush()
+        finally:
+            self.is_connected = False
+
+    def health_check(self) -> bool:
+        return self.is_connected and os.access(self.root, os.W_OK)
+
+    def write(self, data: List[Dict[str, Any]]) -> bool:
+        """
+        Buffer data points into their partitions.
+
+        Returns:
+            True if buffered (and written, when a flush was due).
+
+        Raises:
+            WriteError: If writing a file fails.
+        """
+        if not self.is_connected:
+            self.connect()
+
+        added = 0
+        with self._lock:
+            for point in data:
+                timestamp = point.get("time")
+                if not timestamp:
+                    continue
+                tags = point.get("tags") or {}
+                day = datetime.fromtimestamp(timestamp / 1e9, tz=timezone.utc).strftime("%Y-%m-%d")
+                buffer = self._buffers[(
+                    _partition_value(tags.get("site")),
+                    _partition_value(tags.get("device")),
+                    day,
+                )]
+                for field, value in (point.get("fields") or {}).items():
+                    if isinstance(value, bool):
+                        value = float(value)
+                    elif not isinstance(value, (int, float)):
+                        self.skipped += 1
+                        continue
+                    buffer["time"].append(int(timestamp))
+                    buffer["point"].append(tags.get("point") or field)
+                    buffer["field"].append(field)
+                    buffer["value"].append(float(value))
+                    buffer["quality"].append(tags.get("quality", "good"))
+                    added += 1
+            self._pending += added
+        self.metrics.record_submitted(added)
+
+        if self._pending >= self.flush_rows or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+        return True
+
+    def flush(self) -> None:
+        """Write every buffered partition to a new Parquet file."""
+        with self._lock:
+            buffers, self._buffers = self._buffers, defaultdict(self._buffers.default_factory)
+            self._pending = 0
+            self._last_flush = time.monotonic()
+
+        for key, columns in buffers.items():
+            if not columns["time"]:
+                continue
+            try:
+                size = self._write_file(key, columns)
+            except (OSError, pa.ArrowException) as e:
+                self.metrics.record_failure(e)
+                raise WriteError(f"Archive write failed for {'/'.join(key)}: {e}") from e
+            self.metrics.record_success(points=len(columns["time"]), size=size)
+
+    def partition_dir(self, key: PartitionKey) -> str:
+        site, device, day = key
+        return os.path.join(self.root, f"site={site}", f"device={device}", f"date={day}")
+
+    def _write_file(self, key: PartitionKey, columns: Dict[str, list]) -> int:
+        """
+        Write one partition buffer as a sorted Parquet file; returns its size.
+
+        String columns are dictionary encoded by the Parquet writer.
+        """
+        table = pa.table({
+            "time": pa.array(columns["time"], type=pa.int64()).cast(pa.timestamp("ns", tz="UTC")),
+            "point": pa.array(columns["point"], type=pa.string()),
+            "field": pa.array(columns["field"], type=pa.string()),
+            "value": pa.array(columns["value"], type=pa.float64()),
+            "quality": pa.array(columns["quality"], type=pa.string()),
+        })
+        table = table.sort_by([("point", "ascending"), ("time", "ascending")])
+
+        directory = self.partition_dir(key)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.file_prefix}-{int(time.time() * 1000)}-{uuid.uuid4().hex[:8]}.parquet")
+        tmp_path = path + ".tmp"
+        pq.write_table(
+            table,
+            tmp_path,
+            compression=self.compression,
+            row_group_size=self.row_group_size,
+            use_dictionary=["point", "field", "quality"],
+            column_encoding={"time": "DELTA_BINARY_PACKED", "value": "BYTE_STREAM_SPLIT"},
+        )
+        # Readers never see a half-written file
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = super().get_metrics()
+        metrics["pending_rows"] = self._pending
+        metrics["skipped_values"] = self.skipped
+        return metrics
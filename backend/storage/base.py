@@ -5,6 +5,8 @@ import logging
 from abc import ABC, abstractmethod
 from typing import Any, Dict, List, Optional, Type
 
+from .metrics import StorageMetrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,6 +37,7 @@ class BaseStorage(ABC):
         """
         self.config = config
         self.is_connected = False
+        self.metrics = StorageMetrics()
         self.logger = logging.getLogger(f"{self.__class__.__module__}.{self.__class__.__name__}")
 
     @abstractmethod
@@ -85,6 +88,18 @@ class BaseStorage(ABC):
         """
         pass
 
+    def flush(self) -> None:
+        """
+        Flush data buffered by the backend.
+
+        Synchronous backends write immediately, so the default is a no-op.
+        """
+        pass
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return write metrics collected by this backend."""
+        return self.metrics.snapshot()
+
     def __enter__(self):
         """Context manager entry."""
         self.connect()
@@ -0,0 +1,272 @@
+"""Isolated multi-sink fan-out for storage writes."""
+from __future__ import annotations
+
+import logging
+import queue
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .base import BaseStorage
+
+logger = logging.getLogger(__name__)
+
+
+class SinkWorker:
+    """
+    Background writer owning one storage sink.
+
+    Each worker has its own bounded queue, thread and retry state, so a slow
+    or unavailable sink only fills its own queue. When the queue is full the
+    oldest batch is dropped, keeping memory bounded and the producer
+    (the acquisition loop) non-blocking.
+
+    The worker owns its storage: it connects from its own thread, so an
+    unreachable sink does not delay startup, and disconnects it when the
+    thread exits, so a connection is never closed under a running write.
+    """
+
+    STATE_HEALTHY = "healthy"
+    STATE_RETRYING = "retrying"
+    STATE_DEGRADED = "degraded"
+    STATE_STOPPED = "stopped"
+
+    def __init__(
+        self,
+        name: str,
+        storage: BaseStorage,
+        queue_size: int = 1000,
+        max_retries: int = 5,
+        retry_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        max_batch_points: int = 5000,
+    ) -> None:
+        """
+        Args:
+            name: Sink name used in logs and stats
+            storage: Storage backend, connected by the worker thread
+            queue_size: Max batches waiting in the queue
+            max_retries: Retries per batch before it is dropped
+            retry_backoff: First retry delay in seconds (doubled per attempt, jittered)
+            max_backoff: Upper bound of a single retry delay in seconds
+            max_batch_points: Max points merged from queued batches into one write
+        """
+        self.name = name
+        self.storage = storage
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.max_batch_points = max_batch_points
+        self.logger = logging.getLogger(f"{__name__}.{name}")
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        self.state = self.STATE_HEALTHY
+        self.batches_written = 0
+        self.points_written = 0
+        self.batches_dropped = 0
+        self.points_dropped = 0
+        self.retries = 0
+        self.consecutive_failures = 0
+        self.last_error: Optional[str] = None
+        self.last_success_at: Optional[float] = None
+
+    def start(self) -> None:
+        """Start the worker thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"sink-{self.name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, batch: List[Dict[str, Any]]) -> bool:
+        """
+        Enqueue a batch without blocking.
+
+        Returns:
+            False if an older batch had to be dropped to make room.
+        """
+        if not batch:
+            return True
+        try:
+            self._queue.put_nowait(batch)
+            return True
+        except queue.Full:
+            try:
+                dropped = self._queue.get_nowait()
+                self._record_drop(dropped, "queue full")
+            except queue.Empty:
+                pass
+            try:
+                self._queue.put_nowait(batch)
+            except queue.Full:
+                self._record_drop(batch, "queue full")
+            return False
+
+    def request_stop(self) -> None:
+        """Signal the worker to finish once its queue is drained."""
+        self._stop_event.set()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop the worker, draining queued batches for up to ``timeout`` seconds.
+
+        Batches still queued after the timeout are dropped. A worker still
+        busy with a write after the timeout is left to finish it; its thread
+        disconnects the storage when it exits.
+        """
+        self.request_stop()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            if self._thread.is_alive():
+                self.logger.warning(f"Sink {self.name} still writing after {timeout:.1f}s, disconnecting when done")
+        while True:
+            try:
+                self._record_drop(self._queue.get_nowait(), "shutdown")
+            except queue.Empty:
+                break
+        self.state = self.STATE_STOPPED
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue and retry state of this sink."""
+        with self._lock:
+            return {
+                "state": self.state,
+                "queue_depth": self._queue.qsize(),
+                "batches_written": self.batches_written,
+                "points_written": self.points_written,
+                "batches_dropped": self.batches_dropped,
+                "points_dropped": self.points_dropped,
+                "retries": self.retries,
+                "consecutive_failures": self.consecutive_failures,
+                "last_error": self.last_error,
+                "last_success_at": self.last_success_at,
+            }
+
+    def _run(self) -> None:
+        """Worker loop: connect, take batches, merge, write with retry; disconnect on exit."""
+        try:
+            self._connect()
+            self._drain()
+        finally:
+            try:
+                self.storage.disconnect()
+            except Exception as e:
+                self.logger.warning(f"Error disconnecting sink {self.name}: {e}")
+
+    def _connect(self) -> None:
+        """Connect the storage up front; a failure is retried by the first write."""
+        if self.storage.is_connected:
+            return
+        try:
+            self.storage.connect()
+        except Exception as e:
+            with self._lock:
+                self.last_error = str(e)
+            self.logger.warning(f"Sink {self.name} not connected yet: {e}")
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                batch = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                if self._stop_event.is_set():
+                    break
+                continue
+
+            # Merge queued batches into one write to catch up after a stall
+            while len(batch) < self.max_batch_points:
+                try:
+                    batch = batch + self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            self._write_with_retry(batch)
+
+    def _write_with_retry(self, batch: List[Dict[str, Any]]) -> None:
+        """Write a batch, retrying with jittered exponential backoff."""
+        attempt = 0
+        while True:
+            try:
+                if not self.storage.is_connected:
+                    self.storage.connect()
+                self.storage.write(batch)
+                with self._lock:
+                    self.batches_written += 1
+                    self.points_written += len(batch)
+                    self.consecutive_failures = 0
+                    self.last_success_at = time.time()
+                    self.state = self.STATE_HEALTHY
+                return
+            except Exception as e:
+                with self._lock:
+                    self.consecutive_failures += 1
+                    self.last_error = str(e)
+
+                if attempt >= self.max_retries or self._stop_event.is_set():
+                    with self._lock:
+                        self.state = self.STATE_DEGRADED
+                    self._record_drop(batch, f"write failed: {e}")
+                    return
+
+                delay = min(self.max_backoff, self.retry_backoff * (2 ** attempt))
+                delay = random.uniform(delay / 2, delay)
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                    self.state = self.STATE_RETRYING
+                self.logger.warning(
+                    f"Write to {self.name} failed ({e}), retry {attempt}/{self.max_retries} in {delay:.2f}s"
+                )
+                if self._stop_event.wait(delay):
+                    # Shutting down: make one final attempt without further delay
+                    attempt = self.max_retries
+
+    def _record_drop(self, batch: List[Dict[str, Any]], reason: str) -> None:
+        with self._lock:
+            self.batches_dropped += 1
+            self.points_dropped += len(batch)
+        self.logger.error(f"Dropped batch of {len(batch)} points for {self.name}: {reason}")
+
+
+class FanoutWriter:
+    """
+    Fan a stream of batches out to several isolated sink workers.
+
+    ``submit`` only enqueues, so the caller never waits for any sink.
+    """
+
+    def __init__(self) -> None:
+        self.workers: Dict[str, SinkWorker] = {}
+
+    def add_sink(self, name: str, storage: BaseStorage, **options: Any) -> SinkWorker:
+        """Register a sink and start its worker thread."""
+        worker = SinkWorker(name, storage, **options)
+        self.workers[name] = worker
+        worker.start()
+        return worker
+
+    def submit(self, batch: List[Dict[str, Any]]) -> None:
+        """Enqueue a batch on every sink."""
+        for worker in self.workers.values():
+            worker.submit(batch)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop all workers, draining in parallel.
+
+        ``timeout`` is the overall budget shared by all sinks.
+        """
+        deadline = time.time() + timeout
+        for worker in self.workers.values():
+            worker.request_stop()
+        for worker in self.workers.values():
+            worker.stop(timeout=max(0.0, deadline - time.time()))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-sink stats."""
+        return {name: worker.stats() for name, worker in self.workers.items()}
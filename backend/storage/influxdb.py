@@ -3,12 +3,13 @@ from __future__ import annotations
 
 import subprocess
 import time
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional
 
 from influxdb_client import InfluxDBClient as InfluxClient
-from influxdb_client.client.write_api import SYNCHRONOUS
+from influxdb_client.client.write_api import SYNCHRONOUS, WriteOptions, WriteType
 
 from .base import BaseStorage, StorageError, StorageRegistry, WriteError
+from .line_protocol import LineProtocolSerializer
 
 
 @StorageRegistry.register("influxdb")
@@ -17,8 +18,18 @@ class InfluxDBStorage(BaseStorage):
     InfluxDB 2.x storage implementation.
 
     Stores time-series acquisition data with tags and fields.
+
+    Two write modes are supported (``write_mode`` config key):
+        - ``sync``: every ``write`` is one blocking HTTP request (default)
+        - ``batching``: points are buffered by the client and flushed in the
+          background by size or interval, with gzip compression and jittered
+          exponential retry. Results are reported through callbacks into
+          ``self.metrics``.
     """
 
+    WRITE_MODE_SYNC = "sync"
+    WRITE_MODE_BATCHING = "batching"
+
     def __init__(self, config: Dict[str, Any]) -> None:
         super().__init__(config)
         self.url = config.get("url") or f"http://{config.get('host', 'localhost')}:{config.get('port', 8086)}"
@@ -27,20 +38,90 @@ class InfluxDBStorage(BaseStorage):
         self.bucket = config.get("bucket", "default")
         self.docker_mode = config.get("docker_mode", False)  # Use docker exec for writing
         self.container_name = config.get("container_name", "influxdb")
+        self.write_mode = config.get("write_mode", self.WRITE_MODE_SYNC)
+        self.enable_gzip = config.get("enable_gzip", self.write_mode == self.WRITE_MODE_BATCHING)
+        self.serializer = LineProtocolSerializer()
         self.client = None
         self.write_api = None
 
+    def _build_write_options(self) -> WriteOptions:
+        """
+        Build client write options for the configured write mode.
+
+        Batching options (all intervals in milliseconds):
+            - batch_size: points per HTTP request (default 5000)
+            - flush_interval: max time a point waits in the buffer (default 1000)
+            - jitter_interval: random delay added to each flush (default 0)
+            - retry_interval: first retry delay (default 5000)
+            - max_retries: retry attempts per batch, 0 disables retry (default 5)
+            - max_retry_delay: upper bound of a single retry delay (default 125000)
+            - max_retry_time: total retry budget per batch (default 180000)
+            - exponential_base: backoff multiplier (default 2)
+        """
+        if self.write_mode != self.WRITE_MODE_BATCHING:
+            return SYNCHRONOUS
+
+        return WriteOptions(
+            write_type=WriteType.batching,
+            batch_size=int(self.config.get("batch_size", 5000)),
+            flush_interval=int(self.config.get("flush_interval", 1000)),
+            jitter_interval=int(self.config.get("jitter_interval", 0)),
+            retry_interval=int(self.config.get("retry_interval", 5000)),
+            max_retries=int(self.config.get("max_retries", 5)),
+            max_retry_delay=int(self.config.get("max_retry_delay", 125000)),
+            max_retry_time=int(self.config.get("max_retry_time", 180000)),
+            exponential_base=int(self.config.get("exponential_base", 2)),
+        )
+
+    @staticmethod
+    def _batch_stats(data: Any) -> tuple:
+        """Return (point count, byte size) of a line protocol batch."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        if isinstance(data, (bytes, bytearray)):
+            return data.count(b"\n") + 1 if data else 0, len(data)
+        return 0, 0
+
+    def _on_write_success(self, conf: tuple, data: Any) -> None:
+        """Batching callback: a batch was accepted by InfluxDB."""
+        points, size = self._batch_stats(data)
+        self.metrics.record_success(points=points, size=size)
+        self.logger.debug(f"Batch of {points} points written to {conf[0]}")
+
+    def _on_write_error(self, conf: tuple, data: Any, exception: Exception) -> None:
+        """Batching callback: a batch was dropped after exhausting retries."""
+        points, _ = self._batch_stats(data)
+        self.metrics.record_failure(exception)
+        self.logger.error(f"Failed to write batch of {points} points to {conf[0]}: {exception}")
+
+    def _on_write_retry(self, conf: tuple, data: Any, exception: Exception) -> None:
+        """Batching callback: a batch write hit a retryable error."""
+        self.metrics.record_retry(exception)
+        self.logger.warning(f"Retrying batch write to {conf[0]}: {exception}")
+
+    def _create_write_api(self):
+        """Create the client write API for the configured write mode."""
+        if self.write_mode == self.WRITE_MODE_BATCHING:
+            return self.client.write_api(
+                write_options=self._build_write_options(),
+                success_callback=self._on_write_success,
+                error_callback=self._on_write_error,
+                retry_callback=self._on_write_retry,
+            )
+        return self.client.write_api(write_options=SYNCHRONOUS)
+
     def connect(self) -> bool:
         """Connect to InfluxDB."""
         try:
             self.client = InfluxClient(
                 url=self.url,
                 token=self.token,
-                org=self.org
+                org=self.org,
+                enable_gzip=self.enable_gzip,
             )
-            self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
+            self.write_api = self._create_write_api()
             self.is_connected = True
-            self.logger.info(f"Connected to InfluxDB at {self.url}")
+            self.logger.info(f"Connected to InfluxDB at {self.url} (write_mode={self.write_mode})")
             return True
         except Exception as e:
             self.is_connected = False
@@ -48,7 +129,7 @@ class InfluxDBStorage(BaseStorage):
             raise StorageError(f"InfluxDB connection failed: {e}") from e
 
     def disconnect(self) -> None:
-        """Close InfluxDB connection."""
+        """Close InfluxDB connection, flushing any buffered batches."""
         if self.write_api:
             try:
                 self.write_api.close()
@@ -94,20 +175,26 @@ class InfluxDBStorage(BaseStorage):
             return True
 
         try:
-            # Convert data to InfluxDB line protocol format
-            points = self._format_points(data)
-
             # Use docker exec if docker_mode is enabled (workaround for WSL2 auth issues)
             if self.docker_mode:
-                return self._write_via_docker(points)
-
-            # Write to InfluxDB
-            self.write_api.write(bucket=self.bucket, org=self.org, record=points)
-
-            self.logger.debug(f"Successfully wrote {len(points)} points to InfluxDB")
-            return True
+                return self._write_via_docker(self._format_points(data))
+
+            if self.write_mode == self.WRITE_MODE_BATCHING:
+                # One record per line: the client's batch_size counts records,
+                # so pre-joined bodies would pack whole batches into one request
+                lines = list(self.serializer.iter_lines(data))
+                if len(lines) < len(data):
+                    self.logger.warning(f"Skipped {len(data) - len(lines)} invalid points")
+                return self._write_lines(lines)
+
+            # Serialize directly into the line protocol request body
+            body, count = self.serializer.serialize(data)
+            if count < len(data):
+                self.logger.warning(f"Skipped {len(data) - count} invalid points")
+            return self._write_body(body, count)
 
         except Exception as e:
+            self.metrics.record_failure(e)
             self.logger.error(f"Failed to write to InfluxDB: {e}")
             # Try docker mode as fallback
             if not self.docker_mode:
@@ -119,6 +206,45 @@ class InfluxDBStorage(BaseStorage):
                     self.logger.error(f"Docker fallback also failed: {docker_err}")
             raise WriteError(f"InfluxDB write failed: {e}") from e
 
+    def _write_body(self, body: bytes, count: int) -> bool:
+        """Send a line protocol body as one blocking request (sync mode)."""
+        if not body:
+            return True
+
+        self.write_api.write(bucket=self.bucket, org=self.org, record=body)
+        self.metrics.record_submitted(count)
+        self.metrics.record_success(points=count, size=len(body))
+        self.logger.debug(f"Successfully wrote {count} points to InfluxDB")
+        return True
+
+    def _write_lines(self, lines: List[bytes]) -> bool:
+        """Queue encoded lines in the client's batching buffer (batching mode)."""
+        if not lines:
+            return True
+
+        self.write_api.write(bucket=self.bucket, org=self.org, record=lines)
+        self.metrics.record_submitted(len(lines))
+        # Delivery is confirmed asynchronously through the callbacks
+        self.logger.debug(f"Queued {len(lines)} points for batched write")
+        return True
+
+    def flush(self) -> None:
+        """
+        Write all buffered points in batching mode and wait for the requests.
+
+        ``WriteApi.flush()`` of influxdb-client is a no-op; only ``close()``
+        drains the batching buffer. The write API is therefore closed
+        (blocking until pending batches are written or dropped after their
+        retries) and replaced with a fresh one on the same client. Call it
+        from the thread that writes to this storage.
+        """
+        if self.write_mode != self.WRITE_MODE_BATCHING or not self.write_api or not self.client:
+            return
+        try:
+            self.write_api.close()
+        finally:
+            self.write_api = self._create_write_api()
+
     def health_check(self) -> bool:
         """Check InfluxDB health."""
         if not self.is_connected or not self.client:
@@ -216,6 +342,85 @@ class InfluxDBStorage(BaseStorage):
             self.logger.error(f"Query failed: {e}")
             raise StorageError(f"InfluxDB query failed: {e}") from e
 
+    def iter_query_rows(self, flux_query: str) -> Iterator[Dict[str, Any]]:
+        """
+        Execute a Flux query and stream result rows.
+
+        The annotated CSV response is parsed incrementally as it arrives on
+        the pooled HTTP connection, so memory use does not depend on the
+        result size. Values are converted according to the ``#datatype``
+        annotation of each table.
+
+        Args:
+            flux_query: Flux query string
+
+        Yields:
+            One dict per result row, keyed by column name
+
+        Raises:
+            StorageError: If the query fails or returns an error table
+        """
+        if not self.is_connected or not self.client:
+            if not self.connect():
+                raise StorageError("Not connected to InfluxDB")
+
+        try:
+            rows = self.client.query_api().query_csv(query=flux_query, org=self.org)
+        except Exception as e:
+            self.logger.error(f"Query failed: {e}")
+            raise StorageError(f"InfluxDB query failed: {e}") from e
+
+        datatypes: List[str] = []
+        defaults: List[str] = []
+        header: Optional[List[str]] = None
+
+        for row in rows:
+            if not row or not any(row):
+                # Blank line separates tables; the next table repeats annotations
+                header = None
+                continue
+
+            annotation = row[0]
+            if annotation == "#datatype":
+                datatypes = row[1:]
+                header = None
+                continue
+            if annotation == "#default":
+                defaults = row[1:]
+                continue
+            if annotation.startswith("#"):
+                continue
+
+            if header is None:
+                header = row[1:]
+                continue
+
+            values = row[1:]
+            if "error" in header and "reference" in header:
+                raise StorageError(f"InfluxDB query failed: {values[header.index('error')]}")
+
+            record = {}
+            for index, column in enumerate(header):
+                raw = values[index] if index < len(values) else ""
+                if raw == "" and index < len(defaults):
+                    raw = defaults[index]
+                datatype = datatypes[index] if index < len(datatypes) else "string"
+                record[column] = self._convert_csv_value(raw, datatype)
+            yield record
+
+    @staticmethod
+    def _convert_csv_value(raw: str, datatype: str) -> Any:
+        """Convert an annotated CSV cell to a Python value."""
+        if raw == "":
+            return None
+        if datatype == "double":
+            return float(raw)
+        if datatype in ("long", "unsignedLong"):
+            return int(raw)
+        if datatype == "boolean":
+            return raw == "true"
+        return raw
+
     def get_point_count(
         self,
         measurement: str,
@@ -0,0 +1,222 @@
+"""Kafka storage backend for streaming acquisition data downstream."""
+from __future__ import annotations
+
+import json
+import threading
+from typing import Any, Dict, List, Optional
+
+from kafka import KafkaProducer, codec
+from kafka.errors import KafkaError
+
+from .base import BaseStorage, StorageError, StorageRegistry, WriteError
+
+
+@StorageRegistry.register("kafka")
+class KafkaStorage(BaseStorage):
+    """
+    Kafka producer storage implementation.
+
+    Each data point is published as one JSON message. Messages are keyed
+    by device (``key_tag`` config, default ``device``) so the default
+    partitioner keeps every device on one partition and per-device
+    ordering holds. Sends are asynchronous: the producer batches messages
+    per partition (``linger_ms``/``batch_size``), compresses batches
+    (``compression_type``: gzip, snappy, lz4, zstd) and reports delivery
+    results through callbacks into ``self.metrics``. Each ``write`` call
+    counts as one batch in the metrics once all of its messages settled.
+
+    gzip is built in; snappy, lz4 and zstd need the ``python-snappy``,
+    ``lz4`` and ``zstandard`` packages.
+    """
+
+    SUPPORTED_COMPRESSION = ("gzip", "snappy", "lz4", "zstd")
+    # Codec availability checks of kafka-python, and the package providing each codec
+    CODEC_PACKAGES = {
+        "snappy": (codec.has_snappy, "python-snappy"),
+        "lz4": (codec.has_lz4, "lz4"),
+        "zstd": (codec.has_zstd, "zstandard"),
+    }
+
+    def __init__(self, config: Dict[str, Any]) -> None:
+        super().__init__(config)
+        self.bootstrap_servers = config.get("bootstrap_servers", "localhost:9092")
+        self.topic = config.get("topic", "acquisition_data")
+        self.key_tag = config.get("key_tag", "device")
+        self.compression_type = config.get("compression_type") or None
+        self.flush_timeout = float(config.get("flush_timeout", 10.0))
+        self.producer: Optional[KafkaProducer] = None
+
+        if self.compression_type and self.compression_type not in self.SUPPORTED_COMPRESSION:
+            raise ValueError(
+                f"Unsupported Kafka compression '{self.compression_type}'. "
+                f"Available: {list(self.SUPPORTED_COMPRESSION)}"
+            )
+        if self.compression_type in self.CODEC_PACKAGES:
+            available, package = self.CODEC_PACKAGES[self.compression_type]
+            if not available():
+                raise ValueError(
+                    f"Kafka compression '{self.compression_type}' requires the '{package}' package, "
+                    f"install it or use gzip"
+                )
+
+    def _producer_config(self) -> Dict[str, Any]:
+        """
+        Build producer configuration.
+
+        Tuning options:
+            - linger_ms: time to wait for more messages per batch (default 20)
+            - batch_size: max bytes per partition batch (default 256 KiB)
+            - acks: 0, 1 or 'all' (default 1)
+            - retries: send retries (default 3)
+            - buffer_memory: producer buffer size in bytes (default 64 MiB)
+        """
+        servers = self.bootstrap_servers
+        if isinstance(servers, str):
+            servers = [s.strip() for s in servers.split(",") if s.strip()]
+
+        acks = self.config.get("acks", 1)
+        producer_config = {
+            "bootstrap_servers": servers,
+            "client_id": self.config.get("client_id", "edge-iot-acquisition"),
+            "acks": acks if acks == "all" else int(acks),
+            "compression_type": self.compression_type,
+            "linger_ms": int(self.config.get("linger_ms", 20)),
+            "batch_size": int(self.config.get("batch_size", 256 * 1024)),
+            "retries": int(self.config.get("retries", 3)),
+            "buffer_memory": int(self.config.get("buffer_memory", 64 * 1024 * 1024)),
+            # One in-flight request per broker keeps retried batches in order
+            "max_in_flight_requests_per_connection": 1,
+            "key_serializer": lambda key: str(key).encode("utf-8") if key is not None else None,
+            "value_serializer": lambda value: json.dumps(value, default=str).encode("utf-8"),
+        }
+        if self.config.get("api_version"):
+            producer_config["api_version"] = tuple(self.config["api_version"])
+        return producer_config
+
+    def connect(self) -> bool:
+        """Create the Kafka producer."""
+        try:
+            self.producer = KafkaProducer(**self._producer_config())
+            self.is_connected = True
+            self.logger.info(
+                f"Connected to Kafka at {self.bootstrap_servers} "
+                f"(topic={self.topic}, compression={self.compression_type})"
+            )
+            return True
+        except Exception as e:
+            self.is_connected = False
+            self.producer = None
+            self.logger.error(f"Failed to connect to Kafka: {e}")
+            raise StorageError(f"Kafka connection failed: {e}") from e
+
+    def disconnect(self) -> None:
+        """Flush pending messages and close the producer."""
+        if self.producer:
+            try:
+                self.producer.flush(timeout=self.flush_timeout)
+                self.producer.close(timeout=self.flush_timeout)
+                self.logger.info("Disconnected from Kafka")
+            except Exception as e:
+                self.logger.warning(f"Error during Kafka disconnect: {e}")
+            finally:
+                self.producer = None
+        self.is_connected = False
+
+    def write(self, data: List[Dict[str, Any]]) -> bool:
+        """
+        Publish data points to Kafka.
+
+        Sends are queued in the producer and return immediately;
+        delivery is confirmed asynchronously through callbacks.
+
+        Args:
+            data: List of data points in the ``BaseStorage.write`` format
+
+        Returns:
+            True if all messages were queued.
+
+        Raises:
+            WriteError: If messages cannot be queued.
+        """
+        if not self.is_connected or not self.producer:
+            if not self.connect():
+                raise WriteError("Not connected to Kafka")
+
+        if not data:
+            return True
+
+        batch = _PendingBatch(len(data))
+        try:
+            for point in data:
+                message = self._format_message(point)
+                key = (point.get("tags") or {}).get(self.key_tag)
+                future = self.producer.send(self.topic, value=message, key=key)
+                future.add_callback(self._on_send_success, batch)
+                future.add_errback(self._on_send_error, batch)
+
+            self.metrics.record_submitted(len(data))
+            self.logger.debug(f"Queued {len(data)} messages for topic {self.topic}")
+            return True
+
+        except KafkaError as e:
+            self.metrics.record_failure(e)
+            self.logger.error(f"Failed to queue Kafka messages: {e}")
+            raise WriteError(f"Kafka write failed: {e}") from e
+
+    def flush(self) -> None:
+        """Block until all queued messages are delivered or failed."""
+        if self.producer:
+            self.producer.flush(timeout=self.flush_timeout)
+
+    def health_check(self) -> bool:
+        """Check whether the producer is connected to a broker."""
+        if not self.is_connected or not self.producer:
+            return False
+        try:
+            return self.producer.bootstrap_connected()
+        except Exception as e:
+            self.logger.warning(f"Health check failed: {e}")
+            return False
+
+    @staticmethod
+    def _format_message(point: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a storage data point into the Kafka message payload."""
+        return {
+            "measurement": point.get("measurement"),
+            "tags": point.get("tags", {}),
+            "fields": point.get("fields", {}),
+            "time": point.get("time") or point.get("timestamp"),
+        }
+
+    def _on_send_success(self, batch: "_PendingBatch", record_metadata: Any) -> None:
+        """Delivery callback: message acknowledged by the broker."""
+        size = getattr(record_metadata, "serialized_value_size", 0) or 0
+        self.metrics.record_success(points=1, size=max(size, 0), batches=int(batch.settle(failed=False)))
+
+    def _on_send_error(self, batch: "_PendingBatch", exception: Exception) -> None:
+        """Delivery callback: message failed after all retries."""
+        self.metrics.record_failure(exception, batches=int(batch.settle(failed=True)))
+        self.logger.error(f"Kafka delivery failed for topic {self.topic}: {exception}")
+
+
+class _PendingBatch:
+    """Delivery state of the messages queued by one ``write`` call."""
+
+    def __init__(self, size: int) -> None:
+        self._lock = threading.Lock()
+        self.remaining = size
+        self.failed = False
+
+    def settle(self, failed: bool) -> bool:
+        """
+        Mark one message as settled.
+
+        Returns True when this message decides the batch outcome: the last
+        delivery of a batch without failures, or the first failure.
+        """
+        with self._lock:
+            self.remaining -= 1
+            if failed:
+                first, self.failed = not self.failed, True
+                return first
+            return self.remaining == 0 and not self.failed
@@ -0,0 +1,150 @@
+"""Fast InfluxDB line protocol serialization."""
+from __future__ import annotations
+
+import json
+import math
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+_MEASUREMENT_ESCAPES = str.maketrans({",": "\\,", " ": "\\ ", "\n": "\\n"})
+_KEY_ESCAPES = str.maketrans({",": "\\,", "=": "\\=", " ": "\\ ", "\n": "\\n"})
+_STRING_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"'})
+
+
+def escape_measurement(value: Any) -> str:
+    """Escape a measurement name."""
+    return str(value).translate(_MEASUREMENT_ESCAPES)
+
+
+def escape_key(value: Any) -> str:
+    """Escape a tag key, tag value or field key."""
+    return str(value).translate(_KEY_ESCAPES)
+
+
+def encode_field_value(value: Any) -> Optional[bytes]:
+    """
+    Encode a field value in line protocol syntax.
+
+    Returns:
+        Encoded value, or None if the value cannot be stored (NaN/inf).
+    """
+    if isinstance(value, bool):
+        return b"true" if value else b"false"
+    if isinstance(value, int):
+        return b"%di" % value
+    if isinstance(value, float):
+        if math.isnan(value) or math.isinf(value):
+            return None
+        return repr(value).encode()
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value)
+    return b'"' + str(value).translate(_STRING_ESCAPES).encode("utf-8") + b'"'
+
+
+class LineProtocolSerializer:
+    """
+    Serialize data points straight into a line protocol byte buffer.
+
+    The escaped ``measurement,tag=value,...`` prefix of a series is computed
+    once and cached, so per-sample work is limited to encoding the field and
+    timestamp. ``serialize`` joins the lines into one request body,
+    ``iter_lines`` hands them out one by one for clients that batch by line.
+    """
+
+    def __init__(self, max_series: int = 100_000) -> None:
+        """
+        Args:
+            max_series: Upper bound of cached series keys before the cache is reset
+        """
+        self.max_series = max_series
+        self._series_keys: Dict[Tuple[Any, ...], bytes] = {}
+
+    def series_key(self, measurement: str, tags: Optional[Dict[str, Any]] = None) -> bytes:
+        """
+        Return the escaped series key for a measurement and tag set.
+
+        Tags are sorted by key (as recommended by InfluxDB) and empty tag
+        values are dropped, since line protocol does not allow them.
+        """
+        cache_key = (measurement, tuple(tags.items())) if tags else (measurement,)
+        key = self._series_keys.get(cache_key)
+        if key is not None:
+            return key
+
+        parts = [escape_measurement(measurement)]
+        for tag_key in sorted(tags or {}):
+            tag_value = tags[tag_key]
+            if tag_value is None or tag_value == "":
+                continue
+            parts.append(f"{escape_key(tag_key)}={escape_key(tag_value)}")
+        key = ",".join(parts).encode("utf-8")
+
+        if len(self._series_keys) >= self.max_series:
+            self._series_keys.clear()
+        self._series_keys[cache_key] = key
+        return key
+
+    def encode_line(
+        self,
+        series_key: bytes,
+        fields: Dict[str, Any],
+        timestamp: Optional[int] = None,
+    ) -> Optional[bytes]:
+        """
+        Encode one line.
+
+        Returns:
+            The line without trailing newline, or None if no field could be encoded.
+        """
+        encoded = []
+        for field_key, value in fields.items():
+            field_value = encode_field_value(value)
+            if field_value is not None:
+                encoded.append(escape_key(field_key).encode("utf-8") + b"=" + field_value)
+        if not encoded:
+            return None
+
+        line = series_key + b" " + b",".join(encoded)
+        if timestamp:
+            line += b" %d" % int(timestamp)
+        return line
+
+    def iter_lines(self, data: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+        """
+        Encode storage data points one line at a time.
+
+        Points are expected to share their ``tags`` dict per series (as
+        ``AcquisitionService`` does), so the series key is looked up by the
+        identity of that dict and the hashable content key is built only
+        once per series and call instead of once per sample. The memo lives
+        for one call and holds a reference to each dict, so ids cannot be
+        reused while it is in use.
+
+        Yields:
+            Encoded lines of the valid points, without newlines
+        """
+        by_identity: Dict[int, Tuple[Any, str, bytes]] = {}
+        for point in data:
+            measurement = point.get("measurement")
+            fields = point.get("fields")
+            if not measurement or not fields:
+                continue
+            tags = point.get("tags")
+            entry = by_identity.get(id(tags))
+            if entry is None or entry[0] is not tags or entry[1] != measurement:
+                entry = by_identity[id(tags)] = (tags, measurement, self.series_key(measurement, tags))
+            line = self.encode_line(entry[2], fields, point.get("time") or point.get("timestamp"))
+            if line is not None:
+                yield line
+
+    def serialize(self, data: Iterable[Dict[str, Any]]) -> Tuple[bytes, int]:
+        """
+        Serialize storage data points into a line protocol body.
+
+        Args:
+            data: Data points in the ``BaseStorage.write`` format
+
+        Returns:
+            Tuple of (line protocol bytes, number of lines written)
+        """
+        lines = list(self.iter_lines(data))
+        return b"\n".join(lines), len(lines)
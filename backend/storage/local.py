@@ -0,0 +1,242 @@
+"""Embedded SQLite time-series store for edge buffering and offline queries."""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .base import BaseStorage, StorageError, StorageRegistry, WriteError
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    measurement TEXT NOT NULL,
+    point TEXT,
+    field TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    UNIQUE (measurement, field, tags)
+);
+CREATE INDEX IF NOT EXISTS series_point ON series (point, field);
+CREATE TABLE IF NOT EXISTS samples (
+    series_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    value,
+    quality TEXT,
+    PRIMARY KEY (series_id, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+"""
+
+
+def _format_ns(ts: int) -> str:
+    return datetime.fromtimestamp(ts / 1e9, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+@StorageRegistry.register("local")
+class LocalStorage(BaseStorage):
+    """
+    Local time-series store in one SQLite file.
+
+    Samples live in a ``WITHOUT ROWID`` table clustered on
+    ``(series_id, ts)``, so a point's range query is one contiguous B-tree
+    scan and appends for a series go to the end of its key range. The
+    file is bounded by ``max_bytes``: every ``retention_check_interval``
+    writes, the oldest ``evict_fraction`` of samples is deleted while the
+    used size is over the limit (freed pages are reused, so the file stops
+    growing). ``max_age_seconds`` optionally drops samples by age.
+
+    WAL mode lets API processes read while the acquisition worker writes.
+    """
+
+    def __init__(self, config: Dict[str, Any]) -> None:
+        super().__init__(config)
+        self.path = str(config.get("path", "edge_tsdb.sqlite3"))
+        self.max_bytes = int(config.get("max_bytes", 512 * 1024 * 1024))
+        self.max_age_seconds = config.get("max_age_seconds")
+        self.retention_check_interval = int(config.get("retention_check_interval", 100))
+        self.evict_fraction = float(config.get("evict_fraction", 0.1))
+        self.conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        self._series_ids: Dict[Tuple[str, str, str], int] = {}
+        self._writes_since_check = 0
+
+    def connect(self) -> bool:
+        """Open (and create) the database file."""
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self.conn = conn
+            self.is_connected = True
+            self.logger.info(f"Opened local store at {self.path}")
+            return True
+        except sqlite3.Error as e:
+            self.is_connected = False
+            raise StorageError(f"Local store open failed: {e}") from e
+
+    def disconnect(self) -> None:
+        with self._lock:
+            if self.conn:
+                try:
+                    self.conn.close()
+                finally:
+                    self.conn = None
+            self._series_ids.clear()
+            self.is_connected = False
+
+    def health_check(self) -> bool:
+        if not self.is_connected or not self.conn:
+            return False
+        try:
+            with self._lock:
+                self.conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error as e:
+            self.logger.warning(f"Health check failed: {e}")
+            return False
+
+    def write(self, data: List[Dict[str, Any]]) -> bool:
+        """
+        Append data points in one transaction.
+
+        Returns:
+            True if written.
+
+        Raises:
+            WriteError: If the write fails.
+        """
+        if not self.is_connected or not self.conn:
+            self.connect()
+        if not data:
+            return True
+
+        try:
+            with self._lock:
+                rows = []
+                for point in data:
+                    tags = dict(point.get("tags") or {})
+                    quality = tags.pop("quality", "good")
+                    measurement = point.get("measurement") or ""
+                    timestamp = point.get("time") or point.get("timestamp")
+                    if not timestamp:
+                        continue
+                    tags_key = json.dumps(tags, sort_keys=True)
+                    for field, value in (point.get("fields") or {}).items():
+                        series_id = self._series_id(measurement, field, tags_key, tags.get("point"))
+                        if isinstance(value, (list, dict)):
+                            value = json.dumps(value)
+                        rows.append((series_id, int(timestamp), value, quality))
+
+                with self.conn:
+                    self.conn.executemany(
+                        "INSERT OR REPLACE INTO samples (series_id, ts, value, quality) VALUES (?, ?, ?, ?)",
+                        rows,
+                    )
+
+                self._writes_since_check += 1
+                if self._writes_since_check >= self.retention_check_interval:
+                    self._writes_since_check = 0
+                    self.enforce_retention()
+
+            self.metrics.record_submitted(len(rows))
+            self.metrics.record_success(points=len(rows))
+            return True
+        except sqlite3.Error as e:
+            self.metrics.record_failure(e)
+            raise WriteError(f"Local store write failed: {e}") from e
+
+    def _series_id(self, measurement: str, field: str, tags_key: str, point: Optional[str]) -> int:
+        key = (measurement, field, tags_key)
+        series_id = self._series_ids.get(key)
+        if series_id is None:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO series (measurement, point, field, tags) VALUES (?, ?, ?, ?)",
+                (measurement, point, field, tags_key),
+            )
+            series_id = self.conn.execute(
+                "SELECT id FROM series WHERE measurement = ? AND field = ? AND tags = ?",
+                (measurement, field, tags_key),
+            ).fetchone()[0]
+            self._series_ids[key] = series_id
+        return series_id
+
+    def query_range(
+        self,
+        point_codes: Sequence[str],
+        start_ns: int,
+        stop_ns: int,
+        fields: Optional[Sequence[str]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return samples of the given points in ``[start_ns, stop_ns)``.
+
+        Rows use the same keys as ``InfluxDBStorage.iter_query_rows``
+        (``point``, ``_field``, ``_time``, ``_value``, ``quality``);
+        ``limit`` applies per series.
+        """
+        if not self.is_connected or not self.conn:
+            self.connect()
+        if not point_codes:
+            return []
+
+        placeholders = ",".join("?" * len(point_codes))
+        sql = f"SELECT id, point, field FROM series WHERE point IN ({placeholders})"
+        params: List[Any] = list(point_codes)
+        if fields:
+            sql += f" AND field IN ({','.join('?' * len(fields))})"
+            params.extend(fields)
+
+        rows = []
+        with self._lock:
+            series = self.conn.execute(sql, params).fetchall()
+            for series_id, point, field in series:
+                sample_sql = "SELECT ts, value, quality FROM samples WHERE series_id = ? AND ts >= ? AND ts < ? ORDER BY ts"
+                sample_params: List[Any] = [series_id, start_ns, stop_ns]
+                if limit:
+                    sample_sql += " LIMIT ?"
+                    sample_params.append(int(limit))
+                for ts, value, quality in self.conn.execute(sample_sql, sample_params).fetchall():
+                    rows.append({"point": point, "_field": field, "_time": _format_ns(ts), "_value": value, "quality": quality})
+        return rows
+
+    def used_bytes(self) -> int:
+        """Bytes of the database file in use (excluding free pages)."""
+        page_size = self.conn.execute("PRAGMA page_size").fetchone()[0]
+        page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+        freelist = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return (page_count - freelist) * page_size
+
+    def enforce_retention(self, now_ns: Optional[int] = None) -> int:
+        """
+        Apply age and size limits.
+
+        Returns:
+            Number of samples deleted
+        """
+        deleted = 0
+        with self._lock, self.conn:
+            if self.max_age_seconds:
+                now_ns = now_ns or int(datetime.now(timezone.utc).timestamp() * 1e9)
+                cutoff = now_ns - int(float(self.max_age_seconds) * 1e9)
+                deleted += self.conn.execute("DELETE FROM samples WHERE ts < ?", (cutoff,)).rowcount
+
+            while self.used_bytes() > self.max_bytes:
+                total = self.conn.execute("SELECT COUNT(*) FROM samples").fetchone()[0]
+                if not total:
+                    break
+                offset = max(1, int(total * self.evict_fraction)) - 1
+                cutoff = self.conn.execute(
+                    "SELECT ts FROM samples ORDER BY ts LIMIT 1 OFFSET ?", (offset,)
+                ).fetchone()[0]
+                deleted += self.conn.execute("DELETE FROM samples WHERE ts <= ?", (cutoff,)).rowcount
+
+        if deleted:
+            self.logger.info(f"Local store retention removed {deleted} samples")
+        return deleted
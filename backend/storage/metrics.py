@@ -0,0 +1,74 @@
+"""Thread-safe write metrics shared by storage backends."""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class StorageMetrics:
+    """
+    Counters describing the write activity of a storage backend.
+
+    Asynchronous writers report results from background threads
+    (client callbacks, delivery reports), so all updates go through a lock.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset all counters to zero."""
+        with self._lock:
+            self.points_submitted = 0
+            self.points_written = 0
+            self.batches_written = 0
+            self.batches_failed = 0
+            self.retries = 0
+            self.bytes_written = 0
+            self.last_success_at: Optional[float] = None
+            self.last_error_at: Optional[float] = None
+            self.last_error: Optional[str] = None
+
+    def record_submitted(self, points: int) -> None:
+        """Record points handed to the backend (not yet confirmed)."""
+        with self._lock:
+            self.points_submitted += points
+
+    def record_success(self, points: int = 0, size: int = 0, batches: int = 1) -> None:
+        """Record a confirmed write; per-message callbacks pass ``batches=0`` until their batch completes."""
+        with self._lock:
+            self.batches_written += batches
+            self.points_written += points
+            self.bytes_written += size
+            self.last_success_at = time.time()
+
+    def record_failure(self, error: Any, batches: int = 1) -> None:
+        """Record a batch that was dropped after all retries."""
+        with self._lock:
+            self.batches_failed += batches
+            self.last_error = str(error)
+            self.last_error_at = time.time()
+
+    def record_retry(self, error: Any) -> None:
+        """Record a retryable write error."""
+        with self._lock:
+            self.retries += 1
+            self.last_error = str(error)
+            self.last_error_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a consistent copy of all counters."""
+        with self._lock:
+            return {
+                "points_submitted": self.points_submitted,
+                "points_written": self.points_written,
+                "batches_written": self.batches_written,
+                "batches_failed": self.batches_failed,
+                "retries": self.retries,
+                "bytes_written": self.bytes_written,
+                "last_success_at": self.last_success_at,
+                "last_error_at": self.last_error_at,
+                "last_error": self.last_error,
+            }
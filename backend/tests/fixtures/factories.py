@@ -107,7 +107,6 @@ def create_point(create_device, create_point_template):
             address=kwargs.get("address", "D100"),
             description=kwargs.get("description", f"Test point {code}"),
             sample_rate_hz=Decimal(kwargs.get("sample_rate_hz", "1.0")),
-            to_kafka=kwargs.get("to_kafka", False),
             extra=kwargs.get("extra", {"type": "int16", "num": 1}),
         )
     return _create
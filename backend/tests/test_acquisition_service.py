@@ -93,6 +93,7 @@ class TestAcquisitionService:
         with patch("acquisition.services.acquisition_service.StorageRegistry") as mock_registry:
             mock_storage = MagicMock()
             mock_storage.connect.return_value = True
+            mock_storage.is_connected = False
             mock_storage.write.return_value = True
             mock_registry.create.return_value = mock_storage
 
@@ -311,3 +312,155 @@ class TestStorageInitialization:
 
         # No storages should be initialized
         assert len(service.storages) == 0
+
+
+@pytest.mark.django_db
+class TestStorageSinkResolution:
+    """Test per-task storage sink selection."""
+
+    @patch("acquisition.services.acquisition_service.StorageRegistry")
+    def test_task_sinks_override_defaults(self, mock_registry, create_task, create_session):
+        """Test AcqTask.storage_sinks selects sinks and merges config."""
+        mock_registry.create.return_value = MagicMock()
+
+        task = create_task()
+        task.storage_sinks = [
+            "influxdb",
+            {"name": "analytics", "type": "kafka", "config": {"topic": "analytics"}, "queue_size": 50},
+        ]
+        task.save()
+        session = create_session(task=task)
+
+        service = AcquisitionService(task, session)
+
+        assert set(service.storages) == {"influxdb", "analytics"}
+        assert service.sink_options["analytics"] == {"queue_size": 50}
+        kafka_call = mock_registry.create.call_args_list[1]
+        assert kafka_call.args[0] == "kafka"
+        assert kafka_call.args[1]["topic"] == "analytics"
+        assert "bootstrap_servers" in kafka_call.args[1]
+
+
+@pytest.mark.django_db
+class TestDataPointWriter:
+    """Test bulk DataPoint ingestion."""
+
+    @staticmethod
+    def _data(count):
+        return [
+            {"measurement": "D1", "tags": {"quality": "good"}, "fields": {f"P{i % 3}": i}, "time": 1_700_000_000_000_000_000 + i}
+            for i in range(count)
+        ]
+
+    def test_bulk_insert_with_one_notification_per_batch(self, create_session):
+        """Test rows are inserted per batch and each batch sends one message."""
+        from acquisition import models as acq_models
+        from acquisition.services.data_point_writer import DataPointWriter
+
+        session = create_session()
+        channel_layer = MagicMock()
+        writer = DataPointWriter(session, batch_size=10, background=False)
+
+        with patch("acquisition.services.data_point_writer.get_channel_layer", return_value=channel_layer), \
+                patch("acquisition.services.data_point_writer.async_to_sync", side_effect=lambda fn: fn), \
+                patch("acquisition.signals.get_channel_layer") as signal_layer:
+            writer.add(self._data(25))
+            writer.flush()
+
+        assert acq_models.DataPoint.objects.filter(session=session).count() == 25
+        assert channel_layer.group_send.call_count == 3
+        message = channel_layer.group_send.call_args_list[0][0][1]
+        assert message["type"] == "data_points_batch"
+        assert message["data"]["count"] == 10
+        assert {p["point_code"] for p in message["data"]["points"]} == {"P0", "P1", "P2"}
+        signal_layer.assert_not_called()
+
+    def test_sample_ratio(self, create_session):
+        """Test only the configured share of samples is written."""
+        from acquisition import models as acq_models
+        from acquisition.services.data_point_writer import DataPointWriter
+
+        session = create_session()
+        writer = DataPointWriter(session, sample_ratio=0.25, notify=False, background=False)
+        writer.add(self._data(100))
+        writer.flush()
+
+        assert acq_models.DataPoint.objects.filter(session=session).count() == 25
+        assert writer.samples_skipped == 75
+
+    def test_background_writer_never_blocks_caller(self, create_session):
+        """Test batches are inserted by the writer thread and drained on close."""
+        import threading
+        import time
+        from acquisition.services.data_point_writer import DataPointWriter
+
+        session = create_session()
+        release = threading.Event()
+        inserted = []
+
+        def slow_bulk_create(rows, batch_size):
+            release.wait(5)
+            inserted.append(len(rows))
+
+        writer = DataPointWriter(session, batch_size=10, notify=False, queue_size=2)
+        with patch("acquisition.models.DataPoint.objects.bulk_create", side_effect=slow_bulk_create):
+            started = time.monotonic()
+            writer.add(self._data(50))
+            assert time.monotonic() - started < 1.0
+
+            release.set()
+            writer.close(timeout=5)
+
+        # At most one batch in flight plus two queued; older queued batches were dropped for newer ones
+        assert sum(inserted) + writer.rows_dropped == 50
+        assert writer.rows_written == sum(inserted)
+        assert writer.rows_dropped >= 20
+
+
+@pytest.mark.django_db
+class TestSessionCounters:
+    """Test materialized session counters."""
+
+    def test_record_and_snapshot(self):
+        """Test values, bad-quality values and the newest timestamp are counted."""
+        from acquisition.services.session_stats import SessionCounters
+
+        counters = SessionCounters({"points_read": 10, "error_count": 1})
+        counters.record([
+            {"tags": {"quality": "good"}, "fields": {"P1": 1, "P2": 2}, "time": 2_000_000_000},
+            {"tags": {"quality": "bad"}, "fields": {"P3": None}, "time": 1_000_000_000},
+        ])
+
+        snapshot = counters.snapshot()
+        assert snapshot["points_read"] == 13
+        assert snapshot["error_count"] == 2
+        assert snapshot["last_read_time"].startswith("1970-01-01T00:00:02")
+        assert snapshot["points_per_second"] > 0
+        assert counters.snapshot()["points_per_second"] == 0
+
+    def test_session_counters_read_from_metadata(self, create_session):
+        """Test status counters come from the session row, defaulting to zero."""
+        from acquisition.services.session_stats import session_counters
+
+        session = create_session()
+        assert session_counters(session)["points_read"] == 0
+
+        session.metadata = {"counters": {"points_read": 5, "error_count": 1, "last_read_time": "2024-01-01T00:00:00+00:00"}}
+        counters = session_counters(session)
+        assert (counters["points_read"], counters["error_count"]) == (5, 1)
+        assert counters["last_read_time"].year == 2024
+
+    def test_health_flush_is_periodic(self, create_task, create_session):
+        """Test counters are saved at the flush interval unless forced."""
+        task = create_task()
+        session = create_session(task=task)
+        service = AcquisitionService(task, session)
+        service.counters.record([{"tags": {}, "fields": {"P1": 1}, "time": 1}])
+
+        with patch.object(session, "save") as save:
+            service._update_session_health({})
+            service._update_session_health({})
+            service._update_session_health({}, force=True)
+
+        assert save.call_count == 2
+        assert session.metadata["counters"]["points_read"] == 1
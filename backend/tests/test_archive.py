@@ -0,0 +1,114 @@
+"""Tests for the Parquet archive storage and export job."""
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+import pytest
+
+from acquisition.services.archive_export import build_export_flux, export_archive, row_to_point
+from storage import archive as archive_module
+from storage.archive import ArchiveStorage
+from storage.base import StorageError
+
+
+def _point(site, device, code, ts_s, value):
+    return {
+        "measurement": device,
+        "tags": {"site": site, "device": device, "point": code, "quality": "good"},
+        "fields": {code: value},
+        "time": int(ts_s * 1e9),
+    }
+
+
+class TestArchiveStorage:
+    """Test partitioned Parquet output."""
+
+    def test_requires_pyarrow(self, tmp_path, monkeypatch):
+        """Test connecting without pyarrow fails with a clear error."""
+        monkeypatch.setattr(archive_module, "pa", None)
+
+        with pytest.raises(StorageError, match="pyarrow"):
+            ArchiveStorage({"root": str(tmp_path)}).connect()
+
+    def test_writes_partitioned_files(self, tmp_path):
+        """Test samples land in site/device/day partitions, sorted and readable."""
+        pq = pytest.importorskip("pyarrow.parquet")
+        store = ArchiveStorage({"root": str(tmp_path), "flush_interval": 3600})
+        store.connect()
+        day = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+        store.write([
+            _point("S1", "D1", "B", day + 2, 2.0),
+            _point("S1", "D1", "A", day + 1, 1),
+            _point("S1", "D2", "C", day + 86400, 3.0),
+            _point("S1", "D1", "TEXT", day, "on"),
+        ])
+        store.flush()
+
+        files = sorted(tmp_path.glob("site=S1/device=*/date=*/part-*.parquet"))
+        assert [f.parent.relative_to(tmp_path).as_posix() for f in files] == [
+            "site=S1/device=D1/date=2024-01-01",
+            "site=S1/device=D2/date=2024-01-02",
+        ]
+        table = pq.read_table(files[0])
+        assert table.column("point").to_pylist() == ["A", "B"]
+        assert table.column("value").to_pylist() == [1.0, 2.0]
+        assert store.get_metrics()["skipped_values"] == 1
+
+
+class TestArchiveExport:
+    """Test exporting InfluxDB rows into the archive."""
+
+    def test_row_to_point_keeps_tags(self):
+        """Test Flux rows become storage data points with their tags."""
+        point = row_to_point({
+            "result": "_result", "table": 0, "_measurement": "dev", "_field": "T1",
+            "_time": "2024-01-01T00:00:01.5Z", "_value": 20.5, "site": "S1", "device": "D1", "point": "T1",
+        })
+
+        assert point == {
+            "measurement": "dev",
+            "tags": {"site": "S1", "device": "D1", "point": "T1"},
+            "fields": {"T1": 20.5},
+            "time": 1704067201500000000,
+        }
+
+    def test_export_runs_per_day_in_chunks(self):
+        """Test each day is queried in chunks and flushed once."""
+        storage = MagicMock(bucket="raw")
+        storage.iter_query_rows.side_effect = lambda flux: iter([
+            {"_measurement": "dev", "_field": "T1", "_time": "2024-01-01T00:00:00Z", "_value": 1.0, "site": "S1"},
+        ])
+        archive = MagicMock(root="/nonexistent")
+
+        result = export_archive(
+            datetime(2024, 1, 1, 12, tzinfo=timezone.utc),
+            datetime(2024, 1, 2, 12, tzinfo=timezone.utc),
+            storage=storage,
+            archive=archive,
+            site="S1",
+        )
+
+        assert [day["date"] for day in result["days"]] == ["2024-01-01", "2024-01-02"]
+        assert storage.iter_query_rows.call_count == 24
+        assert archive.flush.call_count == 2
+        assert result["rows"] == 24
+        assert 'r["site"] == "S1"' in build_export_flux("raw", datetime(2024, 1, 1, tzinfo=timezone.utc),
+                                                        datetime(2024, 1, 2, tzinfo=timezone.utc), "S1")
+
+    def test_export_swaps_in_staged_files(self, tmp_path):
+        """Test a day's previous export is replaced only after the new one is complete."""
+        partition = tmp_path / "site=S1" / "device=D1" / "date=2024-01-01"
+        partition.mkdir(parents=True)
+        (partition / "export-1-old.parquet").write_bytes(b"old")
+        archive = MagicMock(root=str(tmp_path))
+        archive.flush.side_effect = lambda: (partition / f"{archive.file_prefix}-2-new.parquet").write_bytes(b"new")
+        storage = MagicMock(bucket="raw")
+        storage.iter_query_rows.side_effect = lambda flux: iter([])
+        day = (datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 1, 2, tzinfo=timezone.utc))
+
+        export_archive(*day, storage=storage, archive=archive, site="S1")
+        assert sorted(p.name for p in partition.iterdir()) == ["export-2-new.parquet"]
+
+        storage.iter_query_rows.side_effect = ConnectionError("influx down")
+        with pytest.raises(ConnectionError):
+            export_archive(*day, storage=storage, archive=archive, site="S1")
+        assert sorted(p.name for p in partition.iterdir()) == ["export-2-new.parquet"]
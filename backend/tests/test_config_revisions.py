@@ -0,0 +1,98 @@
+"""Tests for configuration revisions and conditional list requests."""
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from configuration import models as config_models
+from configuration.services.revisions import batch_revision_bumps, get_revision
+from configuration.views import DeviceViewSet, PointViewSet
+from tests.fixtures.factories import *
+
+
+def _list(viewset, basename, params=None, **headers):
+    request = APIRequestFactory().get(f"/api/config/{basename}s/", params or {}, **headers)
+    return viewset.as_view({"get": "list"}, basename=basename)(request)
+
+
+@pytest.mark.django_db
+class TestConfigRevision:
+    """Test revision bumps on writes."""
+
+    def test_writes_bump_site_and_global(self, create_site, create_device, create_point):
+        site = create_site(code="REV_SITE")
+        other = create_site(code="REV_OTHER")
+        global_before = get_revision()[0]
+        other_before = get_revision(other.code)[0]
+
+        device = create_device(site=site)
+        create_point(device=device)
+
+        assert get_revision(site.code)[0] >= 3  # site, device and point saves
+        assert get_revision()[0] > global_before
+        assert get_revision(other.code)[0] == other_before
+
+    def test_move_bumps_previous_site(self, create_site, create_device, create_point):
+        """Test moving a device or point to another site bumps both sites."""
+        old, new = create_site(code="REV_OLD"), create_site(code="REV_NEW")
+        device = create_device(site=old)
+        point = create_point(device=device)
+        target = create_device(site=new, port=device.port + 1)
+
+        before = get_revision(old.code)[0], get_revision(new.code)[0]
+        point.device = target
+        point.save()
+        after_point = get_revision(old.code)[0], get_revision(new.code)[0]
+        assert after_point == (before[0] + 1, before[1] + 1)
+
+        device.site = new
+        device.save()
+        assert get_revision(old.code)[0] == after_point[0] + 1
+        assert get_revision(new.code)[0] == after_point[1] + 1
+
+    def test_batch_bumps_once(self, create_site):
+        site = create_site(code="REV_BATCH")
+        before = get_revision(site.code)[0]
+        with batch_revision_bumps():
+            for index in range(5):
+                config_models.Device.objects.create(
+                    site=site, name=f"D{index}", code=f"REV_D{index}", protocol="modbustcp", ip_address="10.0.0.1", port=index
+                )
+            assert get_revision(site.code)[0] == before
+        assert get_revision(site.code)[0] == before + 1
+
+
+@pytest.mark.django_db
+class TestConditionalList:
+    """Test ETag / 304 handling of config lists."""
+
+    def test_not_modified_until_write(self, create_site, create_device):
+        site = create_site(code="ETAG_SITE")
+        create_device(site=site)
+
+        first = _list(DeviceViewSet, "device", {"site_code": site.code})
+        etag = first["ETag"]
+        assert first.status_code == 200
+        assert "no-cache" in first["Cache-Control"]
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = _list(DeviceViewSet, "device", {"site_code": site.code}, HTTP_IF_NONE_MATCH=etag)
+        assert cached.status_code == 304
+        assert len(queries) == 1
+
+        create_device(site=site, port=9999)
+        refreshed = _list(DeviceViewSet, "device", {"site_code": site.code}, HTTP_IF_NONE_MATCH=etag)
+        assert refreshed.status_code == 200
+        assert refreshed["ETag"] != etag
+        assert len(refreshed.data) == 2
+
+    def test_site_filter_and_distinct(self, create_site, create_device, create_point):
+        site = create_site(code="ETAG_POINTS")
+        create_point(device=create_device(site=site))
+        create_point()
+
+        response = _list(PointViewSet, "point", {"site_code": site.code})
+        assert len(response.data) == 1
+
+        distinct = _list(DeviceViewSet, "device", {"distinct": "1", "site_code": site.code})
+        assert distinct.status_code == 200 and "ETag" in distinct
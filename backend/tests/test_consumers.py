@@ -0,0 +1,162 @@
+"""Unit tests for WebSocket point subscriptions."""
+import asyncio
+import json
+import math
+import struct
+
+import msgpack
+import pytest
+from channels.layers import get_channel_layer
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+
+from acquisition.consumers import AcquisitionConsumer, BinaryFrameEncoder, PointSubscription
+from acquisition.routing import websocket_urlpatterns
+
+
+class TestPointSubscription:
+    """Test subscription matching."""
+
+    def test_empty_subscription_matches_all(self):
+        """Test clients that never subscribe receive every point."""
+        assert PointSubscription().matches("ANY")
+
+    def test_codes_and_patterns(self):
+        """Test exact codes and glob patterns."""
+        subscription = PointSubscription()
+        subscription.subscribe(codes=["TEMP_01"], patterns=["PRESS_*"])
+
+        assert subscription.matches("TEMP_01")
+        assert subscription.matches("PRESS_07")
+        assert not subscription.matches("TEMP_02")
+        subscription.unsubscribe(patterns=["PRESS_*"])
+        assert not subscription.matches("PRESS_07")
+
+    def test_limit(self):
+        """Test subscriptions beyond the limit are rejected without changes."""
+        subscription = PointSubscription(max_entries=2)
+        subscription.subscribe(codes=["A"])
+
+        with pytest.raises(ValueError):
+            subscription.subscribe(codes=["B", "C"])
+        assert subscription.to_dict() == {"points": ["A"], "patterns": []}
+
+
+@pytest.fixture
+def consumer_env(settings, monkeypatch):
+    """In-memory channel layer, no rate cap and no database for the initial status."""
+    settings.CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+    settings.ACQUISITION_LIVE_CLIENT_MAX_FPS = 0
+
+    async def get_session_status(consumer):
+        return {"session_id": consumer.session_id}
+
+    monkeypatch.setattr(AcquisitionConsumer, "get_session_status", get_session_status)
+
+
+@pytest.mark.usefixtures("consumer_env")
+class TestAcquisitionConsumerFiltering:
+    """Test server-side filtering per connection."""
+
+    def test_live_frames_filtered(self):
+        """Test a subscribed client only receives its points."""
+        async def scenario():
+            communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), "/ws/acquisition/sessions/1/")
+            connected, _ = await communicator.connect()
+            assert connected
+            await communicator.receive_json_from()  # initial status
+
+            await communicator.send_json_to({"action": "subscribe", "points": ["A"]})
+            assert (await communicator.receive_json_from())["data"] == {"points": ["A"], "patterns": []}
+
+            await get_channel_layer().group_send("acquisition_session_1", {
+                "type": "live_frame",
+                "data": {"session_id": 1, "seq": 1, "points": [
+                    {"point_code": "A", "value": 1}, {"point_code": "B", "value": 2},
+                ]},
+            })
+            frame = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return frame
+
+        frame = asyncio.run(scenario())
+
+        assert frame["type"] == "live"
+        assert [p["point_code"] for p in frame["data"]["points"]] == ["A"]
+
+    def test_invalid_message(self):
+        """Test malformed control messages get an error reply."""
+        async def scenario():
+            communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), "/ws/acquisition/sessions/1/")
+            await communicator.connect()
+            await communicator.receive_json_from()
+            await communicator.send_to(text_data=json.dumps({"action": "dance"}))
+            reply = await communicator.receive_json_from()
+            await communicator.disconnect()
+            return reply
+
+        assert asyncio.run(scenario())["type"] == "error"
+
+
+class TestBinaryFrames:
+    """Test the MessagePack live protocol."""
+
+    def test_dictionary_sent_once(self):
+        """Test point indexes are announced once and data columns are packed."""
+        encoder = BinaryFrameEncoder()
+        points = [
+            {"point_code": "A", "value": 1.5, "timestamp": "2025-10-10T00:00:00+00:00", "quality": "good",
+             "min": 1.0, "max": 2.0, "count": 3},
+            {"point_code": "B", "value": 2, "timestamp": "2025-10-10T00:00:01+00:00", "quality": "bad", "count": 1},
+        ]
+
+        first = [msgpack.unpackb(frame) for frame in encoder.encode("live", points, seq=1)]
+        second = [msgpack.unpackb(frame) for frame in encoder.encode("live", points[:1], seq=2)]
+
+        assert first[0] == {"type": "dict", "points": {"A": 0, "B": 1}}
+        data = first[1]
+        assert struct.unpack("<2I", data["i"]) == (0, 1)
+        assert struct.unpack("<2d", data["v"]) == (1.5, 2.0)
+        assert struct.unpack("<2d", data["t"]) == (1760054400000.0, 1760054401000.0)
+        assert list(data["q"]) == [0, 1]
+        assert math.isnan(struct.unpack("<2d", data["min"])[1])
+        assert len(second) == 1 and second[0]["seq"] == 2
+
+    def test_non_numeric_values_as_list(self):
+        """Test mixed values fall back to a plain list."""
+        frames = BinaryFrameEncoder().encode("data_points", [
+            {"point_code": "S", "value": "on", "timestamp": None, "quality": "good"},
+        ])
+
+        assert msgpack.unpackb(frames[1])["v"] == ["on"]
+
+
+@pytest.mark.usefixtures("consumer_env")
+class TestBinaryNegotiation:
+    """Test msgpack negotiation on connect."""
+
+    def test_subprotocol_switches_to_binary(self):
+        """Test the msgpack subprotocol yields binary data frames."""
+        async def scenario():
+            communicator = WebsocketCommunicator(
+                URLRouter(websocket_urlpatterns), "/ws/acquisition/sessions/1/", subprotocols=["msgpack"],
+            )
+            connected, subprotocol = await communicator.connect()
+            hello = await communicator.receive_from()
+            await communicator.receive_json_from()  # status stays JSON
+            await get_channel_layer().group_send("acquisition_session_1", {
+                "type": "live_frame",
+                "data": {"session_id": 1, "seq": 1, "points": [
+                    {"point_code": "A", "value": 1.0, "timestamp": None, "quality": "good", "count": 1},
+                ]},
+            })
+            frames = [await communicator.receive_from(), await communicator.receive_from()]
+            await communicator.disconnect()
+            return subprotocol, hello, frames
+
+        subprotocol, hello, frames = asyncio.run(scenario())
+
+        assert subprotocol == "msgpack"
+        assert msgpack.unpackb(hello)["quality"] == ["good", "bad", "uncertain"]
+        assert msgpack.unpackb(frames[0]) == {"type": "dict", "points": {"A": 0}}
+        assert msgpack.unpackb(frames[1])["type"] == "live"
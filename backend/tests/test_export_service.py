@@ -0,0 +1,76 @@
+"""Unit tests for streaming exports."""
+import json
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from django.utils import timezone
+
+from acquisition import models as acq_models
+from acquisition.services import export_service
+from acquisition.services.history_service import HistoryQuery
+from tests.fixtures.factories import *
+
+
+class TestEncoders:
+    """Test incremental NDJSON/CSV encoding."""
+
+    def test_ndjson_one_object_per_line(self):
+        """Test rows are encoded as newline-delimited JSON."""
+        rows = [{"point_code": "A", "value": 1.5}, {"point_code": "B", "value": {"x": 1}}]
+
+        body = b"".join(export_service.encode_ndjson(iter(rows))).decode()
+
+        assert [json.loads(line) for line in body.splitlines()] == rows
+
+    def test_csv_header_and_chunking(self, monkeypatch):
+        """Test CSV output has a header and is yielded in bounded chunks."""
+        monkeypatch.setattr(export_service, "_CHUNK_BYTES", 100)
+        rows = ({"point_code": f"P{i}", "timestamp": "t", "value": i, "quality": "good"} for i in range(50))
+
+        chunks = list(export_service.encode_csv(rows, export_service.DATA_POINT_COLUMNS))
+
+        assert len(chunks) > 1
+        lines = b"".join(chunks).decode().splitlines()
+        assert lines[0] == "point_code,timestamp,value,quality"
+        assert lines[1] == "P0,t,0,good"
+        assert len(lines) == 51
+
+    def test_unknown_format(self):
+        """Test unsupported formats are rejected."""
+        with pytest.raises(ValueError):
+            export_service.encode_rows([], "xml", export_service.DATA_POINT_COLUMNS)
+
+
+class TestRowSources:
+    """Test row iteration from the database and InfluxDB."""
+
+    @pytest.mark.django_db
+    def test_session_rows_in_time_order(self, create_session):
+        """Test session rows are streamed oldest first and filtered."""
+        session = create_session()
+        now = timezone.now()
+        acq_models.DataPoint.objects.bulk_create([
+            acq_models.DataPoint(session=session, point_code=code, timestamp=now - timedelta(seconds=i), value=i)
+            for i in range(5)
+            for code in ("A", "B")
+        ])
+
+        rows = list(export_service.iter_session_rows(
+            session.id, point_codes=["A"], start=now - timedelta(seconds=3), chunk_size=2,
+        ))
+
+        assert [row["value"] for row in rows] == [3, 2, 1, 0]
+        assert {row["point_code"] for row in rows} == {"A"}
+
+    def test_history_rows_unlimited(self):
+        """Test history export queries raw rows without limit."""
+        storage = MagicMock()
+        storage.iter_query_rows.return_value = iter([
+            {"point": "A", "_field": "A", "_time": "t1", "_value": 1.0, "quality": None},
+        ])
+
+        rows = list(export_service.iter_history_rows(HistoryQuery(point_codes=["A"], bucket="b"), storage))
+
+        assert rows == [{"point_code": "A", "field": "A", "timestamp": "t1", "value": 1.0, "quality": "good"}]
+        assert "limit(" not in storage.iter_query_rows.call_args[0][0]
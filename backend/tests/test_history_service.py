@@ -0,0 +1,438 @@
+"""Unit tests for point history queries."""
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+from django.core.cache import cache
+
+from acquisition.services.history_service import HistoryCache, HistoryQuery, align_series, lttb, query_point_history
+
+
+class TestHistoryQuery:
+    """Test Flux query construction."""
+
+    def test_multi_point_query(self):
+        """Test points and fields are combined in one query."""
+        query = HistoryQuery(
+            point_codes=["TEMP_01", "PRESS_01"],
+            fields=["TEMP_01"],
+            start="-6h",
+            limit=500,
+            bucket="iot-data",
+        )
+        flux = query.to_flux()
+
+        assert 'from(bucket: "iot-data")' in flux
+        assert "range(start: -6h, stop: now())" in flux
+        assert 'contains(value: r["point"], set: ["TEMP_01", "PRESS_01"])' in flux
+        assert 'r["_field"] == "TEMP_01"' in flux
+        assert "limit(n: 500)" in flux
+
+    def test_default_bucket_from_settings(self, settings):
+        """Test bucket falls back to INFLUXDB_BUCKET."""
+        settings.INFLUXDB_BUCKET = "acq-bucket"
+        query = HistoryQuery(point_codes=["P1"])
+        assert query.bucket == "acq-bucket"
+
+    def test_point_code_escaped(self):
+        """Test point codes cannot break out of the string literal."""
+        query = HistoryQuery(point_codes=['P1") |> drop() //'], bucket="b")
+        assert 'r["point"] == "P1\\") |> drop() //"' in query.to_flux()
+
+    @pytest.mark.parametrize("value", ["-1h", "-1d12h", "now()", "2025-10-10T00:00:00Z", "2025-10-10T00:00:00.5+08:00"])
+    def test_valid_times(self, value):
+        """Test accepted time expressions."""
+        assert HistoryQuery(point_codes=["P1"], start=value, bucket="b").start == value
+
+    @pytest.mark.parametrize("value", ["yesterday", "-1h) |> drop()", ""])
+    def test_invalid_times(self, value):
+        """Test rejected time expressions."""
+        with pytest.raises(ValueError):
+            HistoryQuery(point_codes=["P1"], start=value, bucket="b")
+
+
+class TestQueryPointHistory:
+    """Test grouping of streamed rows into series."""
+
+    def test_groups_rows_by_point_and_field(self):
+        """Test rows are grouped per series in requested point order."""
+        storage = MagicMock()
+        storage.iter_query_rows.return_value = iter([
+            {"point": "B", "_field": "B", "_time": "t1", "_value": 2.0, "quality": "good"},
+            {"point": "A", "_field": "A", "_time": "t1", "_value": 1.0, "quality": None},
+            {"point": "A", "_field": "A", "_time": "t2", "_value": 1.5, "quality": "bad"},
+        ])
+
+        series = query_point_history(HistoryQuery(point_codes=["A", "B"], bucket="b"), storage=storage)
+
+        assert [s["point_code"] for s in series] == ["A", "B"]
+        assert series[0]["data"] == [
+            {"timestamp": "t1", "value": 1.0, "quality": "good"},
+            {"timestamp": "t2", "value": 1.5, "quality": "bad"},
+        ]
+
+
+class TestAlignSeries:
+    """Test columnar alignment of multi-point results."""
+
+    def test_shared_time_axis(self):
+        """Test values are placed on the union of timestamps, None where missing."""
+        series = [
+            {"point_code": "A", "field": "A", "data": [
+                {"timestamp": "2025-10-10T00:00:00Z", "value": 1.0, "quality": "good"},
+                {"timestamp": "2025-10-10T00:00:01.5Z", "value": 2.0, "quality": "good"},
+            ]},
+            {"point_code": "B", "field": "B", "data": [
+                {"timestamp": "2025-10-10T00:00:01Z", "value": 10, "quality": "good"},
+                {"timestamp": "2025-10-10T00:00:01.5Z", "value": 20, "quality": "good"},
+            ]},
+        ]
+
+        aligned = align_series(series)
+
+        assert aligned["timestamps"] == [
+            "2025-10-10T00:00:00Z", "2025-10-10T00:00:01Z", "2025-10-10T00:00:01.5Z",
+        ]
+        assert aligned["series"] == [
+            {"point_code": "A", "field": "A", "values": [1.0, None, 2.0]},
+            {"point_code": "B", "field": "B", "values": [None, 10, 20]},
+        ]
+
+
+class TestDownsampling:
+    """Test resolution-aware downsampling."""
+
+    def test_max_points_defaults_to_minmax(self):
+        """Test min/max windows are sized so two rows per window fit max_points."""
+        query = HistoryQuery(
+            point_codes=["A"],
+            start="2024-01-01T00:00:00Z",
+            stop="2024-01-01T01:00:00Z",
+            max_points=720,
+            bucket="b",
+        )
+        flux = query.to_flux()
+
+        assert query.downsample == "minmax"
+        assert query.window_ms() == 10000
+        assert "window(every: 10000ms) |> min()" in flux
+        assert "window(every: 10000ms) |> max()" in flux
+        assert "limit(n: 720)" in flux
+
+    def test_quality_left_out_of_group_key(self):
+        """Test rows of one series are merged across qualities before sorting and limiting."""
+        flux = HistoryQuery(point_codes=["A"], start="-1h", limit=10, bucket="b").to_flux()
+
+        group = flux.index('group(columns: ["point", "_field"])')
+        assert group < flux.index('sort(columns: ["_time"])') < flux.index("limit(n: 10)")
+
+    def test_mean_uses_aggregate_window(self):
+        """Test mean mode aggregates in InfluxDB."""
+        query = HistoryQuery(point_codes=["A"], start="-1h", max_points=3600, downsample="mean", bucket="b")
+
+        assert "aggregateWindow(every: 1000ms, fn: mean, createEmpty: false)" in query.to_flux()
+
+    @pytest.mark.parametrize("kwargs", [
+        {"downsample": "median", "max_points": 100},
+        {"downsample": "mean"},
+    ])
+    def test_invalid_downsample(self, kwargs):
+        """Test unknown modes and modes without max_points are rejected."""
+        with pytest.raises(ValueError):
+            HistoryQuery(point_codes=["A"], bucket="b", **kwargs)
+
+    def test_lttb_keeps_endpoints_and_peak(self):
+        """Test LTTB bounds the row count and keeps the spike."""
+        rows = [
+            {"timestamp": f"2024-01-01T00:{i // 60:02d}:{i % 60:02d}.123456789Z", "value": 0.0, "quality": "good"}
+            for i in range(1000)
+        ]
+        rows[500]["value"] = 100.0
+
+        sampled = lttb(rows, 50)
+
+        assert len(sampled) == 50
+        assert sampled[0] is rows[0]
+        assert sampled[-1] is rows[-1]
+        assert rows[500] in sampled
+
+    def test_lttb_prebuckets_whole_range(self, settings):
+        """Test LTTB mode fetches min/max buckets over the whole range instead of the first ``limit`` rows."""
+        settings.ACQUISITION_HISTORY_LTTB_OVERSAMPLE = 4
+        query = HistoryQuery(
+            point_codes=["A"],
+            start="2024-01-01T00:00:00Z",
+            stop="2024-01-08T00:00:00Z",
+            max_points=1000,
+            downsample="lttb",
+            bucket="b",
+        )
+        flux = query.to_flux()
+
+        # 1000 points x 4 oversample = 2000 min/max windows over 7 days
+        assert query.window_ms() == 302400
+        assert "window(every: 302400ms) |> min()" in flux
+        assert "limit(" not in flux
+
+    def test_lttb_applied_per_series(self):
+        """Test LTTB mode reduces raw rows returned by the query."""
+        storage = MagicMock()
+        storage.iter_query_rows.return_value = iter([
+            {"point": "A", "_field": "A", "_time": f"2024-01-01T00:00:{i:02d}Z", "_value": float(i % 7)}
+            for i in range(60)
+        ])
+        query = HistoryQuery(point_codes=["A"], max_points=10, downsample="lttb", bucket="b")
+
+        series = query_point_history(query, storage=storage)
+
+        assert len(series[0]["data"]) == 10
+
+
+class TestHistoryCache:
+    """Test cached history queries with tail stitching."""
+
+    NOW = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+    @staticmethod
+    def _rows(start, seconds):
+        return [
+            {"point": "A", "_field": "A", "_time": (start + timedelta(seconds=i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+             "_value": float(i)}
+            for i in range(seconds)
+        ]
+
+    def test_repeat_query_fetches_only_tail(self):
+        """Test a refresh reuses closed rows and queries only the open tail."""
+        storage = MagicMock()
+        storage.iter_query_rows.side_effect = [
+            iter(self._rows(self.NOW - timedelta(minutes=1), 60)),
+            iter(self._rows(self.NOW - timedelta(seconds=5), 15)),
+        ]
+        cache = HistoryCache(lateness=5.0)
+        query = HistoryQuery(point_codes=["A"], start="-1m", limit=1000, bucket="b")
+
+        cache.fetch(query, storage, now=self.NOW)
+        series = cache.fetch(query, storage, now=self.NOW + timedelta(seconds=10))
+
+        tail_flux = storage.iter_query_rows.call_args_list[1][0][0]
+        assert "range(start: 2024-01-01T11:59:55.000000Z, stop: 2024-01-01T12:00:10.000000Z)" in tail_flux
+        data = series[("A", "A")]["data"]
+        # Rows before the slid start are trimmed, the refetched lateness window is not duplicated
+        assert data[0]["timestamp"] == "2024-01-01T11:59:10Z"
+        assert len(data) == 60
+        assert cache.stats()["hits"] == 1
+
+    def test_closed_range_served_from_cache(self):
+        """Test a fixed range is queried once."""
+        storage = MagicMock()
+        storage.iter_query_rows.return_value = iter(self._rows(self.NOW, 10))
+        cache = HistoryCache()
+        query = HistoryQuery(
+            point_codes=["A"], start="2024-01-01T12:00:00Z", stop="2024-01-01T12:00:10Z", bucket="b"
+        )
+
+        first = query_point_history(query, storage=storage, cache=cache)
+        second = query_point_history(query, storage=storage, cache=cache)
+
+        assert storage.iter_query_rows.call_count == 1
+        assert first == second
+
+    def test_truncated_raw_query_not_stitched(self):
+        """Test series that hit the limit are refetched in full."""
+        storage = MagicMock()
+        storage.iter_query_rows.side_effect = lambda flux: iter(self._rows(self.NOW - timedelta(minutes=1), 10))
+        cache = HistoryCache()
+        query = HistoryQuery(point_codes=["A"], start="-1m", limit=10, bucket="b")
+
+        cache.fetch(query, storage, now=self.NOW)
+        cache.fetch(query, storage, now=self.NOW + timedelta(seconds=1))
+
+        assert cache.stats() == {"entries": 0, "rows": 0, "hits": 0, "misses": 2}
+
+    def test_lru_bounded_by_rows(self):
+        """Test least recently used entries are evicted past max_rows."""
+        storage = MagicMock()
+        storage.iter_query_rows.side_effect = lambda flux: iter(self._rows(self.NOW - timedelta(minutes=1), 10))
+        cache = HistoryCache(max_rows=25)
+
+        for code in ("A", "B", "C"):
+            cache.fetch(HistoryQuery(point_codes=[code], start="-1m", bucket="b"), storage, now=self.NOW)
+
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["rows"] == 20
+
+
+class TestRollupTiers:
+    """Test rollup tier selection and rollup queries."""
+
+    @pytest.fixture(autouse=True)
+    def tiers(self, settings):
+        settings.INFLUXDB_ROLLUP_ENABLED = True
+        settings.INFLUXDB_ROLLUP_LATENESS = "1m"
+        settings.INFLUXDB_ROLLUP_TIERS = [
+            {"name": "1h", "every": "1h", "bucket": "raw_1h"},
+            {"name": "1m", "every": "1m", "bucket": "raw_1m", "lookback": "10m"},
+        ]
+        cache.clear()
+        yield
+        cache.clear()
+
+    @staticmethod
+    def _cover(name, start, stop):
+        from acquisition.services.rollup_service import get_tier, record_coverage
+
+        record_coverage(get_tier(name), start, stop)
+
+    @pytest.fixture
+    def covered(self):
+        """Both tiers cover the last years up to beyond now (no raw tail)."""
+        now = datetime.now(timezone.utc)
+        for name in ("1m", "1h"):
+            self._cover(name, now - timedelta(days=2000), now + timedelta(days=1))
+
+    def test_routes_to_coarsest_fitting_tier(self, covered):
+        """Test long ranges read hourly rollups and short ranges stay raw."""
+        year = HistoryQuery(point_codes=["A"], start="-365d", max_points=1000)
+        month = HistoryQuery(point_codes=["A"], start="-30d", max_points=4000)
+        hour = HistoryQuery(point_codes=["A"], start="-1h", max_points=1000)
+
+        assert (year.tier, year.bucket) == ("1h", "raw_1h")
+        assert (month.tier, month.bucket) == ("1m", "raw_1m")
+        assert hour.tier is None
+
+    def test_rollup_flux_selects_stats(self, covered):
+        """Test min/max queries read the min and max rollup rows."""
+        flux = HistoryQuery(point_codes=["A"], start="-365d", max_points=1000).to_flux()
+
+        assert 'from(bucket: "raw_1h")' in flux
+        assert 'data |> filter(fn: (r) => not exists r.stat or r.stat == "min") |> window' in flux
+        assert 'data |> filter(fn: (r) => not exists r.stat or r.stat == "max") |> window' in flux
+        assert "union(tables: [\n" not in flux
+
+    def test_uncovered_tiers_are_not_routed(self):
+        """Test queries stay raw until a tier's coverage reaches their start."""
+        now = datetime.now(timezone.utc)
+        assert HistoryQuery(point_codes=["A"], start="-365d", max_points=1000).tier is None
+
+        self._cover("1h", now - timedelta(days=30), now)
+        assert HistoryQuery(point_codes=["A"], start="-365d", max_points=1000).tier is None
+        assert HistoryQuery(point_codes=["A"], start="-20d", max_points=100).tier == "1h"
+
+    def test_open_tail_stitched_from_raw(self, settings):
+        """Test rows after the tier's last closed window are read from the raw bucket."""
+        settings.INFLUXDB_BUCKET = "raw"
+        self._cover("1h", datetime(2023, 1, 1, tzinfo=timezone.utc), datetime(2024, 1, 1, 11, tzinfo=timezone.utc))
+        query = HistoryQuery(
+            point_codes=["A"], start="2023-06-01T00:00:00Z", stop="2024-01-01T12:00:00Z", max_points=100,
+        )
+        flux = query.to_flux()
+
+        assert (query.tier, query.tier_until) == ("1h", "2024-01-01T11:00:00.000000Z")
+        assert flux.startswith('import "types"')
+        assert 'from(bucket: "raw_1h")' in flux
+        assert "range(start: 2023-06-01T00:00:00Z, stop: 2024-01-01T11:00:00.000001Z)" in flux
+        assert 'from(bucket: "raw")' in flux
+        assert "range(start: 2024-01-01T11:00:00.000000Z, stop: 2024-01-01T12:00:00Z)" in flux
+
+    def test_cached_tail_after_coverage_reads_raw(self, settings):
+        """Test the tail refetch of a tier-routed cache entry reads the raw bucket."""
+        settings.INFLUXDB_BUCKET = "raw"
+        now = datetime.now(timezone.utc)
+        self._cover("1h", now - timedelta(days=60), now - timedelta(days=2))
+        storage = MagicMock()
+        storage.iter_query_rows.side_effect = lambda flux: iter([])
+        history_cache = HistoryCache()
+        query = HistoryQuery(point_codes=["A"], start="-30d", max_points=100)
+        assert query.tier == "1h"
+
+        history_cache.fetch(query, storage, now=now)
+        history_cache.fetch(query, storage, now=now + timedelta(minutes=1))
+
+        full_flux, tail_flux = (call.args[0] for call in storage.iter_query_rows.call_args_list)
+        assert 'from(bucket: "raw_1h")' in full_flux and 'from(bucket: "raw")' in full_flux
+        assert history_cache.stats()["hits"] == 1
+        assert 'from(bucket: "raw")' in tail_flux
+        assert "raw_1h" not in tail_flux and "r.stat" not in tail_flux
+
+    def test_backfill_walks_backwards_to_horizon(self):
+        """Test each backfill call aggregates the next older chunk until the backfill range is covered."""
+        from acquisition.services import rollup_service
+
+        tier = rollup_service.RollupTier(
+            name="1h", every="1h", bucket="raw_1h", lookback="3h", backfill="3d", backfill_chunk="2d",
+        )
+        now = datetime(2024, 1, 10, 0, 30, tzinfo=timezone.utc)
+        storage = MagicMock(bucket="raw", org="org")
+        storage.iter_query_rows.return_value = iter([])
+        assert rollup_service.backfill_rollup(tier, storage, now=now) is None
+
+        rollup_service.record_coverage(tier, datetime(2024, 1, 9, 21, tzinfo=timezone.utc), datetime(2024, 1, 10, tzinfo=timezone.utc))
+        first = rollup_service.backfill_rollup(tier, storage, now=now)
+        second = rollup_service.backfill_rollup(tier, storage, now=now)
+
+        assert (first["start"], first["stop"]) == ("2024-01-07T21:00:00.000000Z", "2024-01-09T21:00:00.000000Z")
+        assert (second["start"], second["stop"]) == ("2024-01-07T00:00:00.000000Z", "2024-01-07T21:00:00.000000Z")
+        assert rollup_service.backfill_rollup(tier, storage, now=now) is None
+        assert rollup_service.get_coverage(tier) == (
+            datetime(2024, 1, 7, tzinfo=timezone.utc), datetime(2024, 1, 10, tzinfo=timezone.utc),
+        )
+
+    def test_explicit_bucket_and_raw_tier_disable_routing(self):
+        """Test routing only applies to queries without bucket or tier override."""
+        assert HistoryQuery(point_codes=["A"], start="-365d", max_points=1000, bucket="b").tier is None
+        assert HistoryQuery(point_codes=["A"], start="-365d", max_points=1000, tier="raw").tier is None
+        with pytest.raises(ValueError):
+            HistoryQuery(point_codes=["A"], max_points=10, tier="1d")
+
+    def test_incremental_window_and_flux(self):
+        """Test runs cover the lookback up to the last closed window."""
+        from acquisition.services.rollup_service import build_rollup_flux, get_tier, rollup_window
+
+        tier = get_tier("1m")
+        start, stop = rollup_window(tier, now=datetime(2024, 1, 1, 12, 0, 30, tzinfo=timezone.utc))
+        flux = build_rollup_flux("raw", tier, start, stop, "org")
+
+        assert stop == datetime(2024, 1, 1, 11, 59, tzinfo=timezone.utc)
+        assert start == datetime(2024, 1, 1, 11, 49, tzinfo=timezone.utc)
+        assert "range(start: 2024-01-01T11:49:00.000000Z, stop: 2024-01-01T11:59:00.000000Z)" in flux
+        for stat in ("min", "max", "mean", "count"):
+            assert f'fn: {stat}, createEmpty: false) |> toFloat() |> set(key: "stat", value: "{stat}")' in flux
+        assert 'to(bucket: "raw_1m", org: "org")' in flux
+
+
+class TestLocalFallback:
+    """Test history queries fall back to the local store."""
+
+    def test_influxdb_failure_reads_local_store(self, settings, tmp_path, monkeypatch):
+        """Test a failing InfluxDB query is answered from the local store, downsampled."""
+        from acquisition.services import history_service
+        from storage.local import LocalStorage
+
+        store = LocalStorage({"path": str(tmp_path / "tsdb.sqlite3")})
+        store.connect()
+        now = datetime.now(timezone.utc).timestamp()
+        store.write([
+            {"measurement": "m", "tags": {"point": "A"}, "fields": {"A": float(i)}, "time": int((now - 600 + i) * 1e9)}
+            for i in range(500)
+        ])
+        settings.ACQUISITION_LOCAL_STORE_ENABLED = True
+        monkeypatch.setattr(history_service, "_local_store", store)
+        storage = MagicMock()
+        storage.iter_query_rows.side_effect = ConnectionError("influxdb down")
+
+        query = HistoryQuery(point_codes=["A"], start="-1h", bucket="b", max_points=50)
+        series = query_point_history(query, storage=storage)
+
+        assert query.source == "local"
+        assert len(series[0]["data"]) == 50
+        assert series[0]["data"][0]["value"] == 0.0
+
+    def test_failure_raised_without_local_store(self, settings):
+        """Test errors propagate when the local store is disabled."""
+        settings.ACQUISITION_LOCAL_STORE_ENABLED = False
+        storage = MagicMock()
+        storage.iter_query_rows.side_effect = ConnectionError("influxdb down")
+
+        with pytest.raises(ConnectionError):
+            query_point_history(HistoryQuery(point_codes=["A"], bucket="b"), storage=storage)
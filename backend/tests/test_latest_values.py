@@ -0,0 +1,67 @@
+"""Unit tests for the latest-value table."""
+import json
+from unittest.mock import MagicMock
+
+from acquisition.services.latest_values import (
+    MemoryLatestValueStore,
+    RedisLatestValueStore,
+    build_latest_records,
+)
+
+
+class TestBuildLatestRecords:
+    """Test conversion of storage data points into latest-value records."""
+
+    def test_last_reading_wins(self):
+        """Test the newest reading of each point is kept."""
+        data = [
+            {"measurement": "D1", "tags": {"quality": "good"}, "fields": {"P1": 1.0}, "time": 1_700_000_000_000_000_000},
+            {"measurement": "D1", "tags": {"quality": "bad"}, "fields": {"P1": 2.0}, "time": 1_700_000_001_000_000_000},
+            {"measurement": "D1", "tags": {}, "fields": {"P2": 5}, "time": 1_700_000_001_000_000_000},
+        ]
+
+        records = build_latest_records(data, session_id=7)
+
+        assert records["P1"] == {
+            "value": 2.0,
+            "quality": "bad",
+            "timestamp": "2023-11-14T22:13:21+00:00",
+            "session_id": 7,
+        }
+        assert records["P2"]["quality"] == "good"
+
+
+class TestLatestValueStores:
+    """Test memory and Redis stores."""
+
+    def test_memory_store(self):
+        """Test unknown points are returned as None."""
+        store = MemoryLatestValueStore()
+        store.update({"P1": {"value": 1}})
+
+        assert store.get_many(["P1", "P9"]) == {"P1": {"value": 1}, "P9": None}
+
+    def test_redis_store_uses_single_hash(self):
+        """Test a batch is one HSET and a bulk read is one HMGET."""
+        client = MagicMock()
+        client.hmget.return_value = [json.dumps({"value": 1}).encode(), None]
+        store = RedisLatestValueStore(client, key="latest")
+
+        store.update({"P1": {"value": 1}, "P2": {"value": 2}})
+        values = store.get_many(["P1", "P2"])
+
+        client.hset.assert_called_once()
+        assert set(client.hset.call_args.kwargs["mapping"]) == {"P1", "P2"}
+        client.hmget.assert_called_once_with("latest", ["P1", "P2"])
+        assert values == {"P1": {"value": 1}, "P2": None}
+
+    def test_redis_errors_suspend_updates(self):
+        """Test updates are skipped for a while after a Redis failure."""
+        client = MagicMock()
+        client.hset.side_effect = ConnectionError("refused")
+        store = RedisLatestValueStore(client, retry_interval=60.0)
+
+        store.update({"P1": {"value": 1}})
+        store.update({"P1": {"value": 2}})
+
+        assert client.hset.call_count == 1
@@ -0,0 +1,80 @@
+"""Unit tests for coalesced live broadcasts."""
+import time
+
+from acquisition.services import live_broadcast
+from acquisition.services.live_broadcast import LiveBroadcaster, get_live_broadcaster, merge_frames
+
+
+def _sample(code, value, ts_s):
+    return {"tags": {"point": code, "quality": "good"}, "fields": {code: value}, "time": int(ts_s * 1e9)}
+
+
+class TestLiveBroadcaster:
+    """Test per-interval coalescing of samples."""
+
+    def test_frame_carries_latest_and_range(self):
+        """Test one frame holds the newest value and min/max per point."""
+        sent = []
+        broadcaster = LiveBroadcaster(1, interval=10, include_range=True, send=lambda g, m: sent.append((g, m)))
+        broadcaster.add([_sample("A", 3.0, 1), _sample("A", 1.0, 2), _sample("A", 2.0, 3), _sample("B", "on", 3)])
+
+        frame = broadcaster.flush()
+
+        points = {p["point_code"]: p for p in frame["points"]}
+        assert (points["A"]["value"], points["A"]["min"], points["A"]["max"], points["A"]["count"]) == (2.0, 1.0, 3.0, 3)
+        assert "min" not in points["B"]
+        assert sent[0][0] == "acquisition_session_1"
+        assert sent[0][1]["type"] == "live_frame"
+        assert broadcaster.flush() is None
+        broadcaster.close()
+
+    def test_one_frame_per_interval(self):
+        """Test a burst of samples produces frames at the interval, not per sample."""
+        sent = []
+        broadcaster = LiveBroadcaster(1, interval=0.1, send=lambda g, m: sent.append(m))
+        deadline = time.monotonic() + 0.35
+        value = 0
+        while time.monotonic() < deadline:
+            broadcaster.add([_sample("A", value, 1)])
+            value += 1
+            time.sleep(0.005)
+        broadcaster.close()
+
+        assert 2 <= len(sent) <= 6
+        assert sum(p["count"] for m in sent for p in m["data"]["points"]) == value
+        assert sent[-1]["data"]["points"][0]["value"] == value - 1
+
+    def test_idle_process_wide_broadcaster_is_released(self):
+        """Test the shared broadcaster of a session is dropped once its sender goes idle."""
+        sent = []
+        broadcaster = get_live_broadcaster(9901)
+        broadcaster.idle_timeout, broadcaster.interval, broadcaster._send = 0.05, 0.01, lambda g, m: sent.append(m)
+
+        broadcaster.add_sample("A", 1.0, None)
+        deadline = time.monotonic() + 2
+        while 9901 in live_broadcast._broadcasters and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert 9901 not in live_broadcast._broadcasters
+        assert len(sent) == 1
+        assert get_live_broadcaster(9901) is not broadcaster
+        live_broadcast.release_live_broadcaster(9901)
+
+
+class TestMergeFrames:
+    """Test merging frames for rate-capped clients."""
+
+    def test_merge_keeps_latest_and_widens_range(self):
+        """Test merged frames keep newest values and combined min/max/count."""
+        old = {"seq": 1, "points": [
+            {"point_code": "A", "value": 5, "min": 1, "max": 5, "count": 2},
+            {"point_code": "B", "value": 7, "count": 1},
+        ]}
+        new = {"seq": 2, "points": [{"point_code": "A", "value": 3, "min": 3, "max": 9, "count": 4}]}
+
+        merged = merge_frames(old, new)
+
+        points = {p["point_code"]: p for p in merged["points"]}
+        assert merged["seq"] == 2
+        assert points["A"] == {"point_code": "A", "value": 3, "min": 1, "max": 9, "count": 6}
+        assert points["B"]["value"] == 7
@@ -0,0 +1,62 @@
+"""Unit tests for live pipeline taps."""
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from acquisition.services.live_broadcast import LiveBroadcaster
+from acquisition.services.pipeline_tap import RedisStreamTap, build_taps
+
+
+def _sample(code, value, ts_s):
+    return {"tags": {"point": code, "quality": "good"}, "fields": {code: value}, "time": int(ts_s * 1e9)}
+
+
+class TestRedisStreamTap:
+    """Test batches appended to a Redis stream."""
+
+    def test_one_xadd_per_batch(self):
+        """Test a batch becomes one trimmed stream entry with compact points."""
+        client = MagicMock()
+        tap = RedisStreamTap(client, 7, key="live:{session_id}", maxlen=100)
+
+        tap.add([_sample("A", 1.5, 1), _sample("B", "on", 2)])
+
+        client.xadd.assert_called_once()
+        key, fields = client.xadd.call_args.args
+        assert key == "live:7"
+        assert client.xadd.call_args.kwargs == {"maxlen": 100, "approximate": True}
+        assert fields["count"] == 2
+        points = json.loads(fields["points"])
+        assert [p["point_code"] for p in points] == ["A", "B"]
+        assert points[0]["time"] == int(1e9)
+
+    def test_suspended_after_error(self):
+        """Test Redis errors do not propagate and pause publishing."""
+        client = MagicMock()
+        client.xadd.side_effect = ConnectionError("down")
+        tap = RedisStreamTap(client, 1, retry_interval=60)
+
+        tap.add([_sample("A", 1, 1)])
+        tap.add([_sample("A", 2, 2)])
+
+        assert client.xadd.call_count == 1
+
+    def test_empty_batch_skipped(self):
+        """Test nothing is written for a batch without fields."""
+        client = MagicMock()
+        RedisStreamTap(client, 1).add([])
+        client.xadd.assert_not_called()
+
+
+class TestBuildTaps:
+    """Test tap selection."""
+
+    def test_channels_tap(self):
+        taps = build_taps(1, ["channels"])
+        assert len(taps) == 1 and isinstance(taps[0], LiveBroadcaster)
+        taps[0].close()
+
+    def test_unknown_tap(self):
+        with pytest.raises(ValueError):
+            build_taps(1, ["nope"])
@@ -0,0 +1,88 @@
+"""Unit tests for DataPoint retention."""
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from acquisition import models as acq_models
+from acquisition.services.retention import (
+    delete_in_batches,
+    purge_expired_data_points,
+    purge_session_data,
+    resolve_retention_days,
+)
+from tests.fixtures.factories import *
+
+
+def _add_points(session, count, age_days):
+    timestamp = timezone.now() - timedelta(days=age_days)
+    acq_models.DataPoint.objects.bulk_create([
+        acq_models.DataPoint(session=session, point_code="P1", timestamp=timestamp, value=i)
+        for i in range(count)
+    ])
+
+
+@pytest.mark.django_db
+class TestRetentionPolicy:
+    """Test retention resolution and purge."""
+
+    def test_precedence(self, settings, create_site, create_device, create_point, create_task):
+        """Test task overrides site, site overrides the global default."""
+        settings.ACQUISITION_DATAPOINT_RETENTION_DAYS = 30
+        site = create_site()
+        task = create_task(points=[create_point(device=create_device(site=site))])
+
+        assert resolve_retention_days(task) == 30
+        site.data_retention_days = 7
+        site.save()
+        assert resolve_retention_days(task) == 7
+        task.data_retention_days = 0
+        assert resolve_retention_days(task) == 0
+
+    def test_purge_expired_per_task(self, settings, create_task, create_session):
+        """Test only rows older than the task's retention are deleted."""
+        settings.ACQUISITION_DATAPOINT_RETENTION_DAYS = 10
+        session = create_session()
+        _add_points(session, 5, age_days=20)
+        _add_points(session, 3, age_days=1)
+        keep_forever = create_session()
+        keep_forever.task.data_retention_days = 0
+        keep_forever.task.save()
+        _add_points(keep_forever, 4, age_days=400)
+
+        result = purge_expired_data_points(batch_size=2)
+
+        assert result["deleted"] == 5
+        assert result["complete"] is True
+        assert acq_models.DataPoint.objects.filter(session=session).count() == 3
+        assert acq_models.DataPoint.objects.filter(session=keep_forever).count() == 4
+
+    def test_default_keeps_everything(self, create_session):
+        """Test nothing is purged unless a site, task or the setting opts in."""
+        session = create_session()
+        _add_points(session, 3, age_days=400)
+
+        result = purge_expired_data_points()
+
+        assert result["deleted"] == 0
+        assert acq_models.DataPoint.objects.filter(session=session).count() == 3
+
+    def test_batch_budget(self, create_session):
+        """Test a run stops after max_batches and reports incomplete."""
+        session = create_session()
+        _add_points(session, 10, age_days=0)
+
+        result = delete_in_batches(acq_models.DataPoint.objects.filter(session=session), batch_size=3, max_batches=2)
+
+        assert result == {"deleted": 6, "batches": 2, "complete": False}
+
+    def test_purge_session_data(self, create_session):
+        """Test session rows are removed in batches before the session."""
+        session = create_session()
+        _add_points(session, 7, age_days=0)
+
+        result = purge_session_data(session.id, batch_size=3, delete_session=True)
+
+        assert result["deleted"] == 7
+        assert result["batches"] == 3
+        assert not acq_models.AcquisitionSession.objects.filter(pk=session.id).exists()
@@ -0,0 +1,87 @@
+"""API tests for session data point pagination."""
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from acquisition import models as acq_models
+from acquisition.views import AcquisitionSessionViewSet
+from tests.fixtures.factories import *
+
+
+@pytest.mark.django_db
+class TestDataPointPagination:
+    """Test keyset pagination of session data points."""
+
+    @staticmethod
+    def _get(session, params):
+        request = APIRequestFactory().get(f"/api/acquisition/sessions/{session.id}/data-points/", params)
+        view = AcquisitionSessionViewSet.as_view({"get": "data_points"})
+        return view(request, pk=session.id)
+
+    def test_cursor_walks_all_rows_once(self, create_session):
+        """Test following next_cursor returns every row once, newest first, including timestamp ties."""
+        session = create_session()
+        base = timezone.now()
+        acq_models.DataPoint.objects.bulk_create([
+            acq_models.DataPoint(session=session, point_code=f"P{i}", timestamp=base - timedelta(seconds=i // 3), value=i)
+            for i in range(25)
+        ])
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            params = {"limit": 10, **({"cursor": cursor} if cursor else {})}
+            body = self._get(session, params).data
+            assert body["count"] is None
+            seen.extend(row["id"] for row in body["results"])
+            pages += 1
+            cursor = body["next_cursor"]
+            if not cursor:
+                break
+
+        expected = list(
+            acq_models.DataPoint.objects.filter(session=session).order_by("-timestamp", "-id").values_list("id", flat=True)
+        )
+        assert seen == expected
+        assert pages == 3
+
+    def test_count_on_request_and_bad_cursor(self, create_session):
+        """Test the exact count is opt-in and malformed cursors are rejected."""
+        session = create_session()
+        acq_models.DataPoint.objects.create(session=session, point_code="P1", timestamp=timezone.now(), value=1)
+
+        body = self._get(session, {"with_count": "true"}).data
+        assert body["count"] == 1
+        assert body["next_cursor"] is None
+
+        assert self._get(session, {"cursor": "not-a-cursor"}).status_code == 400
+
+
+@pytest.mark.django_db
+class TestStartTask:
+    """Test session handoff in start-task."""
+
+    def test_session_created_before_dispatch(self, create_task):
+        """Test the session exists with validation results before the Celery task is queued."""
+        from unittest.mock import patch
+        from tests.mocks.protocols import register_mock_protocols
+
+        register_mock_protocols()
+        task = create_task()
+        dispatched = {}
+
+        def apply_async(args, kwargs, task_id):
+            session = acq_models.AcquisitionSession.objects.get(pk=kwargs["session_id"])
+            dispatched.update(session=session, task_id=task_id)
+            return type("Result", (), {"id": task_id})()
+
+        request = APIRequestFactory().post("/api/acquisition/sessions/start-task/", {"task_id": task.id}, format="json")
+        with patch("acquisition.tasks.start_acquisition_task.apply_async", side_effect=apply_async):
+            response = AcquisitionSessionViewSet.as_view({"post": "start_task"})(request)
+
+        assert response.status_code == 201
+        session = dispatched["session"]
+        assert response.data["session_id"] == session.id
+        assert session.celery_task_id == dispatched["task_id"] == response.data["celery_task_id"]
+        assert session.metadata["startup_validation"]["all_healthy"] is True
@@ -0,0 +1,102 @@
+"""Unit tests for concurrent startup validation."""
+import threading
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from acquisition.services.startup_validation import validate_devices
+
+
+class FakeProtocol:
+    """Protocol whose behaviour is set by the device metadata."""
+
+    def __init__(self, config):
+        self.delay = config.get("delay", 0)
+        self.fail = config.get("fail", False)
+        self.missing = set(config.get("missing", ()))
+        self.disconnected = threading.Event()
+
+    def connect(self):
+        if self.fail:
+            raise ConnectionError("refused")
+        return True
+
+    def read_points(self, points):
+        time.sleep(self.delay)
+        return [{"code": p["code"], "value": 1} for p in points if p["code"] not in self.missing]
+
+    def disconnect(self):
+        self.disconnected.set()
+
+
+def _groups(**devices):
+    return {
+        index: {
+            "device": SimpleNamespace(code=code, ip_address="127.0.0.1", port=502, protocol="fake", metadata=meta),
+            "points": [{"code": f"{code}_P1"}, {"code": f"{code}_P2"}],
+        }
+        for index, (code, meta) in enumerate(devices.items())
+    }
+
+
+def _create(protocol_type, config):
+    return FakeProtocol(config)
+
+
+class TestValidateDevices:
+    """Test per-device deadlines and result aggregation."""
+
+    def test_devices_run_concurrently(self):
+        """Test wall time is close to the slowest device, not the sum."""
+        groups = _groups(**{f"D{i}": {"delay": 0.2} for i in range(8)})
+        started = time.monotonic()
+        with patch("acquisition.services.startup_validation.ProtocolRegistry.create", side_effect=_create):
+            result = validate_devices(groups, device_timeout=2, max_workers=8)
+
+        assert time.monotonic() - started < 1.0
+        assert result["all_healthy"] is True
+        assert result["total_points"] == 16
+        assert set(result["device_results"]) == {f"D{i}" for i in range(8)}
+
+    def test_slow_device_times_out_alone(self):
+        """Test a device past its deadline is reported without blocking the others."""
+        groups = _groups(SLOW={"delay": 2}, OK={}, BAD={"fail": True}, PART={"missing": ["PART_P2"]})
+        started = time.monotonic()
+        with patch("acquisition.services.startup_validation.ProtocolRegistry.create", side_effect=_create):
+            result = validate_devices(groups, device_timeout=0.3, max_workers=2)
+
+        assert time.monotonic() - started < 1.5
+        statuses = {code: r["status"] for code, r in result["device_results"].items()}
+        assert statuses == {"SLOW": "timeout", "OK": "healthy", "BAD": "error", "PART": "partial"}
+        assert result["all_healthy"] is False
+        reasons = {p["point"]: p["reason"] for p in result["failed_points"]}
+        assert reasons["SLOW_P1"] == "验证超时"
+        assert reasons["PART_P2"] == "无法读取"
+        assert "PART_P1" not in reasons
+
+    def test_abandoned_checks_keep_their_slot(self):
+        """Test a timed-out check still counts against max_workers until it returns."""
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        class CountingProtocol(FakeProtocol):
+            def connect(self):
+                with lock:
+                    active[0] += 1
+                    peak[0] = max(peak[0], active[0])
+                return True
+
+            def disconnect(self):
+                with lock:
+                    active[0] -= 1
+
+        groups = _groups(SLOW1={"delay": 0.6}, SLOW2={"delay": 0.6}, OK1={}, OK2={})
+        with patch(
+            "acquisition.services.startup_validation.ProtocolRegistry.create",
+            side_effect=lambda protocol_type, config: CountingProtocol(config),
+        ):
+            result = validate_devices(groups, device_timeout=0.2, max_workers=2)
+
+        assert peak[0] <= 2
+        statuses = {code: r["status"] for code, r in result["device_results"].items()}
+        assert statuses == {"SLOW1": "timeout", "SLOW2": "timeout", "OK1": "timeout", "OK2": "timeout"}
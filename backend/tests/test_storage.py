@@ -1,7 +1,13 @@
 """Unit tests for storage layer."""
+import threading
+import time
+
 import pytest
+from unittest.mock import MagicMock, patch
 
-from storage import StorageRegistry
+from storage import InfluxDBStorage, KafkaStorage, LocalStorage, StorageRegistry
+from storage.fanout import FanoutWriter, SinkWorker
+from storage.line_protocol import LineProtocolSerializer
 from tests.mocks.storage import register_mock_storage
 
 
@@ -198,3 +204,471 @@ class TestMockKafka:
         # Clear messages
         storage.clear_messages()
         assert len(storage.get_sent_messages()) == 0
+
+
+class TestInfluxDBBatchingWriter:
+    """Test InfluxDB batching write mode."""
+
+    @patch("storage.influxdb.InfluxClient")
+    def test_sync_mode_is_default(self, mock_client_cls, sample_storage_config):
+        """Test default write mode keeps one blocking request per write."""
+        storage = InfluxDBStorage(sample_storage_config)
+        storage.connect()
+
+        kwargs = mock_client_cls.return_value.write_api.call_args.kwargs
+        assert "success_callback" not in kwargs
+        assert mock_client_cls.call_args.kwargs["enable_gzip"] is False
+
+        storage.write([{"measurement": "m", "fields": {"v": 1.0}, "time": 1}])
+        metrics = storage.get_metrics()
+        assert metrics["points_written"] == 1
+        assert metrics["batches_written"] == 1
+
+    @patch("storage.influxdb.InfluxClient")
+    def test_batching_mode_options(self, mock_client_cls, sample_storage_config):
+        """Test batching mode builds write options, gzip and callbacks."""
+        sample_storage_config.update({
+            "write_mode": "batching",
+            "batch_size": 2000,
+            "flush_interval": 500,
+            "jitter_interval": 100,
+            "max_retry_time": 60000,
+        })
+        storage = InfluxDBStorage(sample_storage_config)
+        storage.connect()
+
+        assert mock_client_cls.call_args.kwargs["enable_gzip"] is True
+        kwargs = mock_client_cls.return_value.write_api.call_args.kwargs
+        options = kwargs["write_options"]
+        assert options.batch_size == 2000
+        assert options.flush_interval == 500
+        assert options.jitter_interval == 100
+        assert options.max_retry_time == 60000
+        assert kwargs["success_callback"] == storage._on_write_success
+        assert kwargs["error_callback"] == storage._on_write_error
+        assert kwargs["retry_callback"] == storage._on_write_retry
+
+    @patch("storage.influxdb.InfluxClient")
+    def test_batching_mode_queues_one_record_per_line(self, mock_client_cls, sample_storage_config):
+        """Test batching mode hands the client one record per line so batch_size counts lines."""
+        sample_storage_config["write_mode"] = "batching"
+        storage = InfluxDBStorage(sample_storage_config)
+        storage.connect()
+
+        storage.write([
+            {"measurement": "m", "fields": {"v": 1.0}, "time": 1},
+            {"measurement": "m", "fields": {"v": 2.0}, "time": 2},
+        ])
+
+        record = mock_client_cls.return_value.write_api.return_value.write.call_args.kwargs["record"]
+        assert record == [b"m v=1.0 1", b"m v=2.0 2"]
+
+    @patch("storage.influxdb.InfluxClient")
+    def test_flush_drains_by_recreating_write_api(self, mock_client_cls, sample_storage_config):
+        """Test flush closes the batching write API (the client's flush is a no-op) and opens a new one."""
+        sample_storage_config["write_mode"] = "batching"
+        first, second = MagicMock(), MagicMock()
+        mock_client_cls.return_value.write_api.side_effect = [first, second]
+        storage = InfluxDBStorage(sample_storage_config)
+        storage.connect()
+
+        storage.flush()
+
+        first.close.assert_called_once()
+        first.flush.assert_not_called()
+        assert storage.write_api is second
+        assert mock_client_cls.return_value.write_api.call_args.kwargs["success_callback"] == storage._on_write_success
+
+    @patch("storage.influxdb.InfluxClient")
+    def test_batching_callbacks_feed_metrics(self, mock_client_cls, sample_storage_config):
+        """Test success, retry and error callbacks update metrics."""
+        sample_storage_config["write_mode"] = "batching"
+        storage = InfluxDBStorage(sample_storage_config)
+        storage.connect()
+
+        assert storage.write([
+            {"measurement": "m", "fields": {"v": 1.0}, "time": 1},
+            {"measurement": "m", "fields": {"v": 2.0}, "time": 2},
+        ])
+        conf = ("test-bucket", "test-org", "ns")
+        storage._on_write_success(conf, "m v=1.0 1\nm v=2.0 2")
+        storage._on_write_retry(conf, "m v=3.0 3", Exception("503"))
+        storage._on_write_error(conf, "m v=3.0 3", Exception("timeout"))
+
+        metrics = storage.get_metrics()
+        assert metrics["points_submitted"] == 2
+        assert metrics["points_written"] == 2
+        assert metrics["batches_written"] == 1
+        assert metrics["retries"] == 1
+        assert metrics["batches_failed"] == 1
+        assert metrics["last_error"] == "timeout"
+
+
+class TestLineProtocolSerializer:
+    """Test direct line protocol serialization."""
+
+    def test_serialize_points(self):
+        """Test tags are escaped and sorted and field types encoded."""
+        serializer = LineProtocolSerializer()
+        body, count = serializer.serialize([
+            {
+                "measurement": "rack 1",
+                "tags": {"site": "s,1", "device": "d=1", "unit": ""},
+                "fields": {"temp": 25.5, "count": 3, "ok": True, "name": 'a "b"'},
+                "time": 1234567890000000000,
+            },
+            {"measurement": "rack 1", "fields": {}},
+        ])
+
+        assert count == 1
+        assert body == (
+            b'rack\\ 1,device=d\\=1,site=s\\,1 '
+            b'temp=25.5,count=3i,ok=true,name="a \\"b\\"" 1234567890000000000'
+        )
+
+    def test_series_key_cached(self):
+        """Test series key is computed once per measurement and tag set."""
+        serializer = LineProtocolSerializer()
+        tags = {"site": "s1", "point": "P1"}
+
+        first = serializer.series_key("m", tags)
+        second = serializer.series_key("m", dict(tags))
+
+        assert first is second
+        assert first == b"m,point=P1,site=s1"
+
+    def test_shared_tags_resolve_series_once(self):
+        """Test points sharing a tags dict look up the series key once per call."""
+        serializer = LineProtocolSerializer()
+        tags = {"point": "P1"}
+        data = [{"measurement": "m", "tags": tags, "fields": {"v": i}, "time": i + 1} for i in range(3)]
+
+        with patch.object(serializer, "series_key", wraps=serializer.series_key) as series_key:
+            lines = list(serializer.iter_lines(data))
+
+        assert series_key.call_count == 1
+        assert lines == [b"m,point=P1 v=0i 1", b"m,point=P1 v=1i 2", b"m,point=P1 v=2i 3"]
+
+    def test_skips_non_finite_values(self):
+        """Test NaN fields are dropped since InfluxDB rejects them."""
+        serializer = LineProtocolSerializer()
+        body, count = serializer.serialize([
+            {"measurement": "m", "fields": {"v": float("nan")}, "time": 1},
+            {"measurement": "m", "fields": {"v": 1.0}, "time": 2},
+        ])
+
+        assert count == 1
+        assert body == b"m v=1.0 2"
+
+
+class TestKafkaStorage:
+    """Test Kafka producer storage."""
+
+    @pytest.fixture(autouse=True)
+    def lz4_codec(self):
+        with patch.dict(KafkaStorage.CODEC_PACKAGES, {"lz4": (lambda: True, "lz4")}):
+            yield
+
+    @pytest.fixture
+    def kafka_config(self):
+        return {
+            "bootstrap_servers": "broker1:9092,broker2:9092",
+            "topic": "acquisition_data",
+            "compression_type": "lz4",
+            "linger_ms": 50,
+        }
+
+    def test_registered(self):
+        """Test Kafka storage is available in the registry."""
+        assert "kafka" in StorageRegistry.list_storages()
+
+    def test_invalid_compression(self, kafka_config):
+        """Test unsupported compression codec is rejected."""
+        kafka_config["compression_type"] = "brotli"
+        with pytest.raises(ValueError, match="Unsupported Kafka compression"):
+            KafkaStorage(kafka_config)
+
+    def test_missing_codec_package(self, kafka_config):
+        """Test a codec whose package is not installed fails with a clear error."""
+        with patch.dict(KafkaStorage.CODEC_PACKAGES, {"lz4": (lambda: False, "lz4")}):
+            with pytest.raises(ValueError, match="requires the 'lz4' package"):
+                KafkaStorage(kafka_config)
+
+    @patch("storage.kafka.KafkaProducer")
+    def test_producer_tuning(self, mock_producer_cls, kafka_config):
+        """Test batching and compression options reach the producer."""
+        storage = KafkaStorage(kafka_config)
+        assert storage.connect()
+
+        kwargs = mock_producer_cls.call_args.kwargs
+        assert kwargs["bootstrap_servers"] == ["broker1:9092", "broker2:9092"]
+        assert kwargs["compression_type"] == "lz4"
+        assert kwargs["linger_ms"] == 50
+        assert kwargs["max_in_flight_requests_per_connection"] == 1
+
+    @patch("storage.kafka.KafkaProducer")
+    def test_write_keys_by_device(self, mock_producer_cls, kafka_config):
+        """Test messages are keyed by device and delivery feeds metrics."""
+        storage = KafkaStorage(kafka_config)
+        storage.connect()
+        producer = mock_producer_cls.return_value
+
+        assert storage.write([
+            {"measurement": "m", "tags": {"device": "DEV_1"}, "fields": {"v": 1}, "time": 1},
+            {"measurement": "m", "tags": {"device": "DEV_2"}, "fields": {"v": 2}, "time": 2},
+        ])
+
+        keys = [c.kwargs["key"] for c in producer.send.call_args_list]
+        assert keys == ["DEV_1", "DEV_2"]
+        future = producer.send.return_value
+        assert future.add_callback.call_count == 2
+        assert future.add_errback.call_count == 2
+
+        batch = future.add_callback.call_args.args[1]
+        storage._on_send_success(batch, MagicMock(serialized_value_size=64))
+        storage._on_send_error(batch, Exception("broker down"))
+        metrics = storage.get_metrics()
+        assert metrics["points_submitted"] == 2
+        assert metrics["points_written"] == 1
+        assert metrics["batches_written"] == 0
+        assert metrics["batches_failed"] == 1
+
+    @patch("storage.kafka.KafkaProducer")
+    def test_batches_counted_per_write(self, mock_producer_cls, kafka_config):
+        """Test batches_written counts write calls, not messages."""
+        storage = KafkaStorage(kafka_config)
+        storage.connect()
+        future = mock_producer_cls.return_value.send.return_value
+
+        for _ in range(2):
+            storage.write([{"measurement": "m", "tags": {"device": "D"}, "fields": {"v": i}, "time": i} for i in range(3)])
+        for call in future.add_callback.call_args_list:
+            storage._on_send_success(call.args[1], MagicMock(serialized_value_size=8))
+
+        metrics = storage.get_metrics()
+        assert metrics["points_written"] == 6
+        assert metrics["batches_written"] == 2
+
+    @patch("storage.kafka.KafkaProducer")
+    def test_disconnect_flushes(self, mock_producer_cls, kafka_config):
+        """Test pending messages are flushed on disconnect."""
+        storage = KafkaStorage(kafka_config)
+        storage.connect()
+        producer = mock_producer_cls.return_value
+
+        storage.disconnect()
+
+        producer.flush.assert_called_once()
+        producer.close.assert_called_once()
+        assert not storage.is_connected
+
+
+class TestFanoutWriter:
+    """Test isolated per-sink fan-out."""
+
+    def _storage(self, **config):
+        storage = StorageRegistry.create("mock_influxdb", config)
+        storage.connect()
+        return storage
+
+    def test_slow_sink_does_not_block_others(self):
+        """Test a blocked sink only fills its own queue."""
+        fast = self._storage()
+        slow = self._storage()
+        release = threading.Event()
+        original_write = slow.write
+        slow.write = lambda data: release.wait(5) and original_write(data)
+
+        fanout = FanoutWriter()
+        fanout.add_sink("fast", fast)
+        fanout.add_sink("slow", slow)
+
+        start = time.time()
+        for i in range(5):
+            fanout.submit([{"measurement": "m", "fields": {"v": i}}])
+        assert time.time() - start < 0.5
+
+        deadline = time.time() + 2
+        while len(fast.get_written_data()) < 5 and time.time() < deadline:
+            time.sleep(0.01)
+        assert len(fast.get_written_data()) == 5
+        assert slow.get_written_data() == []
+
+        release.set()
+        fanout.stop(timeout=5)
+        assert len(slow.get_written_data()) == 5
+
+    def test_failing_sink_retries_then_drops(self):
+        """Test a failing sink drops after max retries without affecting others."""
+        good = self._storage()
+        bad = self._storage(_test_write_fail=True)
+
+        fanout = FanoutWriter()
+        fanout.add_sink("good", good)
+        fanout.add_sink("bad", bad, max_retries=2, retry_backoff=0.01)
+        fanout.submit([{"measurement": "m", "fields": {"v": 1}}])
+
+        deadline = time.time() + 2
+        while fanout.stats()["bad"]["points_dropped"] < 1 and time.time() < deadline:
+            time.sleep(0.01)
+        fanout.stop(timeout=5)
+
+        stats = fanout.stats()
+        assert len(good.get_written_data()) == 1
+        assert stats["good"]["points_written"] == 1
+        assert stats["bad"]["retries"] == 2
+        assert stats["bad"]["points_dropped"] == 1
+        assert stats["bad"]["last_error"] == "Simulated write failure"
+
+    def test_worker_owns_connection(self):
+        """Test the sink connects in its worker and is disconnected only after the worker exits."""
+        storage = StorageRegistry.create("mock_influxdb", {})
+        connected_in = []
+        original_connect = storage.connect
+        storage.connect = lambda: connected_in.append(threading.current_thread().name) or original_connect()
+        release = threading.Event()
+        original_write = storage.write
+        storage.write = lambda data: release.wait(5) and original_write(data)
+
+        fanout = FanoutWriter()
+        fanout.add_sink("slow", storage)
+        fanout.submit([{"measurement": "m", "fields": {"v": 1}}])
+        time.sleep(0.1)
+        fanout.stop(timeout=0.1)
+
+        assert connected_in == ["sink-slow"]
+        assert storage.is_connected  # still writing, not closed underneath
+        release.set()
+        fanout.workers["slow"]._thread.join(timeout=2)
+        assert not storage.is_connected
+        assert len(storage.get_written_data()) == 1
+
+    def test_queue_overflow_drops_oldest(self):
+        """Test a full queue drops the oldest batch instead of blocking."""
+        worker = SinkWorker("unstarted", self._storage(), queue_size=2)
+
+        worker.submit([{"v": 1}])
+        worker.submit([{"v": 2}])
+        assert not worker.submit([{"v": 3}])
+
+        stats = worker.stats()
+        assert stats["queue_depth"] == 2
+        assert stats["batches_dropped"] == 1
+
+
+class TestInfluxDBQueryStreaming:
+    """Test streaming annotated CSV query results."""
+
+    @patch("storage.influxdb.InfluxClient")
+    def test_iter_query_rows(self, mock_client_cls, sample_storage_config):
+        """Test rows are parsed per table using datatype and default annotations."""
+        mock_client_cls.return_value.query_api.return_value.query_csv.return_value = iter([
+            ["#datatype", "string", "long", "dateTime:RFC3339", "double", "string"],
+            ["#group", "false", "false", "false", "false", "true"],
+            ["#default", "_result", "", "", "", ""],
+            ["", "result", "table", "_time", "_value", "point"],
+            ["", "", "0", "2025-10-10T00:00:00Z", "25.5", "TEMP_01"],
+            ["", "", "0", "2025-10-10T00:00:01Z", "", "TEMP_01"],
+            [],
+            ["#datatype", "string", "long", "dateTime:RFC3339", "long", "string"],
+            ["#group", "false", "false", "false", "false", "true"],
+            ["#default", "_result", "", "", "", ""],
+            ["", "result", "table", "_time", "_value", "point"],
+            ["", "", "1", "2025-10-10T00:00:00Z", "7", "COUNT_01"],
+        ])
+        storage = InfluxDBStorage(sample_storage_config)
+        storage.connect()
+
+        rows = list(storage.iter_query_rows('from(bucket: "b")'))
+
+        assert rows[0] == {
+            "result": "_result", "table": 0, "_time": "2025-10-10T00:00:00Z",
+            "_value": 25.5, "point": "TEMP_01",
+        }
+        assert rows[1]["_value"] is None
+        assert rows[2]["_value"] == 7
+        assert rows[2]["point"] == "COUNT_01"
+
+    @patch("storage.influxdb.InfluxClient")
+    def test_iter_query_rows_error_table(self, mock_client_cls, sample_storage_config):
+        """Test an error table is raised as StorageError."""
+        mock_client_cls.return_value.query_api.return_value.query_csv.return_value = iter([
+            ["#datatype", "string", "string"],
+            ["#group", "true", "true"],
+            ["#default", "", ""],
+            ["", "error", "reference"],
+            ["", "bucket not found", ""],
+        ])
+        storage = InfluxDBStorage(sample_storage_config)
+        storage.connect()
+
+        with pytest.raises(Exception, match="bucket not found"):
+            list(storage.iter_query_rows('from(bucket: "missing")'))
+
+
+class TestLocalStorage:
+    """Test the embedded SQLite time-series store."""
+
+    @staticmethod
+    def _points(code, start_s, count, step_s=1):
+        return [
+            {
+                "measurement": "m",
+                "tags": {"point": code, "quality": "good"},
+                "fields": {code: float(i)},
+                "time": int((start_s + i * step_s) * 1e9),
+            }
+            for i in range(count)
+        ]
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        storage = StorageRegistry.create("local", {"path": str(tmp_path / "tsdb.sqlite3")})
+        storage.connect()
+        yield storage
+        storage.disconnect()
+
+    def test_write_and_query_range(self, store):
+        """Test range queries return one point's samples in time order."""
+        store.write(self._points("A", 100, 10) + self._points("B", 100, 10))
+
+        rows = store.query_range(["A"], int(102e9), int(105e9))
+
+        assert [row["_value"] for row in rows] == [2.0, 3.0, 4.0]
+        assert rows[0]["point"] == "A" and rows[0]["_field"] == "A"
+        assert rows[0]["_time"] == "1970-01-01T00:01:42.000000Z"
+        assert rows[0]["quality"] == "good"
+        assert store.metrics.points_written == 20
+
+    def test_limit_applies_per_series(self, store):
+        """Test the limit keeps the oldest samples of each series."""
+        store.write(self._points("A", 0, 10) + self._points("B", 0, 10))
+
+        rows = store.query_range(["A", "B"], 0, int(100e9), limit=3)
+
+        assert len(rows) == 6
+        assert {row["point"] for row in rows} == {"A", "B"}
+
+    def test_size_retention_evicts_oldest(self, tmp_path):
+        """Test the store stays within max_bytes by dropping the oldest samples."""
+        store = LocalStorage({"path": str(tmp_path / "small.sqlite3"), "max_bytes": 64 * 1024})
+        store.connect()
+        store.write(self._points("A", 0, 5000))
+
+        deleted = store.enforce_retention()
+
+        assert deleted > 0
+        assert store.used_bytes() <= 64 * 1024
+        rows = store.query_range(["A"], 0, int(1e13))
+        assert rows[-1]["_value"] == 4999.0
+        assert rows[0]["_value"] > 0
+
+    def test_age_retention(self, store):
+        """Test samples older than max_age_seconds are dropped."""
+        store.max_age_seconds = 60
+        store.write(self._points("A", 0, 200))
+
+        store.enforce_retention(now_ns=int(200e9))
+
+        rows = store.query_range(["A"], 0, int(1e12))
+        assert rows[0]["_value"] == 140.0
@@ -0,0 +1,97 @@
+"""Tests for bulk task start/stop."""
+from unittest.mock import patch
+
+import pytest
+from rest_framework.test import APIRequestFactory
+
+from acquisition import models as acq_models
+from configuration import models as config_models
+from configuration.services import task_control
+from configuration.views import AcqTaskViewSet
+from tests.fixtures.factories import *
+
+
+@pytest.fixture
+def site_tasks(create_site, create_device, create_point, create_task):
+    """Three tasks on one site, one of them inactive, plus a task on another site."""
+    site = create_site(code="BULK_SITE")
+    tasks = [
+        create_task(points=[create_point(device=create_device(site=site, port=1000 + index))], is_active=index < 2)
+        for index in range(3)
+    ]
+    create_task(points=[create_point()])
+    return site, tasks
+
+
+@pytest.mark.django_db
+class TestBulkControl:
+    """Test bulk start/stop."""
+
+    def test_select_by_site_skips_inactive(self, site_tasks):
+        site, tasks = site_tasks
+        selected = list(task_control.select_tasks(site_code=site.code))
+        assert selected == sorted(tasks[:2], key=lambda t: t.code)
+
+    def test_bulk_start_staggers_and_skips_running(self, site_tasks):
+        """Test sessions exist before dispatch, countdowns are staggered and running tasks are skipped."""
+        site, tasks = site_tasks
+        acq_models.AcquisitionSession.objects.create(task=tasks[0], status=acq_models.AcquisitionSession.STATUS_RUNNING)
+        extra = [tasks[1]]
+        calls = []
+
+        def apply_async(args, kwargs, task_id, countdown):
+            calls.append((kwargs["session_id"], task_id, countdown))
+
+        with patch("acquisition.tasks.start_acquisition_task.apply_async", side_effect=apply_async):
+            result = task_control.bulk_start(task_control.select_tasks(site_code=site.code), stagger=2.0)
+
+        summary = result.to_dict()
+        assert summary["counts"] == {"skipped": 1, "started": 1}
+        session_id, task_id, countdown = calls[0]
+        assert countdown == 0.0
+        assert acq_models.AcquisitionSession.objects.get(pk=session_id).celery_task_id == task_id
+        assert config_models.TaskRun.objects.filter(task=extra[0], status=config_models.TaskRun.STATUS_RUNNING).count() == 1
+
+    def test_bulk_start_countdowns(self, create_task):
+        tasks = [create_task() for _ in range(3)]
+        with patch("acquisition.tasks.start_acquisition_task.apply_async") as apply_async:
+            task_control.bulk_start(tasks, stagger=1.5, max_concurrency=2)
+
+        assert sorted(call.kwargs["countdown"] for call in apply_async.call_args_list) == [0.0, 1.5, 3.0]
+
+    def test_bulk_start_records_dispatch_errors(self, create_task):
+        tasks = [create_task(), create_task()]
+        with patch("acquisition.tasks.start_acquisition_task.apply_async", side_effect=ConnectionError("broker down")):
+            summary = task_control.bulk_start(tasks, max_concurrency=2).to_dict()
+
+        assert summary["counts"] == {"error": 2}
+        assert not acq_models.AcquisitionSession.objects.filter(
+            task__in=tasks, status=acq_models.AcquisitionSession.STATUS_RUNNING
+        ).exists()
+
+    def test_bulk_stop(self, create_task):
+        running, idle = create_task(), create_task()
+        session = acq_models.AcquisitionSession.objects.create(task=running, status=acq_models.AcquisitionSession.STATUS_RUNNING)
+        config_models.TaskRun.objects.create(task=running, status=config_models.TaskRun.STATUS_RUNNING)
+
+        with patch("acquisition.tasks.stop_acquisition_task.delay") as delay:
+            summary = task_control.bulk_stop([running, idle], note="maintenance").to_dict()
+
+        delay.assert_called_once_with(session.id)
+        assert summary["counts"] == {"stopped": 1, "skipped": 1}
+        run = config_models.TaskRun.objects.get(task=running)
+        assert run.status == config_models.TaskRun.STATUS_STOPPED
+        assert run.context["note"] == "maintenance"
+
+    def test_single_task_start_endpoint(self, create_task):
+        """Test POST /api/config/tasks/{id}/start/ still dispatches one task."""
+        task = create_task()
+        request = APIRequestFactory().post(f"/api/config/tasks/{task.id}/start/", {"note": "manual"}, format="json")
+        view = AcqTaskViewSet.as_view({"post": "start"})
+        with patch("acquisition.tasks.start_acquisition_task.delay") as delay:
+            delay.return_value.id = "celery-1"
+            response = view(request, pk=task.id)
+
+        assert response.status_code == 200
+        delay.assert_called_once_with(task.id)
+        assert config_models.TaskRun.objects.get(pk=response.data["run_id"]).context["celery_task_id"] == "celery-1"
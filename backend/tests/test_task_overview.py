@@ -0,0 +1,54 @@
+"""Tests for the cached task overview."""
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from configuration import models as config_models
+from configuration.services.overview import build_task_overview, get_task_overview
+from tests.fixtures.factories import *
+
+
+@pytest.fixture
+def site_with_runs(create_site, create_device, create_point, create_task):
+    cache.clear()
+    site = create_site(code="OVERVIEW_SITE")
+    tasks = []
+    for index in range(3):
+        # Two points per task: the M2M join must not double count
+        device = create_device(site=site, port=2000 + index)
+        task = create_task(points=[create_point(device=device), create_point(device=device)], is_active=index != 2)
+        config_models.ConfigVersion.objects.create(task=task, version=1)
+        tasks.append(task)
+    # Task without a version is not listed
+    create_task(points=[create_point(device=create_device(site=site, port=2100))])
+
+    for status in ["running", "stopped", "stopped", "failed"]:
+        config_models.TaskRun.objects.create(task=tasks[0], status=status)
+    config_models.TaskRun.objects.create(task=tasks[1], status="running")
+    return site, tasks
+
+
+@pytest.mark.django_db
+class TestTaskOverview:
+    """Test grouped aggregates and cache invalidation."""
+
+    def test_grouped_counts(self, site_with_runs):
+        site, _ = site_with_runs
+        overview = build_task_overview(site.code)
+
+        assert (overview["total_tasks"], overview["active_tasks"]) == (3, 2)
+        assert overview["status"] == {"running": 2, "stopped": 2, "failed": 1}
+        assert len(overview["recent_runs"]) == 5
+
+    def test_cached_until_run_changes(self, site_with_runs):
+        site, tasks = site_with_runs
+        get_task_overview(site.code)
+
+        with CaptureQueriesContext(connection) as queries:
+            cached = get_task_overview(site.code)
+        assert len(queries) == 0
+        assert cached["status"]["running"] == 2
+
+        config_models.TaskRun.objects.create(task=tasks[2], status="running")
+        assert get_task_overview(site.code)["status"]["running"] == 3
@@ -20,11 +20,26 @@ interface DataPoint {
   quality: string;
 }
 
+interface IncomingPoint {
+  point_code: string;
+  timestamp: string;
+  value: number | string | boolean | null;
+  quality: string;
+  // Live frames only: range and number of samples over the frame interval
+  min?: number;
+  max?: number;
+  count?: number;
+}
+
 interface RealtimeChartProps {
   sessionId: number;
   title?: string;
   maxDataPoints?: number;
   height?: number;
+  /** Only receive these point codes (server-side filter); all points when omitted */
+  pointCodes?: string[];
+  /** Receive data as MessagePack binary frames instead of JSON */
+  binary?: boolean;
 }
 
 const RealtimeChart: React.FC<RealtimeChartProps> = ({
@@ -32,46 +47,61 @@ const RealtimeChart: React.FC<RealtimeChartProps> = ({
   title = '实时数据',
   maxDataPoints = 50,
   height = 300,
+  pointCodes,
+  binary = false,
 }) => {
   const [dataPoints, setDataPoints] = useState<DataPoint[]>([]);
   const [pointCode, setPointCode] = useState<string>('');
 
   // WebSocket connection
+  const appendPoints = useCallback((points: IncomingPoint[]) => {
+    if (points.length === 0) return;
+    setPointCode(points[points.length - 1].point_code);
+    setDataPoints((prev) => {
+      const newPoints = points.map((data) => ({
+        timestamp: new Date(data.timestamp).toLocaleTimeString(),
+        value: typeof data.value === 'number' ? data.value : parseFloat(String(data.value)),
+        quality: data.quality,
+      }));
+
+      // Keep only the last N data points
+      const updated = [...prev, ...newPoints];
+      if (updated.length > maxDataPoints) {
+        return updated.slice(updated.length - maxDataPoints);
+      }
+      return updated;
+    });
+  }, [maxDataPoints]);
+
   const handleMessage = useCallback((message: WebSocketMessage) => {
     if (message.type === 'data_point') {
-      const data = message.data as {
-        session_id: number;
-        point_code: string;
-        timestamp: string;
-        value: number;
-        quality: string;
-      };
-
+      const data = message.data as IncomingPoint & { session_id: number };
       if (data.session_id === sessionId) {
-        setPointCode(data.point_code);
-        setDataPoints((prev) => {
-          const newPoint = {
-            timestamp: new Date(data.timestamp).toLocaleTimeString(),
-            value: typeof data.value === 'number' ? data.value : parseFloat(String(data.value)),
-            quality: data.quality,
-          };
-
-          // Keep only the last N data points
-          const updated = [...prev, newPoint];
-          if (updated.length > maxDataPoints) {
-            return updated.slice(updated.length - maxDataPoints);
-          }
-          return updated;
-        });
+        appendPoints([data]);
+      }
+    } else if (message.type === 'data_points' || message.type === 'live') {
+      // One aggregated message per bulk insert / one coalesced live frame per interval
+      const data = message.data as { session_id: number; points: IncomingPoint[] };
+      if (data.session_id === sessionId) {
+        appendPoints(data.points);
       }
     }
-  }, [sessionId, maxDataPoints]);
+  }, [sessionId, appendPoints]);
 
-  const { status } = useWebSocket({
+  const { status, send } = useWebSocket({
     url: `ws://localhost:8000/ws/acquisition/sessions/${sessionId}/`,
     onMessage: handleMessage,
+    binary,
   });
 
+  // (Re)subscribe after every connect; the server forgets subscriptions on disconnect
+  const subscriptionKey = pointCodes ? pointCodes.join(',') : '';
+  useEffect(() => {
+    if (status !== WebSocketStatus.CONNECTED || !subscriptionKey) return;
+    send({ action: 'unsubscribe_all' });
+    send({ action: 'subscribe', points: subscriptionKey.split(',') });
+  }, [status, subscriptionKey, send]);
+
   // Custom tooltip
   const CustomTooltip = ({ active, payload }: any) => {
     if (active && payload && payload.length) {
@@ -1,4 +1,5 @@
 import { useEffect, useRef, useState, useCallback } from 'react';
+import { BinaryFrameDecoder } from '../utils/binaryFrames';
 
 export interface WebSocketMessage {
   type: string;
@@ -13,6 +14,8 @@ export interface UseWebSocketOptions {
   onError?: (error: Event) => void;
   autoReconnect?: boolean;
   reconnectInterval?: number;
+  /** Ask for MessagePack data frames (acquisition sessions); messages are decoded to the JSON shape */
+  binary?: boolean;
 }
 
 export enum WebSocketStatus {
@@ -31,6 +34,7 @@ export function useWebSocket(options: UseWebSocketOptions) {
     onError,
     autoReconnect = true,
     reconnectInterval = 3000,
+    binary = false,
   } = options;
 
   const [status, setStatus] = useState<WebSocketStatus>(WebSocketStatus.DISCONNECTED);
@@ -48,7 +52,12 @@ export function useWebSocket(options: UseWebSocketOptions) {
     try {
       // Convert http/https to ws/wss
       const wsUrl = url.replace(/^http/, 'ws');
-      const ws = new WebSocket(wsUrl);
+      const ws = binary ? new WebSocket(wsUrl, ['msgpack']) : new WebSocket(wsUrl);
+      // The point dictionary is per connection
+      const decoder = binary ? new BinaryFrameDecoder() : null;
+      if (decoder) {
+        ws.binaryType = 'arraybuffer';
+      }
 
       ws.onopen = () => {
         setStatus(WebSocketStatus.CONNECTED);
@@ -57,6 +66,13 @@ export function useWebSocket(options: UseWebSocketOptions) {
 
       ws.onmessage = (event) => {
         try {
+          if (event.data instanceof ArrayBuffer) {
+            const message = decoder?.decode(event.data);
+            if (message) {
+              onMessage?.(message);
+            }
+            return;
+          }
           const message = JSON.parse(event.data) as WebSocketMessage;
           onMessage?.(message);
         } catch (err) {
@@ -86,7 +102,7 @@ export function useWebSocket(options: UseWebSocketOptions) {
       console.error('Failed to create WebSocket:', err);
       setStatus(WebSocketStatus.ERROR);
     }
-  }, [url, onMessage, onOpen, onClose, onError, autoReconnect, reconnectInterval]);
+  }, [url, onMessage, onOpen, onClose, onError, autoReconnect, reconnectInterval, binary]);
 
   const disconnect = useCallback(() => {
     shouldConnectRef.current = false;
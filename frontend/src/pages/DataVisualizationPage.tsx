@@ -322,6 +322,7 @@ const DataVisualizationPage: React.FC = () => {
           title={`实时数据监控 - 会话 #${selectedSessionId}`}
           maxDataPoints={50}
           height={350}
+          binary
         />
       )}
 
@@ -34,6 +34,7 @@ export interface SessionStatus {
   points_read: number;
   last_read_time: string | null;
   error_count: number;
+  points_per_second: number;
   error_message: string;
   metadata: Record<string, unknown>;
 }
@@ -199,6 +200,52 @@ export async function stopTaskViaConfig(taskId: number): Promise<unknown> {
   return data;
 }
 
+export interface BulkTaskControlRequest {
+  action: 'start' | 'stop';
+  site_code?: string;
+  task_ids?: number[];
+  task_codes?: string[];
+  only_active?: boolean;
+  worker?: string;
+  note?: string;
+}
+
+export interface BulkTaskControlResult {
+  action: 'start' | 'stop';
+  requested: number;
+  counts: Record<string, number>;
+  results: Array<{
+    task_id: number;
+    task_code: string;
+    status: 'started' | 'stopped' | 'skipped' | 'error';
+    session_id?: number;
+    celery_task_id?: string;
+    countdown?: number;
+    detail?: string;
+  }>;
+}
+
+/**
+ * 批量启动/停止任务（按站点或任务列表）
+ */
+export async function bulkControlTasks(request: BulkTaskControlRequest): Promise<BulkTaskControlResult> {
+  const response = await fetch(`${API_BASE}/config/tasks/bulk-control/`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(request),
+  });
+
+  const data = await response.json();
+
+  if (!response.ok) {
+    throw new Error(data.detail || `批量操作失败: ${response.statusText}`);
+  }
+
+  return data;
+}
+
 /**
  * 测试单次采集
  */
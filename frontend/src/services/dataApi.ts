@@ -41,7 +41,8 @@ export interface SessionDataPoint {
 }
 
 export interface SessionDataPointsResponse {
-  count: number;
+  count: number | null;
+  next_cursor: string | null;
   results: SessionDataPoint[];
 }
 
@@ -78,6 +79,47 @@ export async function fetchPointHistory(
   return response.json();
 }
 
+export interface BatchHistorySeries {
+  point_code: string;
+  field: string;
+  values: Array<number | string | boolean | null>;
+}
+
+export interface BatchHistoryResponse {
+  point_codes: string[];
+  count: number;
+  timestamps: string[];
+  series: BatchHistorySeries[];
+  missing: string[];
+}
+
+/**
+ * Fetch history of many points in one request, aligned on a shared time axis
+ */
+export async function fetchBatchHistory(
+  pointCodes: string[],
+  startTime?: string,
+  endTime?: string,
+  maxPoints?: number
+): Promise<BatchHistoryResponse> {
+  const response = await fetch('/api/acquisition/sessions/batch-history/', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({
+      point_codes: pointCodes,
+      start_time: startTime || '-1h',
+      end_time: endTime || 'now()',
+      max_points: maxPoints ?? null,
+    }),
+  });
+
+  if (!response.ok) {
+    throw new Error(`批量获取历史数据失败: ${response.statusText}`);
+  }
+
+  return response.json();
+}
+
 /**
  * Fetch active acquisition sessions
  */
@@ -119,15 +161,21 @@ export async function fetchSession(sessionId: number): Promise<AcquisitionSessio
 }
 
 /**
- * Fetch data points for a session
+ * Fetch a page of data points for a session (newest first).
+ * Pass the previous page's next_cursor to continue; count is only computed with withCount.
  */
 export async function fetchSessionDataPoints(
   sessionId: number,
   limit: number = 100,
-  offset: number = 0
+  cursor?: string | null,
+  withCount: boolean = false
 ): Promise<SessionDataPointsResponse> {
+  const params = new URLSearchParams({ limit: String(limit) });
+  if (cursor) params.append('cursor', cursor);
+  if (withCount) params.append('with_count', 'true');
+
   const response = await fetch(
-    `/api/acquisition/sessions/${sessionId}/data-points/?limit=${limit}&offset=${offset}`
+    `/api/acquisition/sessions/${sessionId}/data-points/?${params.toString()}`
   );
 
   if (!response.ok) {
@@ -174,3 +222,36 @@ export async function stopSession(sessionId: number, reason?: string): Promise<v
     throw new Error(errorData.detail || `停止会话失败: ${response.statusText}`);
   }
 }
+
+export interface CurrentValue {
+  value: number | string | boolean;
+  quality: string;
+  timestamp: string | null;
+  session_id: number | null;
+}
+
+export interface CurrentValuesResponse {
+  count: number;
+  values: Record<string, CurrentValue | null>;
+  missing: string[];
+}
+
+/**
+ * Fetch current values of many points in one call (from the latest-value cache)
+ */
+export async function fetchCurrentValues(
+  pointCodes: string[],
+  taskId?: number
+): Promise<CurrentValuesResponse> {
+  const response = await fetch('/api/acquisition/sessions/current-values/', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ point_codes: pointCodes, task_id: taskId ?? null }),
+  });
+
+  if (!response.ok) {
+    throw new Error(`获取测点当前值失败: ${response.statusText}`);
+  }
+
+  return response.json();
+}
@@ -0,0 +1,193 @@
+/**
+ * Decoder for the MessagePack binary frames of the acquisition WebSocket
+ * (opt-in with the `msgpack` subprotocol, see BinaryFrameEncoder in
+ * backend/acquisition/consumers.py).
+ *
+ * Only the MessagePack subset the server emits is supported: nil, booleans,
+ * integers, floats, strings, bin, arrays and maps.
+ */
+
+export interface DecodedPoint {
+  point_code: string;
+  timestamp: string;
+  value: number | string | boolean | null;
+  quality: string;
+  min?: number;
+  max?: number;
+  count?: number;
+}
+
+export interface DecodedMessage {
+  type: string;
+  data: unknown;
+}
+
+type Packed = null | boolean | number | string | Uint8Array | Packed[] | { [key: string]: Packed };
+
+class Reader {
+  private offset = 0;
+  private readonly view: DataView;
+
+  constructor(private readonly bytes: Uint8Array) {
+    this.view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  }
+
+  read(): Packed {
+    const byte = this.uint(1);
+    if (byte <= 0x7f) return byte;
+    if (byte >= 0xe0) return byte - 0x100;
+    if ((byte & 0xf0) === 0x80) return this.map(byte & 0x0f);
+    if ((byte & 0xf0) === 0x90) return this.array(byte & 0x0f);
+    if ((byte & 0xe0) === 0xa0) return this.str(byte & 0x1f);
+    switch (byte) {
+      case 0xc0: return null;
+      case 0xc2: return false;
+      case 0xc3: return true;
+      case 0xc4: return this.bin(this.uint(1));
+      case 0xc5: return this.bin(this.uint(2));
+      case 0xc6: return this.bin(this.uint(4));
+      case 0xca: return this.float(4);
+      case 0xcb: return this.float(8);
+      case 0xcc: return this.uint(1);
+      case 0xcd: return this.uint(2);
+      case 0xce: return this.uint(4);
+      case 0xcf: return this.uint(8);
+      case 0xd0: return this.int(1);
+      case 0xd1: return this.int(2);
+      case 0xd2: return this.int(4);
+      case 0xd3: return this.int(8);
+      case 0xd9: return this.str(this.uint(1));
+      case 0xda: return this.str(this.uint(2));
+      case 0xdb: return this.str(this.uint(4));
+      case 0xdc: return this.array(this.uint(2));
+      case 0xdd: return this.array(this.uint(4));
+      case 0xde: return this.map(this.uint(2));
+      case 0xdf: return this.map(this.uint(4));
+      default:
+        throw new Error(`Unsupported MessagePack type 0x${byte.toString(16)}`);
+    }
+  }
+
+  private uint(size: number): number {
+    const offset = this.offset;
+    this.offset += size;
+    switch (size) {
+      case 1: return this.view.getUint8(offset);
+      case 2: return this.view.getUint16(offset);
+      case 4: return this.view.getUint32(offset);
+      default: return Number(this.view.getBigUint64(offset));
+    }
+  }
+
+  private int(size: number): number {
+    const offset = this.offset;
+    this.offset += size;
+    switch (size) {
+      case 1: return this.view.getInt8(offset);
+      case 2: return this.view.getInt16(offset);
+      case 4: return this.view.getInt32(offset);
+      default: return Number(this.view.getBigInt64(offset));
+    }
+  }
+
+  private float(size: number): number {
+    const offset = this.offset;
+    this.offset += size;
+    return size === 4 ? this.view.getFloat32(offset) : this.view.getFloat64(offset);
+  }
+
+  private bin(length: number): Uint8Array {
+    const start = this.offset;
+    this.offset += length;
+    return this.bytes.subarray(start, this.offset);
+  }
+
+  private str(length: number): string {
+    return textDecoder.decode(this.bin(length));
+  }
+
+  private array(length: number): Packed[] {
+    const items: Packed[] = [];
+    for (let i = 0; i < length; i++) items.push(this.read());
+    return items;
+  }
+
+  private map(length: number): { [key: string]: Packed } {
+    const result: { [key: string]: Packed } = {};
+    for (let i = 0; i < length; i++) {
+      const key = this.read();
+      result[String(key)] = this.read();
+    }
+    return result;
+  }
+}
+
+const textDecoder = new TextDecoder();
+
+export function unpack(data: ArrayBuffer | Uint8Array): Packed {
+  return new Reader(data instanceof Uint8Array ? data : new Uint8Array(data)).read();
+}
+
+// Packed columns are little-endian; a DataView also copes with unaligned offsets
+function float64Column(bytes: Uint8Array): number[] {
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  const values: number[] = [];
+  for (let offset = 0; offset < bytes.byteLength; offset += 8) values.push(view.getFloat64(offset, true));
+  return values;
+}
+
+function uint32Column(bytes: Uint8Array): number[] {
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  const values: number[] = [];
+  for (let offset = 0; offset < bytes.byteLength; offset += 4) values.push(view.getUint32(offset, true));
+  return values;
+}
+
+function optional(value: number): number | undefined {
+  return Number.isNaN(value) ? undefined : value;
+}
+
+/**
+ * Per-connection decoder: keeps the point dictionary and quality table sent
+ * by the server and turns data frames back into the JSON message shape.
+ * Create a new one for every connection.
+ */
+export class BinaryFrameDecoder {
+  private codes: string[] = [];
+  private quality: string[] = ['good', 'bad', 'uncertain'];
+
+  /** Decode one frame; dictionary frames return null. */
+  decode(data: ArrayBuffer | Uint8Array): DecodedMessage | null {
+    const frame = unpack(data) as { [key: string]: Packed };
+    if (frame.type === 'dict') {
+      const points = (frame.points || {}) as { [code: string]: number };
+      Object.entries(points).forEach(([code, index]) => {
+        this.codes[index] = code;
+      });
+      if (Array.isArray(frame.quality)) this.quality = frame.quality as string[];
+      return null;
+    }
+
+    const indexes = uint32Column(frame.i as Uint8Array);
+    const times = float64Column(frame.t as Uint8Array);
+    const qualities = frame.q as Uint8Array;
+    const values = frame.v instanceof Uint8Array ? float64Column(frame.v) : (frame.v as (number | string | boolean | null)[]);
+    const mins = frame.min instanceof Uint8Array ? float64Column(frame.min) : null;
+    const maxs = frame.max instanceof Uint8Array ? float64Column(frame.max) : null;
+    const counts = frame.n instanceof Uint8Array ? uint32Column(frame.n) : null;
+
+    const points: DecodedPoint[] = indexes.map((index, row) => ({
+      point_code: this.codes[index] ?? String(index),
+      timestamp: Number.isNaN(times[row]) ? '' : new Date(times[row]).toISOString(),
+      value: values[row],
+      quality: this.quality[qualities[row]] ?? 'unknown',
+      ...(counts ? { min: optional(mins![row]), max: optional(maxs![row]), count: counts[row] } : {}),
+    }));
+
+    const type = frame.type as string;
+    if (type === 'data_point') {
+      return { type, data: { ...points[0], session_id: frame.session_id } };
+    }
+    return { type, data: { session_id: frame.session_id, seq: frame.seq, points } };
+  }
+}